@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+교류(AC) 전류 애니메이션 – 한 주기의 자기장을 (프레임 × 격자) 배열로 한 번에 구하고
+프레임을 한 번만 인코딩해 애니메이션 WebP 한 장으로 만든다
+
+자기장은 전류에 비례하므로 전류 1 A 의 자기장을 한 번만 계산한 뒤
+I(t) = I0 sin ωt 와 브로드캐스트해 (프레임, …) 배열을 얻는다 (ac_field).
+프레임은 장면 객체(scenes3d 와 같이 아티스트 데이터만 갱신)로 그리고 Agg 버퍼를
+잘라 PIL 로 한 파일에 담는다. 재생은 브라우저가 하므로 매개변수별로
+FIGURE_CACHE 에 넣어 두면 그 뒤로는 서버가 할 일이 없다.
+
+탐구 과제용 스피커·전동기 단면도 여기 둔다 – 고정된 자석 자기장 + 코일 자기장 × I(t).
+
+    python ac_animation.py     # 장면·형식별 프레임 그리기/인코딩 시간과 파일 크기
+"""
+from io import BytesIO
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+
+from field_engine import pole_field
+from figure_output import PRESETS, MAX_PX
+from loop_field import solenoid_field
+
+FRAMES = 24          # 한 주기 프레임 수
+PERIOD_MS = 2000     # 화면에서의 한 주기 – 실제 60 Hz 는 눈에 보이지 않으므로 늦춘 것
+ANIM_DPI = 90        # 프레임 dpi 상한 (프레임 수만큼 곱해지므로 정지 그림보다 낮게)
+
+
+def ac_currents(amplitude: float, frames: int = FRAMES):
+    """한 주기 I(t) = I0 sin(2π t/T) 를 frames 등분한 (frames,) 배열"""
+    return amplitude * np.sin(2 * np.pi * np.arange(frames) / frames)
+
+
+def ac_field(unit, currents):
+    """전류 1 A 의 자기장 unit (…) → 프레임별 자기장 (frames, …) (자기장 ∝ 전류)"""
+    unit = np.asarray(unit, dtype=float)
+    return np.asarray(currents, dtype=float).reshape((-1,) + (1,) * unit.ndim) * unit
+
+
+def animation_preset(preset: str) -> str:
+    """애니메이션에 쓸 프리셋 – WebP 프리셋은 그대로, 나머지는 WebP 로.
+    SVG 는 애니메이션이 안 되고, PNG(APNG) 는 256색 팔레트로 줄여도 같은 프레임의
+    애니메이션 WebP 보다 1.7~3.3배 커서 (python ac_animation.py) '압축' 이 오히려 전송량을 늘린다."""
+    return preset if PRESETS[preset][0] == "webp" else "WebP"
+
+
+# ============================================================
+#  프레임 → 애니메이션 파일
+# ============================================================
+def render_frames(fig, figures, bbox=None, dpi: float = ANIM_DPI):
+    """figures (같은 fig 를 프레임마다 갱신해 내놓는 반복자) → RGB PIL 이미지 목록.
+    저장(savefig) 없이 Agg 버퍼를 직접 읽고 bbox(인치) 범위만 잘라 낸다."""
+    from PIL import Image
+
+    dpi = min(dpi, MAX_PX / fig.get_figwidth())
+    old_dpi = fig.dpi
+    canvas = FigureCanvasAgg(fig)
+    fig.set_dpi(dpi)
+    try:
+        images = []
+        for _ in figures:
+            canvas.draw()
+            rgba = np.asarray(canvas.buffer_rgba())
+            if bbox is not None:
+                H, W = rgba.shape[:2]
+                x0, x1 = max(int(bbox.x0 * dpi), 0), min(int(np.ceil(bbox.x1 * dpi)), W)
+                y0, y1 = max(H - int(np.ceil(bbox.y1 * dpi)), 0), min(H - int(bbox.y0 * dpi), H)
+                rgba = rgba[y0:y1, x0:x1]
+            images.append(Image.fromarray(np.ascontiguousarray(rgba[..., :3])))
+        return images
+    finally:
+        fig.set_dpi(old_dpi)
+
+
+def encode_frames(images, preset: str, period_ms: int = PERIOD_MS) -> bytes:
+    """프레임 목록 → 무한 반복 애니메이션 WebP (품질은 animation_preset 의 프리셋)"""
+    _, _, quality = PRESETS[animation_preset(preset)]
+    duration = max(period_ms // len(images), 20)
+    buf = BytesIO()
+    images[0].save(buf, format="WEBP", save_all=True, append_images=images[1:],
+                   duration=duration, loop=0, quality=quality, method=4)
+    return buf.getvalue()
+
+
+def encode(scene, currents, preset: str, *args) -> bytes:
+    """장면의 교류 한 주기 (scene.animate) → 애니메이션 바이트"""
+    dpi = min(PRESETS[animation_preset(preset)][1], ANIM_DPI)
+    return encode_frames(render_frames(scene.fig, scene.animate(currents, *args),
+                                       scene.bbox, dpi), preset)
+
+
+# ============================================================
+#  탐구 과제 – 2D 단면 장면 공통
+# ============================================================
+class PlaneScene:
+    """
+    고정 자석 자기장 + 코일 자기장 × I(t) 의 단면 그림.
+    색은 log|B|, 화살표는 방향. 색 범위는 한 주기 전체에서 한 번 정해 고정한다.
+    하위 클래스는 magnet_field(), coil_unit_field(), draw_parts(), update_parts(I, s) 를 정한다.
+    """
+
+    EXTENT = (-3.0, 3.0, -2.0, 2.0)
+    SHAPE = (81, 121)
+    bbox = None
+
+    def __init__(self, title: str):
+        x0, x1, y0, y1 = self.EXTENT
+        self.X, self.Y = np.meshgrid(np.linspace(x0, x1, self.SHAPE[1]),
+                                     np.linspace(y0, y1, self.SHAPE[0]))
+        self.fig = Figure(figsize=(6.4, 4.6))
+        ax = self.ax = self.fig.add_subplot()
+        self.image = ax.imshow(np.zeros(self.SHAPE), extent=self.EXTENT, origin="lower",
+                               cmap="YlOrRd", alpha=0.8, interpolation="bilinear")
+        self.q = (slice(5, None, 10), slice(5, None, 10))
+        zeros = np.zeros_like(self.X[self.q])
+        self.arrows = ax.quiver(self.X[self.q], self.Y[self.q], zeros, zeros, color="k",
+                                pivot="mid", scale=30, width=0.004, alpha=0.7)
+        self.draw_parts(ax)
+        self.label = ax.text(0.02, 0.96, "", transform=ax.transAxes, va="top", fontsize=11,
+                             bbox=dict(boxstyle="round", fc="w", alpha=0.8))
+        ax.set_xlim(x0, x1); ax.set_ylim(y0, y1); ax.set_aspect("equal")
+        ax.set_xticks([]); ax.set_yticks([])
+        ax.set_title(title)
+        self.fig.tight_layout()
+        if type(self).bbox is None:
+            type(self).bbox = self.fig.get_tightbbox(
+                FigureCanvasAgg(self.fig).get_renderer()).padded(0.1)
+
+    def field_frames(self, currents):
+        """(Bx, By) 각각 (frames, H, W) – 자석 자기장은 그대로, 코일 자기장만 전류배"""
+        mx, my = self.magnet_field()
+        cx, cy = self.coil_unit_field()
+        return mx + ac_field(cx, currents), my + ac_field(cy, currents)
+
+    def animate(self, currents):
+        Bx, By = self.field_frames(currents)
+        B = np.hypot(Bx, By)
+        logB = np.log10(B + 1e-12)
+        self.image.set_clim(*np.percentile(logB, [2, 98]))
+        q = (slice(None),) + self.q
+        n = B[q] + 1e-30
+        U, V = Bx[q] / n, By[q] / n
+        peak = np.abs(currents).max() or 1.0
+        for k, current in enumerate(currents):
+            self.image.set_data(logB[k])
+            self.arrows.set_UVC(U[k], V[k])
+            self.update_parts(current, current / peak)
+            self.label.set_text(f"I = {current:+.2f} A")
+            yield self.fig
+
+
+def _coil_gain(cx, cy, mx, my, near):
+    """코일 자기장(1 A)을 자석 자기장과 견줄 만한 크기로 맞추는 배율 (개념도용)"""
+    return 0.6 * np.median(np.hypot(mx, my)[near]) / np.median(np.hypot(cx, cy)[near])
+
+
+def _conductor(ax, x, y):
+    """종이면에 수직인 도선 단면 – 흰 원 + 안쪽 표시 (x: 들어감, 점: 나옴) 의 (원, 표시)"""
+    ring = ax.scatter([x], [y], s=220, facecolors="w", edgecolors="k", linewidths=2, zorder=6)
+    return ring, ax.plot([x], [y], color="k", ms=9, mew=2.5, zorder=7)[0]
+
+
+def _set_current(mark, sign):
+    """도선 단면 표시 – sign > 0 들어감(×), < 0 나옴(•), 0 이면 빈 원"""
+    mark.set_marker("x" if sign > 0 else "o" if sign < 0 else "")
+    mark.set_markersize(9 if sign > 0 else 5)
+
+
+def _wire_field_2d(X, Y, x, y, sign):
+    """종이면에 수직인 무한 직선 도선 (x, y) 의 2D 자기장 ∝ 1/r (sign=+1 이면 종이에서 나오는 전류)"""
+    dx, dy = X - x, Y - y
+    r2 = dx * dx + dy * dy + 1e-3
+    return -sign * dy / r2, sign * dx / r2
+
+
+# ============================================================
+#  스피커 – 영구 자석 틈의 지름 방향 자기장 속 보이스 코일
+# ============================================================
+class SpeakerScene(PlaneScene):
+    """
+    원통형 스피커의 세로 단면 (가로 x: 반지름 방향, 세로: 축 방향).
+    가운데 극(N)과 바깥 고리(S) 사이 틈에 지름 방향 자기장이 있고, 틈 속 보이스 코일
+    (x = ±1) 에 전류가 흐르면 F = IL×B 가 축 방향 – 전류가 바뀌면 힘도 바뀌어 진동판이 떤다.
+    """
+
+    GAP = 1.0             # 코일 반지름 (틈 가운데)
+    COIL_Z = 0.2
+    SWING = 0.25          # 진동판 최대 변위 (그림 단위)
+
+    def __init__(self):
+        super().__init__("스피커 단면: 교류 → 코일이 받는 힘의 방향이 바뀜")
+
+    def magnet_field(self):
+        z = np.linspace(-0.6, 0.6, 7)
+        inner = [(s * 0.75, zz) for s in (-1, 1) for zz in z]
+        outer = [(s * 1.3, zz) for s in (-1, 1) for zz in z]
+        return pole_field(self.X, self.Y, inner + outer, [1.0] * len(inner) + [-1.0] * len(outer))
+
+    def coil_unit_field(self):
+        # 원통 코일 (4바퀴) – 단면의 자오면 자기장
+        br, bz = solenoid_field(self.X, self.Y - self.COIL_Z, self.GAP, 0.5, 4, 1.0)
+        cx, cy = br * np.sign(self.X), bz
+        g = _coil_gain(cx, cy, *self.magnet_field(),
+                       np.abs(np.abs(self.X) - self.GAP) < 0.6)
+        return cx * g, cy * g
+
+    def draw_parts(self, ax):
+        for x, w, label in ((-0.75, 1.5, "N"), (-1.8, 0.5, "S"), (1.3, 0.5, "S")):
+            ax.add_patch(Rectangle((x, -1.6), w, 2.2, fc="#DC143C" if label == "N" else "#4169E1",
+                                   ec="k", alpha=0.85, zorder=3))
+            ax.text(x + w / 2, -1.1, label, color="w", ha="center", weight="bold", zorder=4)
+        self.coil = [_conductor(ax, s * self.GAP, self.COIL_Z) for s in (-1, 1)]
+        (self.cone,) = ax.plot([], [], color="#555", lw=3, zorder=5)
+        self.force = ax.quiver([-self.GAP, self.GAP], [self.COIL_Z] * 2, [0, 0], [0, 0],
+                               color="#2e7d32", scale=1, scale_units="xy", angles="xy",
+                               width=0.012, zorder=7)
+
+    def update_parts(self, current, s):
+        dz = -self.SWING * s                 # I > 0 (위에서 보아 반시계) → F = IL×B 아래로
+        for (ring, mark), side in zip(self.coil, (-1, 1)):
+            # 오른쪽(x>0)에서 반시계 전류는 종이로 들어가는 방향, 왼쪽은 나오는 방향
+            _set_current(mark, 0 if abs(s) < 0.05 else side * s)
+            ring.set_offsets([[side * self.GAP, self.COIL_Z + dz]])
+            mark.set_ydata([self.COIL_Z + dz])
+        x = np.array([-2.6, -self.GAP, self.GAP, 2.6])
+        self.cone.set_data(x, np.array([1.5, 0.8, 0.8, 1.5]) + dz * np.array([0.3, 1, 1, 0.3]))
+        self.force.set_offsets([[-self.GAP, self.COIL_Z + dz], [self.GAP, self.COIL_Z + dz]])
+        self.force.set_UVC([0, 0], [-0.9 * s] * 2)
+        self.force.set_visible(abs(s) >= 0.05)
+
+
+# ============================================================
+#  전동기 – 두 자극 사이 코일 (정류자 없이 교류)
+# ============================================================
+class MotorScene(PlaneScene):
+    """
+    전동기 끝에서 본 단면: 왼쪽 N, 오른쪽 S 사이 균일한 자기장 속 코일의 두 변 (x = ±0.9).
+    두 변의 전류가 반대라 힘도 반대 – 돌림힘. 교류면 반 주기마다 돌림힘 방향이 바뀐다.
+    """
+
+    SIDE = 0.9
+
+    def __init__(self):
+        super().__init__("전동기 단면: 교류 → 돌림힘 방향이 반 주기마다 바뀜")
+
+    def magnet_field(self):
+        y = np.linspace(-1.4, 1.4, 15)
+        poles = [(-2.3, yy) for yy in y] + [(2.3, yy) for yy in y]
+        return pole_field(self.X, self.Y, poles, [1.0] * len(y) + [-1.0] * len(y))
+
+    def coil_unit_field(self):
+        lx, ly = _wire_field_2d(self.X, self.Y, -self.SIDE, 0, 1)      # 왼쪽 변: 나옴
+        rx, ry = _wire_field_2d(self.X, self.Y, self.SIDE, 0, -1)      # 오른쪽 변: 들어감
+        cx, cy = lx + rx, ly + ry
+        g = _coil_gain(cx, cy, *self.magnet_field(),
+                       np.hypot(np.abs(self.X) - self.SIDE, self.Y) < 0.6)
+        return cx * g, cy * g
+
+    def draw_parts(self, ax):
+        for x, label, color in ((-3.0, "N", "#DC143C"), (2.3, "S", "#4169E1")):
+            ax.add_patch(Rectangle((x, -1.6), 0.7, 3.2, fc=color, ec="k", zorder=3))
+            ax.text(x + 0.35, 0, label, color="w", ha="center", va="center",
+                    weight="bold", fontsize=14, zorder=4)
+        ax.plot([-self.SIDE, self.SIDE], [0, 0], color="#b87333", lw=2, ls="--", zorder=4)
+        self.coil = [_conductor(ax, x, 0) for x in (-self.SIDE, self.SIDE)]
+        self.force = ax.quiver([-self.SIDE, self.SIDE], [0, 0], [0, 0], [0, 0],
+                               color="#2e7d32", scale=1, scale_units="xy", angles="xy",
+                               width=0.012, zorder=7)
+        self.torque = ax.text(0, -1.85, "", ha="center", fontsize=11, zorder=6)
+
+    def update_parts(self, current, s):
+        on = abs(s) >= 0.05
+        # I > 0: 왼쪽 변 나옴 (F = ẑ×x̂ = +ŷ 위), 오른쪽 변 들어감 (아래) → 시계 방향
+        _set_current(self.coil[0][1], -s if on else 0)
+        _set_current(self.coil[1][1], s if on else 0)
+        self.force.set_UVC([0, 0], [0.9 * s, -0.9 * s])
+        self.force.set_visible(on)
+        self.torque.set_text("" if not on else
+                             f"돌림힘: {'시계' if s > 0 else '반시계'} 방향")
+
+
+if __name__ == "__main__":
+    import time
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    from figure_output import encode as encode_still
+    from scenes3d import WireScene, LoopScene, SolenoidScene
+
+    # 배치 자기장 = 프레임마다 따로 계산한 것
+    from field_engine import biot_savart, straight_wire
+    pts = np.random.default_rng(0).normal(size=(30, 3)) * 2
+    cur = ac_currents(3.0)
+    batched = ac_field(biot_savart(pts, *straight_wire(10.0), 1.0), cur)
+    assert np.allclose(batched, [biot_savart(pts, *straight_wire(10.0), c) for c in cur])
+
+    scenes = {
+        "직선 도선": (WireScene(), ()),
+        "원형 도선": (LoopScene(), (1.5,)),
+        "솔레노이드": (SolenoidScene(), (15,)),
+        "스피커": (SpeakerScene(), ()),
+        "전동기": (MotorScene(), ()),
+    }
+    for name, (scene, args) in scenes.items():
+        t = time.perf_counter()
+        images = render_frames(scene.fig, scene.animate(cur, *args), scene.bbox,
+                               min(PRESETS["WebP"][1], ANIM_DPI))
+        t_draw = time.perf_counter() - t
+        still = encode_still(scene.fig, "WebP", bbox_inches=scene.bbox)   # 마지막 프레임 한 장
+        line = f"[{name}] 프레임 {len(images)}장 그리기 {t_draw*1e3:5.0f} ms"
+        for preset in ("WebP", "저대역"):
+            t = time.perf_counter()
+            data = encode_frames(images, preset)
+            line += f" | {preset} {len(data)/1e3:6.1f} kB {(time.perf_counter()-t)*1e3:4.0f} ms"
+        print(line + f" (정지 WebP {len(still)/1e3:.1f} kB)")
+    assert all(animation_preset(p) in ("WebP", "저대역") for p in PRESETS)
+    print("한 번 만든 애니메이션은 매개변수별로 캐시 – 재생은 브라우저가 하므로 이후 서버 비용 0")
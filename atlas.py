@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+자기장 아틀라스 – 모든 슬라이더 조합의 격자를 미리 계산해 둔 파일 하나
+
+    python atlas.py build              # field_atlas.bin 생성 (자기력선 포함)
+    python atlas.py build --no-lines   # 격자만
+    python atlas.py info               # 버전·항목 수·크기 확인
+
+파일 구조: MAGIC(8) | 헤더 길이(uint64) | 헤더 JSON | 0 채움 | 데이터
+데이터 블록은 64 바이트 경계에 놓이고, 내용이 같은 배열(공통 X, Y 격자 등)은
+한 번만 저장한다. 앱은 파일을 np.memmap 으로 열어 필요한 부분을 복사 없이
+배열로 본다 – 운영체제가 페이지를 공유하므로 작업 프로세스가 여럿이어도
+메모리는 한 벌이다.
+
+헤더의 source 는 계산 모듈 소스의 해시이다. 계산 코드가 바뀌면 해시가 달라져
+앱은 낡은 아틀라스를 쓰지 않고 직접 계산한다.
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"FATLAS\x00\x01"
+FORMAT_VERSION = 1
+ALIGN = 64
+DEFAULT_PATH = Path(__file__).with_name("field_atlas.bin")
+# 격자 값에 영향을 주는 모듈 – 하나라도 바뀌면 아틀라스를 다시 만들어야 한다
+SOURCES = ["field_grids.py", "field_engine.py", "magnets.py", "adaptive.py",
+           "field_lines.py", "loop_field.py", "solenoid.py", "compass.py"]
+
+
+def source_version() -> str:
+    """계산 모듈 소스 해시 (16자리)"""
+    h = hashlib.sha1()
+    for name in SOURCES:
+        h.update((Path(__file__).with_name(name)).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def key_str(key) -> str:
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+# ============================================================
+#  빌드
+# ============================================================
+def build(path=DEFAULT_PATH, lines: bool = True, log=print):
+    """field_grids 의 모든 슬라이더 키를 계산해 path 에 기록 (임시 파일 → 교체)"""
+    import field_grids
+
+    keys = list(field_grids.slider_keys(lines=lines))
+    entries, blocks = {}, {}
+    offset = 0
+    t0 = time.perf_counter()
+    with tempfile.TemporaryFile() as data:
+        for i, key in enumerate(keys, 1):
+            refs = []
+            for a in field_grids.compute(key):
+                a = np.ascontiguousarray(a)
+                digest = hashlib.sha1(a.tobytes()).hexdigest() + a.dtype.str + str(a.shape)
+                if digest not in blocks:
+                    pad = -offset % ALIGN
+                    data.write(b"\0" * pad)
+                    offset += pad
+                    blocks[digest] = offset
+                    data.write(a.tobytes())
+                    offset += a.nbytes
+                refs.append([blocks[digest], a.dtype.str, list(a.shape)])
+            entries[key_str(key)] = refs
+            if i % 50 == 0 or i == len(keys):
+                log(f"  {i}/{len(keys)}  {offset/1e6:6.1f} MB  {time.perf_counter()-t0:5.1f} s")
+
+        header = json.dumps({"format": FORMAT_VERSION, "source": source_version(),
+                             "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                             "entries": entries}, ensure_ascii=False).encode("utf-8")
+        head = len(MAGIC) + 8 + len(header)
+        head += -head % ALIGN
+        tmp = Path(path).with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            f.write(b"\0" * (head - f.tell()))
+            data.seek(0)
+            while chunk := data.read(1 << 24):
+                f.write(chunk)
+        os.replace(tmp, path)
+    log(f"{path}: 항목 {len(entries)}개, 배열 {len(blocks)}개, {(head + offset)/1e6:.1f} MB")
+
+
+# ============================================================
+#  읽기
+# ============================================================
+class Atlas:
+    """memmap 으로 연 아틀라스 – get(key) 는 파일 페이지를 그대로 보는 읽기 전용 배열 튜플"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._mm = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if bytes(self._mm[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path}: 아틀라스 파일이 아닙니다")
+        (n,) = struct.unpack("<Q", bytes(self._mm[len(MAGIC):len(MAGIC) + 8]))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(self._mm[start:start + n]).decode("utf-8"))
+        self._data = start + n + (-(start + n) % ALIGN)
+        self.format = header["format"]
+        self.source = header["source"]
+        self.created = header["created"]
+        self._entries = header["entries"]
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mm)
+
+    def get(self, key):
+        refs = self._entries.get(key_str(key))
+        if refs is None:
+            return None
+        self.hits += 1
+        out = []
+        for off, dtype, shape in refs:
+            dtype = np.dtype(dtype)
+            start = self._data + off
+            count = int(np.prod(shape)) * dtype.itemsize
+            out.append(self._mm[start:start + count].view(dtype).reshape(shape))
+        return tuple(out)
+
+
+def open_atlas(path=DEFAULT_PATH):
+    """(Atlas 또는 None, 상태 문구). 파일이 없거나 계산 코드와 버전이 다르면 None"""
+    if not Path(path).exists():
+        return None, "아틀라스 없음 (python atlas.py build 로 생성)"
+    try:
+        atlas = Atlas(path)
+    except (ValueError, KeyError, OSError) as e:
+        return None, f"아틀라스 읽기 실패: {e}"
+    if atlas.format != FORMAT_VERSION or atlas.source != source_version():
+        return None, "아틀라스가 계산 코드보다 오래됨 – 다시 빌드하세요"
+    return atlas, (f"아틀라스 {atlas.created} · 항목 {len(atlas)}개 · "
+                   f"{atlas.nbytes/1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="자기장 아틀라스 빌드/확인")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("-o", "--output", default=str(DEFAULT_PATH))
+    parser.add_argument("--no-lines", action="store_true", help="자기력선은 넣지 않음")
+    args = parser.parse_args()
+    if args.command == "build":
+        build(args.output, lines=not args.no_lines)
+    else:
+        atlas, status = open_atlas(args.output)
+        print(status)
+        if atlas is not None:
+            import field_grids
+            key = next(field_grids.slider_keys())
+            t = time.perf_counter()
+            arrays = atlas.get(key)
+            print(f"{key} 읽기 {1e6*(time.perf_counter()-t):.0f} μs, "
+                  f"복사 없음: {all(not a.flags.owndata for a in arrays)}")
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+프로세스 전체에서 공유하는 메모리 상한(바이트) LRU 캐시
+
+스트림릿은 세션마다 스크립트를 다시 실행하지만 import 된 모듈은
+프로세스에 하나만 남으므로, 여기 둔 캐시는 모든 학생 세션이 함께 쓴다.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def quantize(value: float, step: float) -> int:
+    """슬라이더 값을 step 단위 정수로 양자화 (부동소수 오차로 키가 갈라지지 않게)"""
+    return int(round(float(value) / step))
+
+
+def nbytes_of(value) -> int:
+    """캐시 값이 차지하는 대략적인 바이트 수 (ndarray / bytes / 튜플·리스트)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes_of(v) for v in value)
+    return 64
+
+
+class ByteLRU:
+    """총 바이트 수로 제한되는 스레드 안전 LRU 캐시 (적중/실패 횟수 집계)"""
+
+    def __init__(self, max_bytes: int, name: str = ""):
+        self.max_bytes = max_bytes
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = nbytes_of(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, old) = self._data.popitem(last=False)
+                self.nbytes -= old
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """캐시에 있으면 반환, 없으면 compute() 결과를 저장 후 반환.
+
+        같은 키를 여러 세션이 동시에 요청하면 한 세션만 계산하고
+        나머지는 그 결과를 기다린다 (교실 30명 → 계산 1회).
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            event = self._pending.get(key)
+            if event is None:
+                self.misses += 1
+                event = self._pending[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            event.wait()
+            with self._lock:
+                if key in self._data:
+                    self.hits += 1
+                    return self._data[key][0]
+            return self.get_or_compute(key, compute)
+        try:
+            value = compute()
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+            elif isinstance(value, tuple):
+                for v in value:
+                    if isinstance(v, np.ndarray):
+                        v.setflags(write=False)
+            return self.put(key, value)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            event.set()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        """적중/실패 집계 없이 들어 있는지만 확인"""
+        with self._lock:
+            return key in self._data
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._data),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# 자기장 격자(X, Y, Bx, By) 캐시 – page_simulation 슬라이더 값 기준
+FIELD_CACHE = ByteLRU(64 * 1024 * 1024, name="field")
+# 인코딩된 그림(PNG 바이트) 캐시 – page_simulation / page_theory 그림 매개변수 기준
+FIGURE_CACHE = ByteLRU(128 * 1024 * 1024, name="figure")
+# 확대·이동 보기 타일 (level, x, y, 매개변수) – 학생들이 같은 타일을 함께 쓴다
+TILE_CACHE = ByteLRU(64 * 1024 * 1024, name="tile")
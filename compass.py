@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+나침반 격자 시뮬레이터 – 직선 도선 · 원형 도선 · 솔레노이드 + 지구 자기장
+
+책상(수평면 z=0) 위에 나침반을 격자로 늘어놓고, 도선 자기장의 수평 성분에
+지구 자기장(북쪽)을 더해 모든 자침의 평형 방향을 한 번의 NumPy 계산으로 구한다.
+좌표: x = 동쪽, y = 북쪽, z = 위쪽.  길이 단위는 cm, 자기장은 T.
+도선 자기장은 전류에 비례하므로 단위 전류 결과에 I 를 곱해 쓰면 된다.
+
+    python compass.py          # 나침반 400개 계산 시간
+"""
+import numpy as np
+
+from field_engine import biot_savart, polyline_segments
+from loop_field import loop_field, solenoid_field
+
+CM = 0.01
+EARTH_FIELD = 30e-6     # 우리나라 지구 자기장 수평 성분 ≈ 30 μT
+WIRE_LENGTH = 200.0     # 직선 도선 길이 (cm) – 책상 위에서는 무한 도선과 같다
+
+
+def needle_grid(half_width: float = 6.0, n: int = 13):
+    """책상 위 (2·half_width cm)² 영역의 n×n 나침반 위치"""
+    g = np.linspace(-half_width, half_width, n)
+    return np.meshgrid(g, g)
+
+
+def _desk_points(X, Y):
+    return np.stack([X, Y, np.zeros_like(X)], axis=-1) * CM
+
+
+def straight_wire_field(X, Y, height: float, current=1.0):
+    """남북 방향 직선 도선(나침반 위 height cm, 전류 +: 북→남)의 수평 성분 (Bx, By)"""
+    path = np.array([[0.0, WIRE_LENGTH / 2, height],
+                     [0.0, -WIRE_LENGTH / 2, height]]) * CM
+    B = biot_savart(_desk_points(X, Y), *polyline_segments(path), current)
+    return B[..., 0], B[..., 1]
+
+
+def loop_field_horizontal(X, Y, radius: float, current=1.0):
+    """남북 방향 연직면에 세운 원형 도선(중심 = 원점, 축 = 동서)의 (Bx, By).
+    전류 + 이면 중심에서 동쪽 자기장."""
+    Brho, Bax = loop_field(np.abs(Y) * CM, X * CM, radius * CM, current)
+    return Bax, Brho * np.sign(Y)
+
+
+def solenoid_field_horizontal(X, Y, radius: float, length: float, turns: int,
+                              current=1.0):
+    """축이 동서 방향이고 책상 높이에 놓인 솔레노이드의 (Bx, By).
+    전류 + 이면 내부 자기장이 동쪽."""
+    Brho, Bax = solenoid_field(np.abs(Y) * CM, X * CM, radius * CM,
+                               length * CM, turns, current)
+    return Bax, Brho * np.sign(Y)
+
+
+def needle_directions(Bx, By, earth: float = EARTH_FIELD):
+    """(도선 + 지구 자기장)의 수평 방향 → 자침 N극 단위벡터 (u, v).
+    자기장이 0 인 곳은 북쪽을 가리킨 채로 둔다."""
+    bx, by = np.asarray(Bx, dtype=float), np.asarray(By, dtype=float) + earth
+    n = np.hypot(bx, by)
+    still = n == 0
+    n = np.where(still, 1.0, n)
+    return np.where(still, 0.0, bx / n), np.where(still, 1.0, by / n)
+
+
+def deflection_deg(u, v):
+    """북쪽에서 동쪽으로 잰 자침 회전각 (도)"""
+    return np.degrees(np.arctan2(u, v))
+
+
+def draw_compasses(ax, X, Y, u, v, size: float = 0.8):
+    """나침반 전체를 quiver 한 번으로 – 빨간 화살촉 쪽이 N극"""
+    return ax.quiver(X, Y, u * size, v * size, color="#DC143C", pivot="mid",
+                     angles="xy", scale_units="xy", scale=1, width=0.006,
+                     headwidth=3, headlength=3.5, headaxislength=3, zorder=4)
+
+
+if __name__ == "__main__":
+    import time
+
+    X, Y = needle_grid(6.0, 20)
+    cases = {
+        "직선 도선 (높이 2 cm)": lambda: straight_wire_field(X, Y, 2.0),
+        "원형 도선 (R = 3 cm)": lambda: loop_field_horizontal(X, Y, 3.0),
+        "솔레노이드 (100회)": lambda: solenoid_field_horizontal(X, Y, 1.5, 8.0, 100),
+    }
+    print(f"나침반 {X.size}개")
+    for name, field in cases.items():
+        t = time.perf_counter()
+        Bx, By = field()
+        u, v = needle_directions(3.0 * Bx, 3.0 * By)
+        dt = time.perf_counter() - t
+        c = np.unravel_index(np.argmin(np.hypot(X, Y)), X.shape)
+        print(f"  {name}: {dt*1e3:6.2f} ms, 중심 자침 {deflection_deg(u[c], v[c]):+6.1f}°")
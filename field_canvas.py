@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+브라우저 캔버스 자기장 그림 (스트림릿 사용자 컴포넌트)
+
+서버는 matplotlib 으로 PNG 를 만들지 않고, 작은 이진 배열만 보낸다.
+
+    logb    – 세기 1 의 log10|B| 격자, uint16 양자화 (H, W)
+    lines   – 자기력선 좌표 (x, y) 쌍, int16 ±32767 = 그림 중심 ± 가로·세로 폭
+              (추적기가 그림 밖으로 조금 나간 점도 잘리지 않게 두 배 범위)
+    offsets – 선마다 시작 위치 (uint32, 끝에 전체 점 수)
+
+스트림릿은 bytes 인자를 그대로 바이너리로 보내고, 브라우저는 이를
+Uint8Array 로 받아 타입 배열로 풀어 캔버스에 그린다 (field_canvas/index.html).
+자석 세기는 B 전체에 곱해지는 상수라 색 지도에서는 log|B| 에 log10 k 를
+더하는 평행이동일 뿐이므로, 세기 슬라이더는 브라우저 안에서만 움직이고
+서버를 다시 실행하지 않는다.
+
+    python field_canvas.py     # 같은 장면의 PNG 와 전송 바이트 비교
+"""
+from pathlib import Path
+
+import numpy as np
+import streamlit.components.v1 as components
+
+_component = components.declare_component(
+    "field_canvas", path=str(Path(__file__).with_name("field_canvas")))
+
+
+def pack_grid(logb):
+    """log10|B| (H, W) → (uint16 바이트, lo, hi). 자극 바로 위 발산값은 잘라 낸다"""
+    logb = np.asarray(logb, dtype=np.float64)
+    lo = float(logb.min())
+    hi = float(min(logb.max(), np.percentile(logb, 99.5) + 1.0))
+    q = np.round((np.clip(logb, lo, hi) - lo) / (hi - lo) * 65535)
+    return q.astype("<u2").tobytes(), lo, hi
+
+
+def pack_lines(lines, extent):
+    """폴리라인 목록 → (int16 좌표 바이트, uint32 시작 위치 바이트)"""
+    x0, x1, y0, y1 = extent
+    if not len(lines):
+        return b"", np.zeros(1, "<u4").tobytes()
+    xy = np.concatenate(lines)
+    q = np.empty(xy.shape, np.float64)
+    q[:, 0] = (xy[:, 0] - (x0 + x1) / 2) / (x1 - x0)
+    q[:, 1] = (xy[:, 1] - (y0 + y1) / 2) / (y1 - y0)
+    q = np.round(np.clip(q, -1, 1) * 32767).astype("<i2")
+    offsets = np.concatenate([[0], np.cumsum([len(ln) for ln in lines])]).astype("<u4")
+    return q.tobytes(), offsets.tobytes()
+
+
+def pack_bodies(halves):
+    """magnets.magnet_halves 결과 → [x, y, 각도, 길이, N 여부] 목록 (JSON)"""
+    return [[float(m[0]), float(m[1]), float(ang), float(gap), bool(is_n)]
+            for m, ang, gap, is_n in halves]
+
+
+def field_canvas(logb, lines, halves, extent, strength: float = 1.0,
+                 strength_range=(0.5, 5.0), strength_step: float = 0.1,
+                 title: str = "", key=None):
+    """
+    자기장 세기 색 지도 + 자기력선 + 자석을 브라우저 캔버스에 그린다.
+    logb 는 세기 1 의 log10|B| (extent 위 균일 격자), strength 는 세기 슬라이더
+    초기값이며 strength_range 안에서 브라우저가 직접 바꾼다. title 의 "{k}" 는
+    브라우저가 현재 세기로 바꿔 쓴다.
+    서버로 돌려주는 값은 없다 (항상 None).
+    """
+    grid, lo, hi = pack_grid(logb)
+    coords, offsets = pack_lines(lines, extent)
+    return _component(
+        logb=grid, shape=list(np.shape(logb)), logb_range=[lo, hi],
+        lines=coords, offsets=offsets, bodies=pack_bodies(halves),
+        extent=[float(v) for v in extent], strength=float(strength),
+        strength_range=[float(v) for v in strength_range],
+        strength_step=float(strength_step), title=title,
+        key=key, default=None)
+
+
+if __name__ == "__main__":
+    from io import BytesIO
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    import field_grids
+    from field_lines import draw_lines
+
+    extent = (-4, 4, -3, 3)
+    for layout, q, n_mag in (("S극-N극 (인력)", 25, 2), ("자석 고리", 0, 12)):
+        (logb,) = field_grids.compute(("logb", layout, q, n_mag))
+        lines = field_grids.compute(("lines", layout, q, n_mag))
+        grid, lo, hi = pack_grid(logb)
+        coords, offsets = pack_lines(lines, extent)
+        canvas = len(grid) + len(coords) + len(offsets)
+        # 양자화 오차 (int16 좌표, uint16 log|B|)
+        back = lo + np.frombuffer(grid, "<u2").reshape(logb.shape) / 65535 * (hi - lo)
+        keep = logb <= hi
+        err_log = np.abs(back - logb)[keep].max()
+        err_xy = np.abs(np.concatenate(lines)[:, 0] -
+                        np.frombuffer(coords, "<i2")[0::2] / 32767 * 8).max()
+
+        fig, ax = plt.subplots(figsize=(9, 6))
+        ax.imshow(logb, extent=extent, origin="lower", cmap="YlOrRd", alpha=0.8)
+        draw_lines(ax, lines, color="k", linewidth=1)
+        ax.set_xlim(-4, 4); ax.set_ylim(-3, 3); ax.set_aspect("equal")
+        buf = BytesIO()
+        fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+        plt.close(fig)
+        print(f"[{layout}] 캔버스 {canvas/1e3:6.1f} kB (격자 {len(grid)/1e3:.1f} + 선 "
+              f"{len(lines)}개 {(len(coords)+len(offsets))/1e3:.1f}) | PNG {len(buf.getvalue())/1e3:6.1f} kB"
+              f" | 오차 log|B| {err_log:.1e}, 좌표 {err_xy:.1e}")
+        print(f"    세기 바꾸기: 캔버스 0 B (브라우저 안) / PNG 매번 {len(buf.getvalue())/1e3:.0f} kB")
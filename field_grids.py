@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+슬라이더 값 → 자기장 격자 (앱 캐시와 아틀라스 빌드가 함께 쓰는 계산)
+
+키는 ("종류", 양자화된 슬라이더 값…) 튜플이며 compute(key) 가 그 값을 계산한다.
+모든 결과는 배열 튜플이다. 스트림릿을 import 하지 않으므로 atlas.py 같은
+오프라인 도구에서도 그대로 쓸 수 있다.
+"""
+import numpy as np
+
+import magnets
+import compass
+import adaptive
+from field_lines import pole_field_lines, seeds_per_pole
+from solenoid import solenoid_maps
+
+MAG_LEN = 1.2   # 막대자석 길이
+MAGNET_LAYOUTS = ["S극-N극 (인력)", "S극-S극 (척력)", "자석 고리", "자석 사슬"]
+COMPASS_SOL_RADIUS, COMPASS_SOL_LENGTH = 1.5, 8.0   # 나침반 실험 솔레노이드 (cm)
+LINE_DENSITY = 2.0      # 자기력선 그림 밀도 – 예전 streamplot(density=2.0) 과 같게
+
+# 키에 들어가는 양자화 간격 – streamlit_app 의 quantize 호출과 같아야 한다
+STRENGTH_STEP = 0.1
+DISTANCE_STEP = 0.1
+COMPASS_STEP = 0.1
+
+
+def magnet_layout(layout: str, distance: float, n_mag: int):
+    """배치 이름 → 자극 배열 (세기 1). 고리·사슬은 n_mag 개, 두 자석은 distance 사용"""
+    if layout == "자석 고리":
+        return magnets.ring(n_mag, 2.2)
+    if layout == "자석 사슬":
+        return magnets.chain(n_mag, 7.0)
+    return magnets.pair(layout.startswith("S극-N극"), distance)
+
+
+# ============================================================
+#  종류별 계산
+# ============================================================
+def bar_grid(q_strength: int, n: int):
+    """막대자석 주위 (X, Y, Bx, By) n×n – 자극 근처만 촘촘한 적응형 샘플을 보간"""
+    poles = magnets.bar_magnet((0, 0), 90.0, MAG_LEN, q_strength * STRENGTH_STEP)
+    tree = adaptive.sample(lambda X, Y: magnets.superpose(poles, X, Y), (-3, 3, -3, 3))
+    x = np.linspace(-3, 3, n)
+    X, Y = np.meshgrid(x, x)
+    Bx, By = tree.resample(x, x)
+    return X, Y, Bx, By
+
+
+def layout_lines(layout: str, q_distance: int, n_mag: int):
+    """자석 배치의 자기력선 폴리라인 튜플 (세기는 모양을 바꾸지 않으므로 키에 없음).
+    시작점은 자극마다 같은 수 – 자극이 많은 고리·사슬도 자석 하나 둘레는 두 자석 배치와 같은 밀도"""
+    poles = magnet_layout(layout, q_distance * DISTANCE_STEP, n_mag)
+    xy = np.stack([poles["x"], poles["y"]], axis=-1)
+    lines = pole_field_lines(xy, magnets.charges(poles), (-4, 4, -3, 3),
+                             n_per_pole=seeds_per_pole(LINE_DENSITY))
+    return tuple(lines)
+
+
+def layout_log_strength(layout: str, q_distance: int, n_mag: int):
+    """자석 배치의 세기 1 log10|B| (121, 161) float32 – 브라우저 캔버스 색 지도용.
+    세기 k' 는 log|B| 에 log10 k' 를 더할 뿐이라 키에 없다."""
+    poles = magnet_layout(layout, q_distance * DISTANCE_STEP, n_mag)
+    X, Y = np.meshgrid(np.linspace(-4, 4, 161), np.linspace(-3, 3, 121))
+    Bx, By = magnets.superpose(poles, X, Y)
+    return (np.log10(np.sqrt(Bx * Bx + By * By) + 1e-12).astype(np.float32),)
+
+
+def solenoid_grid(n_per_length: int):
+    """단위 전류 솔레노이드의 (z 축, 축 위 B(z), X, Z, Bx, Bz)"""
+    z_axis = np.linspace(-4.5, 4.5, 101)
+    B_axis, X, Z, Bx, Bz = solenoid_maps(
+        1.0, 6.0, n_per_length, z_axis,
+        np.linspace(-2.4, 2.4, 33), np.linspace(-4.5, 4.5, 41))
+    return z_axis, B_axis, X, Z, Bx, Bz
+
+
+def compass_grid(kind: str, q_size: int):
+    """단위 전류(1 A) 도선이 나침반 격자에 만드는 (X, Y, Bx, By).
+    size: 직선 도선 높이 / 원형 도선 반지름 (cm), 솔레노이드는 감은 수."""
+    size = q_size * COMPASS_STEP
+    X, Y = compass.needle_grid(6.0, 15)
+    if kind == "straight":
+        Bx, By = compass.straight_wire_field(X, Y, size)
+    elif kind == "loop":
+        Bx, By = compass.loop_field_horizontal(X, Y, size)
+    else:
+        Bx, By = compass.solenoid_field_horizontal(
+            X, Y, COMPASS_SOL_RADIUS, COMPASS_SOL_LENGTH, int(round(size)))
+    return X, Y, Bx, By
+
+
+_COMPUTE = {
+    "bar": bar_grid,
+    "lines": layout_lines,
+    "logb": layout_log_strength,
+    "solenoid": solenoid_grid,
+    "compass": compass_grid,
+}
+
+
+def compute(key):
+    """("종류", 인자…) 키 → 배열 튜플"""
+    return _COMPUTE[key[0]](*key[1:])
+
+
+# ============================================================
+#  슬라이더 전체 조합 – 앱의 st.slider 범위와 맞춘다
+# ============================================================
+def slider_keys(lines: bool = True):
+    """page_simulation · page_theory · 실험 페이지 슬라이더가 만들 수 있는 모든 키"""
+    for q in range(5, 51):                         # 자석 세기 0.5–5.0
+        for n in (161, 41):                        # 본 그림 / 미리보기
+            yield ("bar", q, n)
+    for kind in ("lines", "logb") if lines else ("logb",):
+        for layout in MAGNET_LAYOUTS[:2]:
+            for q in range(10, 41):                # 두 자석 거리 1.0–4.0
+                yield (kind, layout, q, 2)
+        for layout in MAGNET_LAYOUTS[2:]:
+            for n_mag in range(3, 25):
+                yield (kind, layout, 0, n_mag)
+    for n in range(5, 31):                         # 솔레노이드 n 5–30
+        yield ("solenoid", n)
+    for q in range(5, 51):                         # 직선 도선 높이 0.5–5.0 cm
+        yield ("compass", "straight", q)
+    for q in range(10, 51):                        # 원형 도선 반지름 1.0–5.0 cm
+        yield ("compass", "loop", q)
+    for turns in range(10, 201, 10):               # 솔레노이드 감은 수 10–200
+        yield ("compass", "solenoid", turns * 10)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+그림 전송 형식 – DPI·형식·압축 프리셋, 자동 저대역 모드, 그림별 전송 바이트 기록
+
+st.image 는 bytes 를 받으면 가로 1460 픽셀보다 큰 그림을 줄여 다시 인코딩하고,
+PNG·JPEG 가 아닌 형식은 PNG/JPEG 로 바꿔 버린다. 그래서 여기서는
+  - 래스터 그림을 처음부터 가로 MAX_PX 이하로 그리고,
+  - PNG 는 bytes 로, WebP·SVG 는 data: URL 로 넘긴다 (st.image 가 그대로 통과).
+이렇게 하면 캐시에 든 바이트가 곧 학생에게 가는 바이트이다.
+
+"자동" 은 최근 WINDOW 초 동안 이 프로세스가 보낸 그림 바이트로 교실 전체
+대역폭 사용을 가늠해, 한도를 넘으면 저대역 프리셋으로 내린다.
+
+    python figure_output.py    # 이론 정리 3D 그림 등을 프리셋별로 인코딩해 크기 비교
+"""
+import base64
+import threading
+import time
+from collections import deque
+from io import BytesIO
+
+# 이름: (형식, dpi, 품질)
+PRESETS = {
+    "고화질 PNG": ("png", 160, None),
+    "압축 PNG":  ("png8", 110, None),    # 256색 팔레트 + optimize
+    "WebP":      ("webp", 130, 85),
+    "SVG":       ("svg", 72, None),      # 벡터 – 선 그림은 작고, 3D·색 지도는 커질 수 있다
+    "저대역":     ("webp", 80, 60),
+}
+AUTO = "자동"
+AUTO_NORMAL, AUTO_LOW = "WebP", "저대역"
+CHOICES = [AUTO] + list(PRESETS)
+
+MAX_PX = 1400               # 래스터 가로 상한 – st.image 의 재인코딩 기준(1460) 아래
+WINDOW = 10.0               # 전송량을 재는 구간 (초)
+LOW_BANDWIDTH_BPS = 1.0e6   # 그림 전송이 평균 이보다 많으면 저대역 (≈ 8 Mbit/s)
+MIME = {"png": "image/png", "png8": "image/png", "webp": "image/webp",
+        "svg": "image/svg+xml"}
+
+
+# ============================================================
+#  인코딩
+# ============================================================
+def encode(fig, preset: str, dpi: int = None, bbox_inches="tight") -> bytes:
+    """figure → 프리셋 형식의 바이트 (figure 는 닫지 않는다). dpi 를 주면 프리셋 dpi 대신 사용.
+    bbox_inches 에 고정 범위(인치 Bbox)를 주면 "tight" 계산용 추가 그리기를 생략한다."""
+    fmt, preset_dpi, quality = PRESETS[preset]
+    dpi = min(dpi or preset_dpi, MAX_PX / fig.get_figwidth())
+    buf = BytesIO()
+    if fmt == "svg":
+        fig.savefig(buf, format="svg", bbox_inches=bbox_inches)
+    elif fmt == "webp":
+        fig.savefig(buf, format="webp", dpi=dpi, bbox_inches=bbox_inches,
+                    pil_kwargs={"quality": quality, "method": 4})
+    elif fmt == "png8":
+        from PIL import Image
+
+        fig.savefig(buf, format="png", dpi=dpi, bbox_inches=bbox_inches,
+                    pil_kwargs={"compress_level": 1})
+        img = Image.open(BytesIO(buf.getvalue())).convert("RGB").quantize(256)
+        buf = BytesIO()
+        img.save(buf, format="PNG", optimize=True)
+    else:
+        fig.savefig(buf, format="png", dpi=dpi, bbox_inches=bbox_inches)
+    return buf.getvalue()
+
+
+def image_arg(data: bytes, preset: str):
+    """st.image 에 넘길 값과 실제로 전송되는 바이트 수"""
+    fmt = PRESETS[preset][0]
+    if fmt in ("png", "png8"):
+        return data, len(data)
+    url = f"data:{MIME[fmt]};base64,{base64.b64encode(data).decode('ascii')}"
+    return url, len(url)
+
+
+# ============================================================
+#  전송 기록 & 자동 모드
+# ============================================================
+class FigureLog:
+    """그림을 보낼 때마다 (시각, 그림, 프리셋, 바이트, 캐시 적중) 기록 – 프로세스 공유"""
+
+    def __init__(self, maxlen: int = 2000):
+        self._lock = threading.Lock()
+        self.records = deque(maxlen=maxlen)
+        self.totals = {}              # (그림, 프리셋) → [횟수, 바이트]
+        self.low = False              # 자동 모드가 지금 저대역인지
+
+    def record(self, name: str, preset: str, nbytes: int, hit: bool):
+        with self._lock:
+            self.records.append((time.time(), name, preset, nbytes, hit))
+            t = self.totals.setdefault((name, preset), [0, 0])
+            t[0] += 1
+            t[1] += nbytes
+
+    def rate(self, window: float = WINDOW) -> float:
+        """최근 window 초 평균 전송량 (바이트/초)"""
+        now = time.time()
+        with self._lock:
+            sent = sum(r[3] for r in self.records if now - r[0] <= window)
+        return sent / window
+
+    def auto_preset(self) -> str:
+        """전송량이 한도를 넘으면 저대역, 절반 아래로 내려오면 원래대로 (오락가락 방지)"""
+        rate = self.rate()
+        if rate > LOW_BANDWIDTH_BPS:
+            self.low = True
+        elif rate < LOW_BANDWIDTH_BPS / 2:
+            self.low = False
+        return AUTO_LOW if self.low else AUTO_NORMAL
+
+    def summary(self):
+        """[(그림, 프리셋, 횟수, 평균 바이트, 총 바이트)] – 총 바이트 큰 순"""
+        with self._lock:
+            rows = [(name, preset, n, b / n, b) for (name, preset), (n, b) in self.totals.items()]
+        return sorted(rows, key=lambda r: -r[4])
+
+
+FIGURE_LOG = FigureLog()
+
+
+def resolve(choice: str) -> str:
+    """사용자가 고른 항목 → 실제 프리셋 이름 ("자동" 이면 현재 전송량으로 결정)"""
+    return FIGURE_LOG.auto_preset() if choice == AUTO else choice
+
+
+if __name__ == "__main__":
+    import matplotlib
+    matplotlib.use("Agg")
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    from field_engine import straight_wire, biot_savart
+
+    def wire3d():
+        # page_theory 직선 도선 3D 그림과 같은 구성
+        fig = Figure(figsize=(6, 6))
+        ax = fig.add_subplot(111, projection="3d")
+        ax.view_init(elev=20, azim=-45)
+        ax.plot([0, 0], [0, 0], [-5, 5], color="red", lw=3)
+        theta = np.linspace(0, 2*np.pi, 100)
+        r, z = np.meshgrid(np.linspace(1, 3, 3), [-3, 0, 3], indexing="ij")
+        ang = np.linspace(0, 2*np.pi, 8, endpoint=False)
+        pts = np.stack(np.broadcast_arrays(r[..., None]*np.cos(ang), r[..., None]*np.sin(ang),
+                                           z[..., None]), axis=-1).reshape(-1, 3)
+        B = biot_savart(pts, *straight_wire(10.0), 2.0)
+        for rr, zz in zip(r.ravel(), z.ravel()):
+            ax.plot(rr*np.cos(theta), rr*np.sin(theta), zz, color="k", lw=1)
+        ax.quiver(*pts.T, *(B.T / np.abs(B).max()), color="k", arrow_length_ratio=0.4)
+        ax.set_xlabel("X"); ax.set_ylabel("Y"); ax.set_zlabel("Z")
+        return fig
+
+    def heatmap():
+        fig = Figure(figsize=(9, 6))
+        ax = fig.add_subplot()
+        x, y = np.meshgrid(np.linspace(-4, 4, 400), np.linspace(-3, 3, 300))
+        ax.imshow(np.log10(1 / ((x - 1) ** 2 + y ** 2 + 0.01) + 1 / ((x + 1) ** 2 + y ** 2 + 0.01)),
+                  extent=(-4, 4, -3, 3), origin="lower", cmap="YlOrRd")
+        return fig
+
+    for name, make in (("3D 도선", wire3d), ("색 지도", heatmap)):
+        fig = make()
+        old = BytesIO()
+        fig.savefig(old, format="png", dpi=200, bbox_inches="tight")
+        base = len(old.getvalue())
+        print(f"[{name}] 이전 방식 PNG dpi 200: {base/1e3:7.1f} kB")
+        for preset in PRESETS:
+            t = time.perf_counter()
+            data = encode(fig, preset)
+            dt = time.perf_counter() - t
+            _, sent = image_arg(data, preset)
+            print(f"  {preset:8s} 전송 {sent/1e3:7.1f} kB ({sent/base:5.1%}) 인코딩 {dt*1e3:5.0f} ms")
+        print(f"  학생 30명 동시 재실행: 이전 {30*base/1e6:.1f} MB → 저대역 "
+              f"{30*image_arg(encode(fig, '저대역'), '저대역')[1]/1e6:.1f} MB")
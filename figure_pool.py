@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+matplotlib Figure 풀 – pyplot 전역 상태 없이 그림을 만들고 재사용
+
+plt.subplots / plt.figure 로 만든 그림은 pyplot 의 전역 그림 관리자가 붙잡고
+있어 plt.close 를 빠뜨리면 (예외로 중간에 빠져나가도) 영영 풀리지 않는다.
+여기서는 matplotlib.figure.Figure 를 직접 만든다. 그림은 풀만 알고 있으므로
+release() 로 비워 되돌리면 같은 크기의 다음 그림에 재사용되고, 되돌리지
+못한 그림도 참조가 끊기면 가비지 컬렉터가 회수한다.
+
+한 Figure 는 한 번에 한 스레드(세션)만 쓴다 – figure() 가 꺼내 주는 순간
+대기 목록에서 빠지기 때문이다.
+
+    python figure_pool.py [횟수]  # 재실행 1000회 동안 RSS 가 평평한지 확인 (pyplot 방식과 비교)
+    python -m pytest -q tests/test_figure_pool.py --runslow   # 같은 회귀 확인 (시험)
+"""
+import os
+import threading
+import weakref
+
+from matplotlib import rcParams
+from matplotlib.figure import Figure
+
+MAX_IDLE = 4      # 크기별로 대기시켜 두는 Figure 수
+
+
+class FigurePool:
+    """figsize 별 대기 Figure 목록 – figure() 는 빈 Figure 를, release() 는 비워서 되돌린다"""
+
+    def __init__(self, max_idle: int = MAX_IDLE):
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._live = weakref.WeakSet()
+        self.created = 0
+        self.reused = 0
+        self.dropped = 0
+
+    def figure(self, figsize=(6.4, 4.8)) -> Figure:
+        key = (float(figsize[0]), float(figsize[1]))
+        with self._lock:
+            idle = self._idle.get(key)
+            fig = idle.pop() if idle else None
+            if fig is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        if fig is None:
+            fig = Figure(figsize=key)
+            self._live.add(fig)
+        return fig
+
+    def subplots(self, nrows: int = 1, ncols: int = 1, figsize=(6.4, 4.8), **kwargs):
+        """plt.subplots 와 같은 (fig, axes) – 그림은 풀에서 꺼낸다"""
+        fig = self.figure(figsize)
+        return fig, fig.subplots(nrows, ncols, **kwargs)
+
+    def release(self, fig: Figure):
+        """그림을 비우고 (축·아티스트·여백 설정 초기화) 대기 목록에 되돌린다. 목록이 차면 버린다.
+        풀이 만들지 않은 그림(세션이 계속 쓰는 3D 장면 등)은 건드리지 않는다."""
+        if fig not in self._live:
+            return
+        fig.clear()
+        fig.subplots_adjust(**{k: rcParams[f"figure.subplot.{k}"]
+                               for k in ("left", "right", "bottom", "top", "wspace", "hspace")})
+        key = tuple(float(v) for v in fig.get_size_inches())
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if any(f is fig for f in idle):
+                return
+            if len(idle) < self.max_idle:
+                idle.append(fig)
+            else:
+                self.dropped += 1
+
+    def stats(self):
+        with self._lock:
+            idle = sum(len(v) for v in self._idle.values())
+        return {"created": self.created, "reused": self.reused, "dropped": self.dropped,
+                "idle": idle, "live": len(self._live)}
+
+
+FIGURES = FigurePool()
+
+
+def rss_bytes() -> int:
+    """현재 프로세스 상주 메모리 (리눅스 /proc, 없으면 최대 RSS 로 대신)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+if __name__ == "__main__":
+    import gc
+    import sys
+    import time
+    from io import BytesIO
+
+    import numpy as np
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (3d 투영 등록)
+
+    RERUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    x = np.linspace(-3, 3, 41)
+    X, Y = np.meshgrid(x, x)
+
+    def rerun(k: float, subplots, figure, release):
+        """앱 한 번 재실행에 해당하는 그림 세 장 (2D 흐름선, 색 지도, 3D) 그리기 + PNG 인코딩"""
+        fig, ax = subplots(figsize=(7, 7))
+        ax.streamplot(X, Y, -Y * k, X, density=0.6)
+        ax.set_title(f"k = {k:.1f}")
+        figs = [fig]
+        fig, (a1, a2) = subplots(1, 2, figsize=(12, 4.8))
+        a1.plot(x, np.exp(-x * x) * k)
+        a2.imshow(np.hypot(X, Y) * k, origin="lower")
+        fig.tight_layout()
+        figs.append(fig)
+        fig = figure(figsize=(6, 6))
+        ax = fig.add_subplot(111, projection="3d")
+        ax.quiver(X[::8, ::8], Y[::8, ::8], 0, -Y[::8, ::8], X[::8, ::8], k, length=0.3)
+        figs.append(fig)
+        for fig in figs:
+            fig.savefig(BytesIO(), format="png", dpi=40)
+            release(fig)
+
+    def measure(label, subplots, figure, release, runs):
+        for i in range(20):                                   # 준비 (폰트 캐시 등)
+            rerun(1.0 + i % 5, subplots, figure, release)
+        gc.collect()
+        base = rss_bytes()
+        t = time.perf_counter()
+        marks = []
+        for i in range(runs):
+            rerun(1.0 + (i % 50) / 10, subplots, figure, release)
+            if (i + 1) % (runs // 5) == 0:
+                gc.collect()
+                marks.append((rss_bytes() - base) / 1e6)
+        dt = time.perf_counter() - t
+        print(f"{label}: 재실행 {runs}회 {dt:5.1f} s, RSS 증가 "
+              + " → ".join(f"{m:+.1f}" for m in marks) + " MB")
+        return marks
+
+    marks = measure("FigurePool", FIGURES.subplots, FIGURES.figure, FIGURES.release, RERUNS)
+    print(f"풀 상태: {FIGURES.stats()}")
+    # 회귀 확인: 처음 1/5 이후로는 RSS 가 더 늘지 않아야 한다 (할당기 변동 여유 15 MB)
+    assert marks[-1] - marks[0] < 15, f"RSS 증가 {marks[-1] - marks[0]:.1f} MB – 그림이 새고 있음"
+    assert FIGURES.stats()["live"] <= 3 * MAX_IDLE
+    print("OK – RSS 평평함")
+
+    # 비교: pyplot 으로 만들고 닫지 않는 예전 방식 (짧게)
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import warnings
+    warnings.simplefilter("ignore")                           # "More than 20 figures" 경고
+    measure("pyplot (닫지 않음)", plt.subplots, plt.figure, lambda fig: None, 100)
+
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+"""
+OpenAI 클라이언트 풀 & 토큰 스트리밍
+
+질문마다 OpenAI(api_key=…) 를 새로 만들면 HTTP 연결 풀도 새로 생겨 TCP·TLS
+연결부터 다시 맺는다. 여기서는 API 키마다 클라이언트 하나를 프로세스에 두고
+모든 세션이 함께 쓴다 – 연결은 keep-alive 로 KEEPALIVE_S 초 동안 살려 둔다
+(openai 기본값 5 초는 교실의 질문 간격보다 짧다). 키 원문 대신 해시로 찾는다.
+
+stream_chat() 은 토큰이 도착하는 대로 글자 조각을 내놓으므로 st.write_stream 에
+그대로 넘기면 첫 토큰부터 화면에 나온다.
+
+chat() 은 그 위에 꼬리 지연 대책을 더한 것이다 (앱은 이것을 쓴다).
+  - 시간 제한 : 호출 전체 DEADLINE_S, 시도 하나는 첫 토큰·토큰 사이 READ_S 안에 와야 한다
+  - 재시도 : 첫 토큰 전의 일시 오류(시간 초과, 연결, 429, 5xx)는 지터 섞인 지수 백오프 후
+    다시 (429 의 Retry-After 는 지킨다). 글자를 내보낸 뒤에는 다시 하지 않는다 (중복 방지)
+  - 헤지 요청 : 최근 첫 토큰 시간의 p95 가 지나도록 첫 토큰이 없으면 같은 요청을 하나 더
+    보내고, 먼저 첫 토큰을 준 쪽만 쓰고 늦은 쪽은 연결을 닫아 취소한다.
+    scheduler 를 주면 헤지도 그 대기열의 자리 하나를 잡는다 – 빈자리가 없으면 보내지 않는다
+openai 자체 재시도는 끄고 (max_retries=0) 이 정책만 쓴다.
+
+    python gpt_client.py           # 모의 서버(mock_gpt)로 새 클라이언트 vs 풀, 일괄 vs 스트리밍 비교
+    python gpt_client.py tail      # 꼬리 지연·일시 오류를 넣은 모의 서버로 기본 / 재시도 / 재시도+헤지 히스토그램
+"""
+import hashlib
+import importlib.util
+import json
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+from gpt_scheduler import estimate_tokens
+
+MODEL = "gpt-4o"
+TEMPERATURE = 0.7
+MAX_CLIENTS = 16         # 키가 여럿일 때 (학생별 키) 유지하는 클라이언트 수
+MAX_CONNECTIONS = 64     # 클라이언트 하나의 동시 연결 상한
+KEEPALIVE = 32           # 놀고 있어도 유지하는 연결 수
+KEEPALIVE_S = 120.0      # 놀고 있는 연결 유지 시간 (초)
+DEADLINE_S = 40.0        # 호출 하나 (재시도·스트리밍 포함) 전체 시간 상한 (초)
+READ_S = 12.0            # 시도 하나의 첫 토큰 / 토큰 사이 시간 상한 (초)
+RETRIES = 2              # 첫 토큰 전 일시 오류 재시도 횟수
+BACKOFF_S = 0.5          # 백오프 기본 (초) – n 번째 재시도는 [0, BACKOFF_S·2ⁿ] 에서 무작위
+BACKOFF_MAX_S = 8.0      # 백오프 상한 (초)
+HEDGE = True             # 헤지 요청 사용
+HEDGE_DEFAULT_S = 4.0    # 첫 토큰 기록이 모이기 전 헤지 대기 (초)
+HEDGE_MIN_S = 0.2        # 헤지 대기 하한 (초)
+
+# openai 패키지가 있는지 – 불러오기는 클라이언트를 처음 만들 때 (앱 시작을 늦추지 않게)
+GPT_ENABLED = importlib.util.find_spec("openai") is not None
+
+
+class ClientPool:
+    """API 키(해시) → OpenAI 클라이언트 LRU – 프로세스 공유, 스레드 안전"""
+
+    def __init__(self, max_clients: int = MAX_CLIENTS, base_url: str = None):
+        self.max_clients = max_clients
+        self.base_url = base_url
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def _key(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    def _make(self, api_key: str):
+        import openai
+
+        # httpx Limits 클래스는 openai 가 쓰는 것을 그대로 (버전에 따라 httpx / httpx2)
+        limits = type(openai.DEFAULT_CONNECTION_LIMITS)(
+            max_connections=MAX_CONNECTIONS, max_keepalive_connections=KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_S)
+        kwargs = {"base_url": self.base_url} if self.base_url else {}
+        # 재시도는 chat() 이 맡는다 (openai 재시도와 겹치면 대기가 곱으로 늘어남)
+        return openai.OpenAI(api_key=api_key, max_retries=0,
+                             http_client=openai.DefaultHttpxClient(limits=limits), **kwargs)
+
+    def get(self, api_key: str):
+        key = self._key(api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.reused += 1
+                return client
+        client = self._make(api_key)
+        with self._lock:
+            # 동시에 만든 경우 먼저 들어간 것을 쓴다
+            if key in self._clients:
+                client.close()
+                self.reused += 1
+                return self._clients[key]
+            self._clients[key] = client
+            self.created += 1
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)[1].close()
+            return client
+
+    def stats(self):
+        with self._lock:
+            return {"clients": len(self._clients), "created": self.created,
+                    "reused": self.reused}
+
+
+CLIENTS = ClientPool()
+
+
+def messages(system_prompt: str, user_prompt: str):
+    return [{"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}]
+
+
+def complete(client, system_prompt: str, user_prompt: str, max_tokens: int = 350,
+             model: str = MODEL, **policy) -> str:
+    """답변 전체를 한 번에 (완성될 때까지 기다림) – chat() 과 같은 시간 제한·재시도·헤지"""
+    return "".join(chat(client, system_prompt, user_prompt, max_tokens, model, **policy)).strip()
+
+
+def _sse_text(lines):
+    """SSE 줄 → 글자 조각"""
+    for line in lines:
+        if not line.startswith("data:") or line[5:].strip() == "[DONE]":
+            continue
+        chunk = json.loads(line[5:])
+        if chunk.get("error"):
+            raise RuntimeError(chunk["error"].get("message", "스트리밍 오류"))
+        choices = chunk.get("choices") or [{}]
+        text = (choices[0].get("delta") or {}).get("content")
+        if text:
+            yield text
+
+
+def stream_chat(client, system_prompt: str, user_prompt: str, max_tokens: int = 350,
+                model: str = MODEL, timeout: float = None):
+    """답변을 토큰이 오는 대로 글자 조각으로 내놓는 생성기 (시도 한 번, 재시도 없음).
+
+    SSE 줄을 직접 읽어 본문을 끝(chunked 종료 표시)까지 소비한다 – openai 의 Stream 은
+    버전에 따라 [DONE] 에서 읽기를 멈추고 응답을 닫아, HTTP/1.1 연결이 풀로 돌아가지
+    못하고 다음 질문이 연결을 새로 맺는다."""
+    kwargs = {"timeout": timeout} if timeout is not None else {}
+    with client.chat.completions.with_streaming_response.create(
+            model=model, messages=messages(system_prompt, user_prompt),
+            max_tokens=max_tokens, temperature=TEMPERATURE, stream=True, **kwargs) as response:
+        yield from _sse_text(response.iter_lines())
+
+
+# ============================================================
+#  꼬리 지연 대책 – 시간 제한 · 재시도 · 헤지 요청
+# ============================================================
+class LatencyTracker:
+    """최근 첫 토큰 시간 (헤지 대기 = p95) 과 재시도·헤지 집계 – 프로세스 공유"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._ttft = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = self.retries = self.hedges = self.hedge_wins = self.hedges_skipped = 0
+        self.timeouts = self.failures = 0
+
+    def record(self, ttft: float):
+        with self._lock:
+            self._ttft.append(ttft)
+
+    def count(self, **counts):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            if len(self._ttft) < self.min_samples:
+                return HEDGE_DEFAULT_S
+            ordered = sorted(self._ttft)
+        return max(HEDGE_MIN_S, ordered[int(0.95 * (len(ordered) - 1))])
+
+    def stats(self) -> dict:
+        with self._lock:
+            ordered = sorted(self._ttft)
+            counts = {"calls": self.calls, "retries": self.retries, "hedges": self.hedges,
+                      "hedge_wins": self.hedge_wins, "hedges_skipped": self.hedges_skipped,
+                      "timeouts": self.timeouts,
+                      "failures": self.failures}
+        pick = (lambda q: ordered[int(q * (len(ordered) - 1))]) if ordered else (lambda q: 0.0)
+        return dict(counts, samples=len(ordered), p50=pick(0.5), p95=pick(0.95),
+                    hedge_delay=self.hedge_delay())
+
+
+LATENCY = LatencyTracker()
+
+
+def _retryable(e: Exception) -> bool:
+    """다시 해 볼 만한 오류 – 시간 초과, 연결, 408/409/429, 5xx"""
+    import openai
+
+    if isinstance(e, (TimeoutError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(e, openai.APIStatusError) and (e.status_code in (408, 409, 429)
+                                                     or e.status_code >= 500)
+
+
+def _retry_after(e: Exception) -> float:
+    """429/503 응답의 Retry-After (초), 없으면 0"""
+    response = getattr(e, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 0)) if response is not None else 0.0
+    except ValueError:
+        return 0.0
+
+
+def describe_error(e: Exception) -> str:
+    """학생에게 보여 줄 오류 설명 (원문 대신)"""
+    import openai
+
+    if isinstance(e, (TimeoutError, openai.APITimeoutError)):
+        return "응답이 너무 늦어 중단했습니다. 잠시 후 다시 시도해 주세요."
+    if isinstance(e, openai.RateLimitError):
+        return "지금 AI 요청이 너무 많습니다. 잠시 후 다시 시도해 주세요."
+    if isinstance(e, openai.APIConnectionError):
+        return "AI 서버에 연결하지 못했습니다. 인터넷 연결을 확인해 주세요."
+    if isinstance(e, openai.AuthenticationError):
+        return "API Key 가 올바르지 않습니다. 사이드바에서 다시 입력해 주세요."
+    if isinstance(e, openai.InternalServerError):
+        return "AI 서버가 잠시 불안정합니다. 잠시 후 다시 시도해 주세요."
+    return str(e)
+
+
+class _Attempt:
+    """스트리밍 시도 하나 – 백그라운드 스레드에서 읽어 (시도, 종류, 내용) 을 events 에 넣는다.
+    on_exit 는 읽던 스레드가 끝날 때 (연결을 놓을 때) 부른다"""
+
+    def __init__(self, events, client, request: dict, timeout: float, on_exit=None):
+        self.events = events
+        self.cancelled = False
+        self.response = None
+        self.on_exit = on_exit
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, args=(client, request, timeout),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, client, request, timeout):
+        try:
+            with client.chat.completions.with_streaming_response.create(
+                    **request, stream=True, timeout=timeout) as response:
+                self.response = response
+                for text in _sse_text(response.iter_lines()):
+                    if self.cancelled:
+                        return
+                    self.events.put((self, "chunk", text))
+            self.events.put((self, "done", None))
+        except Exception as e:
+            if not self.cancelled:
+                self.events.put((self, "error", e))
+        finally:
+            if self.on_exit is not None:
+                self.on_exit()
+
+    def cancel(self):
+        # 응답을 닫으면 읽던 스레드가 오류로 빠져나온다 (연결은 풀로 돌아가지 않고 닫힘)
+        self.cancelled = True
+        if self.response is not None:
+            try:
+                self.response.close()
+            except Exception:
+                pass
+
+
+def chat(client, system_prompt: str, user_prompt: str, max_tokens: int = 350,
+         model: str = MODEL, deadline: float = DEADLINE_S, retries: int = RETRIES,
+         hedge: bool = HEDGE, tracker: LatencyTracker = LATENCY, scheduler=None):
+    """stream_chat + 시간 제한 · 지터 백오프 재시도 · 헤지 요청 (모듈 설명 참고).
+    호출한 쪽이 scheduler.slot() 안에서 부르면 scheduler 도 넘긴다 – 헤지가 자리를 따로 잡는다"""
+    request = dict(model=model, messages=messages(system_prompt, user_prompt),
+                   max_tokens=max_tokens, temperature=TEMPERATURE)
+    end = time.monotonic() + deadline
+    events = queue.Queue()
+    attempts = []
+
+    def start(on_exit=None):
+        attempt = _Attempt(events, client, request, min(READ_S, end - time.monotonic()), on_exit)
+        attempts.append(attempt)
+        return attempt
+
+    def next_event(wait=float("inf")):
+        """다음 (시도, 종류, 내용) – wait 초 안에 없으면 None, 전체 시간이 다하면 TimeoutError"""
+        left = end - time.monotonic()
+        try:
+            if left > 0:
+                return events.get(timeout=min(left, wait))
+        except queue.Empty:
+            if wait < left:
+                return None
+        tracker.count(timeouts=1)
+        raise TimeoutError(f"GPT 응답 시간 초과 ({deadline:.0f} 초)")
+
+    tracker.count(calls=1)
+    try:
+        # ---- 첫 토큰까지: 시도 하나, p95 가 지나도록 조용하면 헤지 하나 더 ----
+        for n in range(retries + 1):
+            primary = start()
+            running = [primary]
+            hedge_at = primary.started + tracker.hedge_delay() if hedge else None
+            winner = error = None
+            while running and winner is None:
+                event = next_event(float("inf") if hedge_at is None
+                                   else max(0.0, hedge_at - time.monotonic()))
+                if event is None:
+                    hedge_at = None
+                    # 헤지도 API 호출 하나 – 대기열 빈자리가 없으면 (줄 선 요청이 먼저) 보내지 않는다
+                    if scheduler is not None and not scheduler.try_acquire(
+                            estimate_tokens(system_prompt, user_prompt, max_tokens=max_tokens)):
+                        tracker.count(hedges_skipped=1)
+                        continue
+                    running.append(start(scheduler.release if scheduler is not None else None))
+                    tracker.count(hedges=1)
+                    continue
+                attempt, kind, payload = event
+                if attempt not in running:
+                    continue                        # 이전 라운드에서 버린 시도
+                if kind == "error":
+                    running.remove(attempt)
+                    error = payload
+                    continue
+                winner = attempt
+                tracker.record(time.monotonic() - attempt.started)
+                tracker.count(hedge_wins=int(attempt is not primary))
+                for other in running:
+                    if other is not winner:
+                        other.cancel()
+            if winner is not None:
+                break
+            # 모든 시도가 첫 토큰 전에 실패 – 일시 오류면 지터 백오프 후 다시
+            delay = max(random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_S * 2 ** n)),
+                        _retry_after(error))
+            if n == retries or not _retryable(error) or time.monotonic() + delay >= end:
+                tracker.count(failures=1)
+                raise error
+            tracker.count(retries=1)
+            time.sleep(delay)
+
+        # ---- 첫 토큰 이후: 이긴 시도만 끝까지 (글자를 내보냈으니 재시도 없음) ----
+        while kind != "done":
+            if kind == "chunk":
+                yield payload
+            attempt, kind, payload = next_event()
+            while attempt is not winner:
+                attempt, kind, payload = next_event()
+            if kind == "error":
+                tracker.count(failures=1)
+                raise payload
+    finally:
+        # 끝났거나 중간에 버려졌으면 (rerun) 남은 시도를 모두 닫는다
+        for attempt in attempts:
+            attempt.cancel()
+
+
+if __name__ == "__main__":
+    import math
+    import statistics
+    import sys
+
+    import openai
+
+    from mock_gpt import MockServer
+
+    def connection_bench():
+        QUESTIONS, TOKENS = 5, 200
+        with MockServer() as server:
+            print(f"모의 서버: 연결 {server.handshake*1e3:.0f} ms, 첫 토큰 {server.first_token*1e3:.0f} ms, "
+                  f"토큰 간격 {server.per_token*1e3:.0f} ms, 답변 {TOKENS} 토큰")
+
+            def measure(label, ask):
+                before = server.stats()["connections"]
+                first, total = [], []
+                for i in range(QUESTIONS):
+                    t = time.perf_counter()
+                    ttft = None
+                    for _ in ask(f"질문 {i}"):
+                        ttft = ttft or time.perf_counter() - t
+                    first.append(ttft)
+                    total.append(time.perf_counter() - t)
+                print(f"  {label:22s} 첫 글자 {statistics.median(first)*1e3:6.0f} ms, "
+                      f"답변 끝 {statistics.median(total)*1e3:6.0f} ms, "
+                      f"새 연결 {server.stats()['connections'] - before}개 / 질문 {QUESTIONS}개")
+
+            def fresh_blocking(q):
+                # 예전 call_gpt: 질문마다 새 클라이언트 + 답변 전체를 기다림
+                client = openai.OpenAI(api_key="sk-mock", base_url=server.url)
+                response = client.chat.completions.create(
+                    model=MODEL, messages=messages("sys", q), max_tokens=TOKENS)
+                yield response.choices[0].message.content
+
+            pool = ClientPool(base_url=server.url)
+            measure("새 클라이언트 + 일괄", fresh_blocking)
+            measure("풀 클라이언트 + 일괄",
+                    lambda q: [complete(pool.get("sk-mock"), "sys", q, TOKENS)])
+            measure("풀 클라이언트 + 스트리밍",
+                    lambda q: stream_chat(pool.get("sk-mock"), "sys", q, TOKENS))
+            print("  풀:", pool.stats())
+
+    def histogram(values, edges=(0.25, 0.5, 1, 2, 4, 8)):
+        lo = 0.0
+        for hi in list(edges) + [math.inf]:
+            n = sum(lo <= v < hi for v in values)
+            label = f"{lo:g}–{hi:g} s" if hi < math.inf else f"≥ {lo:g} s"
+            print(f"      {label:>10s} {n:4d} {'█' * math.ceil(n * 40 / len(values))}")
+            lo = hi
+
+    def tail_bench():
+        # 요청의 4% 는 첫 토큰이 3 초 늦고 3% 는 503 – 학생 4명이 동시에 25 개씩 질문
+        CALLS, THREADS, TOKENS, WARMUP = 100, 4, 20, 20
+        mock = dict(handshake=0.02, first_token=0.25, per_token=0.005,
+                    slow_rate=0.04, slow_s=3.0, fail_rate=0.03, seed=1)
+        print(f"모의 서버: 첫 토큰 {mock['first_token']*1e3:.0f} ms, {mock['slow_rate']:.0%} 는 "
+              f"+{mock['slow_s']:.0f} s, {mock['fail_rate']:.0%} 는 503 · 질문 {CALLS}개 ({THREADS}명 동시)")
+
+        def plain(url, tracker):
+            # 예전 경로: openai 기본 재시도 (2회, 자체 백오프), 시간 제한·헤지 없음
+            client = openai.OpenAI(api_key="sk-mock", base_url=url)
+            return lambda q: stream_chat(client, "sys", q, TOKENS)
+
+        def policy(**kwargs):
+            def make(url, tracker):
+                client = ClientPool(base_url=url).get("sk-mock")
+                return lambda q: chat(client, "sys", q, TOKENS, tracker=tracker, **kwargs)
+            return make
+
+        for label, make in [("예전 (openai 기본 재시도)", plain),
+                            ("시간 제한 + 지터 재시도", policy(hedge=False)),
+                            ("재시도 + p95 헤지", policy(hedge=True))]:
+            with MockServer(**mock) as server:
+                tracker = LatencyTracker()
+                ask = make(server.url, tracker)
+                for i in range(WARMUP):                   # p95 기록 채우기 (측정 안 함)
+                    try:
+                        "".join(ask(f"준비 {i}"))
+                    except Exception:
+                        pass
+                ttft, errors = [], []
+                lock = threading.Lock()
+
+                def student(k):
+                    for i in range(k, CALLS, THREADS):
+                        t = time.perf_counter()
+                        try:
+                            first = None
+                            for _ in ask(f"질문 {i}"):
+                                first = first or time.perf_counter() - t
+                            with lock:
+                                ttft.append(first)
+                        except Exception as e:
+                            with lock:
+                                errors.append(type(e).__name__)
+
+                t0 = time.perf_counter()
+                threads = [threading.Thread(target=student, args=(k,)) for k in range(THREADS)]
+                for th in threads:
+                    th.start()
+                for th in threads:
+                    th.join()
+                ordered = sorted(ttft)
+                q = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+                print(f"\n  {label}: 첫 글자 p50 {q(0.5):.2f} s · p95 {q(0.95):.2f} s · "
+                      f"p99 {q(0.99):.2f} s · 최대 {ordered[-1]:.2f} s · 오류 {len(errors)} "
+                      f"{sorted(set(errors))} · 전체 {time.perf_counter() - t0:.1f} s")
+                histogram(ordered)
+                print("     ", {k: v for k, v in tracker.stats().items() if k in
+                                ("retries", "hedges", "hedge_wins", "hedge_delay")} if make is not plain
+                      else "", f"서버 요청 {server.stats()['requests']}회")
+
+        # 시간 제한: 첫 토큰이 2 초 걸리는 서버에 deadline 0.5 초 → 0.5 초 만에 TimeoutError
+        with MockServer(first_token=2.0) as server:
+            client = ClientPool(base_url=server.url).get("sk-mock")
+            t = time.perf_counter()
+            try:
+                "".join(chat(client, "sys", "q", 5, deadline=0.5, hedge=False))
+            except TimeoutError as e:
+                print(f"\n  시간 제한 확인: {time.perf_counter() - t:.2f} s 에 중단 – {describe_error(e)}")
+
+    tail_bench() if sys.argv[1:] == ["tail"] else connection_bench()
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+GPT 호출 대기열 – 프로세스 전체 동시 호출 상한 + 분당 토큰(TPM) 예산 + 학생별 순환 배분
+
+반 전체가 "AI튜터 피드백 요청" 을 한꺼번에 누르면 세션마다 바로 API 를 불러 429
+(속도 제한) 가 나고 오류가 그대로 보였다. 여기서는 모든 세션의 호출이 SCHEDULER.slot()
+을 거친다.
+  - 동시에 나가는 호출은 max_concurrent 개까지
+  - 토큰 통(bucket) 에 분당 tpm 토큰이 차고, 호출마다 예상 토큰(프롬프트 + max_tokens) 을 뺀다
+  - 기다리는 요청은 학생별 줄에 서고, 학생 사이를 돌아가며 하나씩 내보낸다 –
+    한 학생이 버튼을 여러 번 눌러도 다른 학생이 그 뒤로 밀리지 않는다
+status(key) 는 대기 중인 요청의 순번과 예상 대기 시간(초) 을 돌려준다 (화면 안내용).
+
+    python gpt_scheduler.py    # 모의 서버(동시 8개 넘으면 429)에 학생 30명 몰림 – 대기열 없음 vs 있음
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+MAX_CONCURRENT = int(os.environ.get("GPT_MAX_CONCURRENT", 8))   # 동시 API 호출 상한
+TPM = int(os.environ.get("GPT_TPM", 30000))                       # 분당 토큰 예산
+SERVICE_S = 4.0     # 호출 한 번 걸리는 시간 첫 추정 (초) – 이후 실측 평균으로 바뀜
+WAIT_S = 0.5        # 기다리는 동안 on_wait 를 부르는 간격 (초)
+
+
+def estimate_tokens(*texts: str, max_tokens: int = 0) -> int:
+    """호출 한 번의 예상 토큰 – UTF-8 3 바이트당 1 토큰 (한글 1자 ≈ 1 토큰, 영어는 넉넉히) + 답변 상한"""
+    return sum(len(t.encode()) for t in texts) // 3 + max_tokens
+
+
+class Ticket:
+    __slots__ = ("student", "cost", "key", "queued")
+
+    def __init__(self, student, cost: int, key):
+        self.student = student
+        self.cost = cost
+        self.key = key
+        self.queued = time.monotonic()
+
+
+class Scheduler:
+    """동시 호출 상한 · TPM 토큰 통 · 학생별 순환 대기열 – 프로세스 공유, 스레드 안전"""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, tpm: int = TPM):
+        self.max_concurrent = max_concurrent
+        self.tpm = tpm
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()    # 학생 → deque[Ticket], 앞쪽 학생이 다음 차례
+        self._by_key = {}               # key → 대기 중 Ticket 목록 (화면 안내용, 같은 키 여러 개)
+        self._tokens = float(tpm)
+        self._stamp = time.monotonic()
+        self.active = 0
+        self.service_s = SERVICE_S
+        self.measured = 0
+        self.admitted = 0
+        self.waited = 0                 # 바로 못 나가고 줄을 선 요청
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_queue = 0
+
+    # ---- 내부 (잠금 안에서) ----
+    def _refill(self, now: float):
+        self._tokens = min(self.tpm, self._tokens + (now - self._stamp) * self.tpm / 60.0)
+        self._stamp = now
+
+    def _waiting(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _order(self):
+        """대기 중 요청을 나갈 순서대로 (학생 사이 순환)"""
+        queues = [list(q) for q in self._queues.values()]
+        for depth in range(max(map(len, queues), default=0)):
+            for q in queues:
+                if depth < len(q):
+                    yield q[depth]
+
+    def _ready(self, ticket: Ticket) -> bool:
+        head = next(iter(self._queues.values()))[0]
+        # 예산보다 큰 요청은 통이 가득 찼을 때 내보낸다 (영영 못 나가는 일 없게)
+        return (head is ticket and self.active < self.max_concurrent
+                and self._tokens >= min(ticket.cost, self.tpm))
+
+    def _remove(self, ticket: Ticket):
+        q = self._queues.get(ticket.student)
+        if q is not None and ticket in q:
+            q.remove(ticket)
+            if not q:
+                del self._queues[ticket.student]
+        tickets = self._by_key.get(ticket.key) if ticket.key is not None else None
+        if tickets is not None and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del self._by_key[ticket.key]
+
+    def _admit(self, ticket: Ticket, now: float):
+        self._remove(ticket)
+        if ticket.student in self._queues:
+            self._queues.move_to_end(ticket.student)    # 차례를 다음 학생에게
+        self.active += 1
+        self._tokens -= ticket.cost
+        self.admitted += 1
+        wait = now - ticket.queued
+        if wait > 0.05:
+            self.waited += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def _estimate(self, ticket: Ticket):
+        """(순번, 예상 대기 초) – 순번은 순환 순서 기준 1 부터"""
+        ahead = 0
+        tokens = 0
+        for t in self._order():
+            tokens += t.cost
+            if t is ticket:
+                break
+            ahead += 1
+        # 앞에 선 요청이 빈자리를 다 쓰고 나면 service_s 마다 max_concurrent 개씩 빠진다
+        beyond = ahead + 1 - (self.max_concurrent - self.active)
+        slot_wait = math.ceil(beyond / self.max_concurrent) * self.service_s if beyond > 0 else 0.0
+        token_wait = max(0.0, tokens - self._tokens) * 60.0 / self.tpm
+        return ahead + 1, max(slot_wait, token_wait)
+
+    # ---- 공개 ----
+    @contextmanager
+    def slot(self, student, cost: int, key=None, on_wait=None):
+        """차례가 올 때까지 기다렸다가 호출 한 자리를 잡는다. 기다리는 동안 WAIT_S 마다 on_wait()"""
+        ticket = Ticket(student, cost, key)
+        with self._cond:
+            self._queues.setdefault(student, deque()).append(ticket)
+            if key is not None:
+                self._by_key.setdefault(key, []).append(ticket)
+            self.peak_queue = max(self.peak_queue, self._waiting())
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._ready(ticket):
+                        self._admit(ticket, now)
+                        self._cond.notify_all()     # 다음 차례도 바로 나갈 수 있는지 보게
+                        break
+                    timeout = WAIT_S
+                    if self.active < self.max_concurrent and self._tokens < ticket.cost:
+                        timeout = min(WAIT_S, (ticket.cost - self._tokens) * 60.0 / self.tpm)
+                    self._cond.wait(timeout)
+                if on_wait is not None:
+                    on_wait()
+        except BaseException:
+            # 기다리다 세션이 떠나면 (rerun 등) 줄에서 빠진다
+            with self._cond:
+                self._remove(ticket)
+                self._cond.notify_all()
+            raise
+        start = time.monotonic()
+        try:
+            yield ticket
+        finally:
+            with self._cond:
+                self.active -= 1
+                took = time.monotonic() - start
+                # 첫 실측은 그대로, 이후는 지수 이동 평균
+                self.service_s = 0.8 * self.service_s + 0.2 * took if self.measured else took
+                self.measured += 1
+                self._cond.notify_all()
+
+    def try_acquire(self, cost: int) -> bool:
+        """기다리지 않고 자리 하나를 더 잡는다 (헤지 요청용) – 줄 선 요청이 없고 빈자리와 토큰이
+        있을 때만. 잡았으면 True, 다 쓰면 release()"""
+        with self._cond:
+            self._refill(time.monotonic())
+            if self._queues or self.active >= self.max_concurrent or self._tokens < cost:
+                return False
+            self.active += 1
+            self._tokens -= cost
+            return True
+
+    def release(self):
+        """try_acquire 로 잡은 자리를 놓는다"""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def status(self, key):
+        """key 요청이 대기 중이면 (순번, 예상 대기 초), 아니면 None.
+        같은 키가 여럿 기다리면 (같은 질문을 여러 세션이 보냄) 가장 먼저 나갈 요청 기준"""
+        with self._cond:
+            tickets = self._by_key.get(key)
+            if not tickets:
+                return None
+            self._refill(time.monotonic())
+            return min(self._estimate(t) for t in tickets)
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                "active": self.active,
+                "queued": self._waiting(),
+                "students": len(self._queues),
+                "peak_queue": self.peak_queue,
+                "admitted": self.admitted,
+                "waited": self.waited,
+                "wait_avg": self.wait_total / self.waited if self.waited else 0.0,
+                "wait_max": self.wait_max,
+                "tokens": int(self._tokens),
+                "service_s": self.service_s,
+            }
+
+
+SCHEDULER = Scheduler()
+
+
+if __name__ == "__main__":
+    import statistics
+
+    import gpt_client
+    from mock_gpt import MockServer
+
+    UPSTREAM_LIMIT, TOKENS = 8, 60
+    # 학생 30명이 한꺼번에 1번씩, 그중 한 명은 버튼을 6번 연타
+    burst = [f"s{i:02d}" for i in range(30)] + ["s00"] * 5
+
+    def run(label, scheduler):
+        with MockServer(handshake=0.05, first_token=0.3, per_token=0.01,
+                        max_active=UPSTREAM_LIMIT) as server:
+            pool = gpt_client.ClientPool(base_url=server.url)
+            done, errors, estimates = {}, [], []
+            gate = threading.Barrier(len(burst))
+
+            def student(i, name):
+                gate.wait()
+                t = time.perf_counter()
+                try:
+                    if scheduler is None:
+                        gpt_client.complete(pool.get("sk-mock"), "sys", f"질문 {i}", TOKENS)
+                    else:
+                        first = []
+
+                        def note():
+                            if not first and (s := scheduler.status(i)) is not None:
+                                first.append((time.perf_counter() - t, s))
+                        with scheduler.slot(name, estimate_tokens("sys", f"질문 {i}",
+                                                                  max_tokens=TOKENS), i, note):
+                            if first:
+                                estimates.append((first[0][0] + first[0][1][1],
+                                                  time.perf_counter() - t))
+                            gpt_client.complete(pool.get("sk-mock"), "sys", f"질문 {i}", TOKENS)
+                    done[i] = (name, time.perf_counter() - t)
+                except Exception as e:
+                    errors.append(type(e).__name__)
+
+            if scheduler is not None:
+                # 수업 시작 때 선생님 시험 질문 하나 – 호출 시간 추정이 실측으로 맞춰진다
+                with scheduler.slot("teacher", estimate_tokens("sys", "시험", max_tokens=TOKENS)):
+                    gpt_client.complete(pool.get("sk-mock"), "sys", "시험", TOKENS)
+            threads = [threading.Thread(target=student, args=(i, n)) for i, n in enumerate(burst)]
+            t0 = time.perf_counter()
+            for th in threads:
+                th.start()
+            for th in threads:
+                th.join()
+            wall = time.perf_counter() - t0
+            lat = sorted(d for _, d in done.values())
+            others = [d for n, d in done.values() if n != "s00"]
+            heavy = sorted(d for n, d in done.values() if n == "s00")
+            print(f"{label}: 성공 {len(done)}/{len(burst)}, 오류 {len(errors)} "
+                  f"{sorted(set(errors))}, 서버 429 {server.stats()['rejected']}회, 전체 {wall:.1f} s")
+            if lat:
+                print(f"    완료 시간 p50 {statistics.median(lat):.1f} s · 최대 {lat[-1]:.1f} s · "
+                      f"다른 학생 최대 {max(others, default=0):.1f} s · 연타 학생 {[round(d, 1) for d in heavy]}")
+            if estimates:
+                err = [abs(e - a) for e, a in estimates]
+                print(f"    예상 대기 오차 중앙값 {statistics.median(err):.1f} s (대기한 요청 {len(err)}개)")
+            if scheduler is not None:
+                print("   ", scheduler.stats())
+
+    run("대기열 없음", None)
+    run("대기열 있음", Scheduler(max_concurrent=UPSTREAM_LIMIT, tpm=40000))
+
+    # 같은 키로 기다리는 요청 둘 – 나중에 선 세션이 rerun 으로 떠나도 먼저 선 요청의 안내는 남는다
+    shared = Scheduler(max_concurrent=1, tpm=6000)
+    release, leave = threading.Event(), threading.Event()
+
+    def hold(name, key=None, on_wait=None):
+        try:
+            with shared.slot(name, 10, key, on_wait):
+                release.wait()
+        except InterruptedError:
+            pass
+
+    def rerun():
+        if leave.is_set():
+            raise InterruptedError
+
+    def until(cond):
+        while not cond():
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=hold, args=("s0",))]
+    threads[0].start()
+    until(lambda: shared.stats()["active"] == 1)
+    threads += [threading.Thread(target=hold, args=("s1", "같은 질문")),
+                threading.Thread(target=hold, args=("s2", "같은 질문", rerun))]
+    for n, th in enumerate(threads[1:], 1):
+        th.start()
+        until(lambda: shared.stats()["queued"] == n)
+    assert shared.status("같은 질문")[0] == 1
+    leave.set()
+    threads[2].join()
+    assert shared.status("같은 질문")[0] == 1, "s1 이 아직 기다리는데 안내가 사라짐"
+    release.set()
+    for th in threads:
+        th.join()
+    assert shared.status("같은 질문") is None
+    print("같은 키 대기 안내 확인:", shared.stats())
+
+    # TPM 예산: 분당 600 토큰(초당 10) 통에 10 토큰짜리 62개 – 60개는 바로, 나머지는 1 초에 하나씩
+    budget = Scheduler(max_concurrent=100, tpm=600)
+    t = time.perf_counter()
+    for i in range(62):
+        with budget.slot(f"s{i % 5}", 10):
+            pass
+    dt = time.perf_counter() - t
+    print(f"TPM 예산 확인: 62개 {dt:.1f} s (예상 ≈ 2 s)")
+    assert 1.8 < dt < 3.0
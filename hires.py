@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+고해상도 자기장 – 격자를 타일로 나눠 프로세스 풀에서 계산
+
+결과 배열은 multiprocessing.shared_memory 에 한 번만 만들고, 작업 프로세스는
+자기 타일을 그 배열에 바로 써 넣는다 (결과를 피클로 주고받지 않는다).
+작업 프로세스로 넘어가는 것은 축 좌표 조각과 자극·도선 같은 작은 인자뿐이다.
+
+작업 프로세스는 multiprocessing 이 아니라 subprocess 로 이 파일을 (python hires.py --worker)
+실행해 띄우고, 표준 입출력으로 피클을 주고받는다. multiprocessing 의 spawn·forkserver 는
+부모의 __main__ 을 작업 프로세스에서 다시 실행하는데, 스트림릿에서는 그것이 앱 스크립트라
+작업 프로세스마다 앱 전체(화면·캐시·세션 상태 읽기)가 돌다 죽는다.
+
+격자 축은 배열 축 순서로 준다: 평면은 (y, x), 공간은 (z, y, x).
+결과는 (성분, *격자) – 평면은 (Bx, By), 공간은 (Bx, By, Bz).
+
+    python hires.py            # 작업 프로세스 수에 따른 처리량 비교
+"""
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from field_engine import pole_field, biot_savart_path
+import wire_tree
+
+TILE = 250        # 타일 한 변 (격자점) – 타일이 작업 단위
+_IN_WORKER = False
+
+
+# ============================================================
+#  타일 하나를 계산하는 커널 (작업 프로세스에서 실행)
+# ============================================================
+def _poles_kernel(axes, poles, charges, eps=1e-9):
+    Y, X = np.meshgrid(*axes, indexing="ij")
+    return np.stack(pole_field(X, Y, poles, charges, eps=eps))
+
+
+def _wires_kernel(axes, xy, currents, tol=1e-3):
+    Y, X = np.meshgrid(*axes, indexing="ij")
+    return np.stack(wire_tree.tree_field(X, Y, xy, currents, tol=tol))
+
+
+def _path_kernel(axes, path, current=1.0):
+    Z, Y, X = np.meshgrid(*axes, indexing="ij")
+    B = biot_savart_path(np.stack([X, Y, Z], axis=-1), path, current)
+    return np.moveaxis(B, -1, 0)
+
+
+KERNELS = {
+    "poles": (_poles_kernel, 2),     # 자극 모형 (막대자석 배치)
+    "wires": (_wires_kernel, 2),     # 평행 직선 도선 (사분트리)
+    "path":  (_path_kernel, 3),      # 이어진 도선 경로의 3차원 공간 자기장
+}
+
+
+def _run_tile(shm_name: str, shape, kind: str, axes, args, index):
+    """공유 메모리 결과 배열의 index 타일을 계산해 제자리에 기록"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    if _IN_WORKER:
+        # 작업 프로세스는 multiprocessing 자식이 아니라 자기 resource_tracker 에 등록된다 –
+        # 그대로 두면 끝날 때 부모의 공유 메모리를 지우려 든다 (지우는 것은 부모 몫)
+        resource_tracker.unregister(shm._name, "shared_memory")
+    try:
+        out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        out[(slice(None),) + index] = KERNELS[kind][0](axes, *args)
+        del out                      # close 전에 버퍼 참조를 놓아야 한다
+    finally:
+        shm.close()
+
+
+def tiles(shape, tile: int = TILE):
+    """격자 앞 두 축을 tile×tile 블록으로 나눈 인덱스 (나머지 축은 통째로)"""
+    for i in range(0, shape[0], tile):
+        for j in range(0, shape[1], tile):
+            yield (slice(i, i + tile), slice(j, j + tile))
+
+
+# ============================================================
+#  프로세스 풀 & 격자 계산
+# ============================================================
+class WorkerPool:
+    """
+    작업 프로세스 풀 – 프로세스마다 보내는 스레드 하나가 대기열에서 작업을 꺼내 넘기고
+    결과를 받는다. submit(fn, *args) 는 concurrent.futures.Future 를 돌려주며, fn 은 이
+    모듈의 함수여야 한다 (작업 프로세스는 이름으로 찾는다).
+
+    작업 프로세스 하나가 죽으면 풀은 broken 이 되고, 그 작업과 남은 작업은 모두
+    BrokenProcessPool 로 끝나며 나머지 작업 프로세스도 내린다 (ProcessPoolExecutor 와 같다).
+    부모가 죽으면 표준 입력이 닫혀 작업 프로세스도 끝난다.
+    """
+
+    def __init__(self, workers: int):
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._ready = [threading.Event() for _ in range(workers)]
+        self.broken = False
+        self._closed = False
+        self._procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker"],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+                       for _ in range(workers)]
+        self._threads = [threading.Thread(target=self._feed, args=(proc, ready), daemon=True)
+                         for proc, ready in zip(self._procs, self._ready)]
+        for th in self._threads:
+            th.start()
+
+    def ready(self, timeout: float = None):
+        """모든 작업 프로세스가 불러오기를 마칠 때까지 기다린다 (처리량 측정 전 등)"""
+        for event in self._ready:
+            event.wait(timeout)
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.broken:
+                raise BrokenProcessPool("작업 프로세스가 죽어 풀을 쓸 수 없습니다")
+            if self._closed:
+                raise RuntimeError("닫힌 풀입니다")
+            future = Future()
+            self._tasks.put((future, fn.__name__, args))
+        return future
+
+    def _feed(self, proc, ready: threading.Event):
+        try:
+            pickle.load(proc.stdout)                    # 불러오기 끝 신호
+        except (EOFError, OSError, pickle.UnpicklingError):
+            self._break()
+            return
+        finally:
+            ready.set()
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                break
+            future, name, args = item
+            if not future.set_running_or_notify_cancel():
+                continue                                # 보내기 전에 취소됨
+            if self.broken:
+                future.set_exception(BrokenProcessPool("작업 프로세스가 죽어 풀을 쓸 수 없습니다"))
+                continue
+            try:
+                pickle.dump((name, args), proc.stdin)
+                proc.stdin.flush()
+                ok, value = pickle.load(proc.stdout)
+            except (EOFError, OSError, pickle.UnpicklingError):
+                future.set_exception(BrokenProcessPool("작업 프로세스가 갑자기 끝났습니다"))
+                self._break()
+                break
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        try:
+            proc.stdin.close()                          # 작업 프로세스는 EOF 를 받고 끝난다
+        except OSError:
+            pass
+        proc.wait()
+
+    def _break(self):
+        """풀을 broken 으로 – 기다리던 작업을 모두 실패로 끝내고 작업 프로세스를 내린다"""
+        with self._lock:
+            self.broken = True
+            while True:
+                try:
+                    item = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None and item[0].set_running_or_notify_cancel():
+                    item[0].set_exception(BrokenProcessPool("작업 프로세스가 죽어 풀을 쓸 수 없습니다"))
+            for _ in self._procs:
+                self._tasks.put(None)
+        for proc in self._procs:
+            proc.kill()
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if cancel_futures:
+                while True:
+                    try:
+                        item = self._tasks.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        item[0].cancel()
+            for _ in self._procs:
+                self._tasks.put(None)
+        if wait:
+            for th in self._threads:
+                th.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def _worker():
+    """python hires.py --worker – 표준 입력으로 (함수 이름, 인자) 를 받아 (성공, 결과) 를 돌려준다"""
+    global _IN_WORKER
+    _IN_WORKER = True
+    # 결과 통로는 원래 표준 출력 – 커널이 찍는 글자가 섞이지 않게 fd 1 은 표준 오류로 돌린다
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    inp = sys.stdin.buffer
+    pickle.dump("ready", out)
+    out.flush()
+    while True:
+        try:
+            name, args = pickle.load(inp)
+        except EOFError:
+            return
+        try:
+            reply = (True, globals()[name](*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            pickle.dump(reply, out)
+        except Exception as e:                          # 피클 안 되는 예외
+            pickle.dump((False, RuntimeError(repr(e))), out)
+        out.flush()
+
+
+def make_pool(workers: int = None):
+    """작업 프로세스 풀 (WorkerPool) – 작업 프로세스는 앱 스크립트 대신 이 파일만 불러온다"""
+    return WorkerPool(workers or os.cpu_count() or 1)
+
+
+def compute_grid(kind: str, axes, args=(), pool=None, tile: int = TILE):
+    """
+    axes 격자 전체의 자기장 (성분, *격자) 를 계산해 일반 배열로 반환.
+    pool 이 없으면 같은 타일 계산을 현재 프로세스에서 차례로 한다.
+    """
+    axes = [np.asarray(a, dtype=float) for a in axes]
+    shape = (KERNELS[kind][1],) + tuple(len(a) for a in axes)
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        jobs = [(shm.name, shape, kind,
+                 [axes[0][idx[0]], axes[1][idx[1]]] + axes[2:], args, idx)
+                for idx in tiles(shape[1:], tile)]
+        if pool is None:
+            for job in jobs:
+                _run_tile(*job)
+        else:
+            futures = []
+            try:
+                for job in jobs:
+                    futures.append(pool.submit(_run_tile, *job))
+                for f in futures:
+                    f.result()
+            finally:
+                # 도중에 끝나면 (rerun 의 StopException, 작업 프로세스 죽음) 아직 안 보낸 타일은
+                # 취소하고 도는 타일이 끝나기를 기다린 뒤에 공유 메모리를 지운다
+                for f in futures:
+                    f.cancel()
+                wait(futures)
+        out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        result = out.copy()
+        del out
+    finally:
+        shm.close()
+        shm.unlink()
+    return result
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["--worker"]:
+    _worker()
+elif __name__ == "__main__":
+    import time
+
+    import magnets
+
+    ring = magnets.ring(12, 2.2)
+    xy = np.stack([ring["x"], ring["y"]], axis=-1)
+    n = 2000
+    plane = [np.linspace(-3, 3, n), np.linspace(-4, 4, n)]
+    loop = np.stack([np.cos(np.linspace(0, 2*np.pi, 49)),
+                     np.sin(np.linspace(0, 2*np.pi, 49)), np.zeros(49)], axis=-1)
+    volume = [np.linspace(-2, 2, 64)] * 3
+    cases = {
+        f"자석 고리 {n}×{n}": ("poles", plane, (xy, magnets.charges(ring))),
+        "원형 도선 64³ 공간": ("path", volume, (loop,)),
+    }
+    print(f"CPU {os.cpu_count()}개")
+    for name, (kind, axes, args) in cases.items():
+        points = int(np.prod([len(a) for a in axes]))
+        t = time.perf_counter()
+        ref = compute_grid(kind, axes, args)
+        dt = time.perf_counter() - t
+        print(f"\n[{name}] 현재 프로세스: {dt:6.2f} s ({points/dt/1e6:5.2f} M점/s)")
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            with make_pool(workers) as pool:
+                pool.ready()                          # 작업 프로세스 기동 시간 제외
+                t = time.perf_counter()
+                B = compute_grid(kind, axes, args, pool)
+                dt = time.perf_counter() - t
+            assert np.allclose(B, ref)
+            print(f"  작업 프로세스 {workers}개: {dt:6.2f} s ({points/dt/1e6:5.2f} M점/s)")
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+원형 도선의 닫힌 형태 자기장 (완전 타원적분 K, E – 산술·기하 평균)
+
+원형 도선 하나의 자기장을 평가점마다 O(1) 로 구한다 (도선을 선분으로
+쪼개 더하는 Biot–Savart 는 O(선분 수)). SciPy 없이 NumPy 만 쓴다.
+솔레노이드는 원형 도선을 z 방향으로 쌓은 것으로 계산한다.
+"""
+import numpy as np
+
+from field_engine import MU0_4PI, CHUNK_BYTES
+
+
+def ellipke(m, tol: float = 1e-15, max_iter: int = 32):
+    """완전 타원적분 (K(m), E(m)), 0 ≤ m < 1 – 벡터화된 AGM"""
+    m = np.asarray(m, dtype=float)
+    a = np.ones_like(m)
+    b = np.sqrt(1.0 - m)
+    c2_sum = 0.5 * m                # Σ 2^(n-1) c_n²,  c_0² = m
+    p = 0.5
+    for _ in range(max_iter):
+        c = 0.5 * (a - b)
+        a, b = 0.5 * (a + b), np.sqrt(a * b)
+        p *= 2.0
+        c2_sum = c2_sum + p * c * c
+        if np.all(np.abs(c) <= tol * a):
+            break
+    K = np.pi / (2.0 * a)
+    return K, K * (1.0 - c2_sum)
+
+
+def loop_field(rho, z, radius: float, current=1.0, k: float = MU0_4PI):
+    """
+    z=0 평면, 원점 중심 반지름 radius 원형 도선의 자기장 (B_ρ, B_z).
+    전류 > 0 이면 반시계방향(+z 쪽 자기장). 도선 위의 점은 0.
+    """
+    rho = np.abs(np.asarray(rho, dtype=float))
+    z = np.asarray(z, dtype=float)
+    a = radius
+    s = a * a + rho * rho + z * z
+    alpha2 = s - 2 * a * rho
+    beta2 = s + 2 * a * rho
+    on_wire = alpha2 <= 1e-12 * a * a
+    alpha2 = np.where(on_wire, 1.0, alpha2)
+    beta = np.sqrt(beta2)
+    K, E = ellipke(np.clip(1.0 - alpha2 / beta2, 0.0, 1.0 - 1e-16))
+    C = 4.0 * k * current          # μ0 I / π
+    denom = 2.0 * alpha2 * beta
+    Bz = C * ((a * a - rho * rho - z * z) * E + alpha2 * K) / denom
+    safe_rho = np.where(rho > 0, rho, 1.0)
+    Brho = np.where(rho > 0, C * z * (s * E - alpha2 * K) / (denom * safe_rho), 0.0)
+    return np.where(on_wire, 0.0, Brho), np.where(on_wire, 0.0, Bz)
+
+
+def loop_flux(rho, z, radius: float, current=1.0, k: float = MU0_4PI):
+    """자속 함수 ψ = ρ A_φ – 자오면에서 ψ 의 등고선이 곧 자기력선"""
+    rho = np.abs(np.asarray(rho, dtype=float))
+    z = np.asarray(z, dtype=float)
+    a = radius
+    m = 4 * a * rho / ((a + rho) ** 2 + z * z)
+    K, E = ellipke(np.clip(m, 0.0, 1.0 - 1e-16))
+    safe_m = np.where(m > 0, m, 1.0)
+    A = np.where(m > 0, 4 * k * current * np.sqrt(a / np.where(rho > 0, rho, 1.0))
+                 * ((1 - m / 2) * K - E) / np.sqrt(safe_m), 0.0)
+    return rho * A
+
+
+def loop_field_xyz(points, radius: float, current=1.0, z0: float = 0.0,
+                   k: float = MU0_4PI):
+    """z 축 위 높이 z0 원형 도선의 자기장을 직교좌표 B (…,3) 로"""
+    p = np.asarray(points, dtype=float)
+    x, y = p[..., 0], p[..., 1]
+    rho = np.hypot(x, y)
+    Brho, Bz = loop_field(rho, p[..., 2] - z0, radius, current, k)
+    inv = np.where(rho > 0, 1.0 / np.where(rho > 0, rho, 1.0), 0.0)
+    return np.stack([Brho * x * inv, Brho * y * inv, Bz], axis=-1)
+
+
+def solenoid_field(rho, z, radius: float, length: float, turns: int,
+                   current=1.0, k: float = MU0_4PI,
+                   chunk_bytes: int = CHUNK_BYTES):
+    """길이 length 에 원형 도선 turns 개를 균등하게 쌓은 솔레노이드의 (B_ρ, B_z)"""
+    rho = np.asarray(rho, dtype=float)
+    z = np.asarray(z, dtype=float)
+    rho, z = np.broadcast_arrays(rho, z)
+    zs = np.linspace(-length / 2, length / 2, max(int(turns), 1))
+    Brho = np.zeros(rho.shape)
+    Bz = np.zeros(rho.shape)
+    step = max(1, chunk_bytes // (8 * 24 * max(rho.size, 1)))
+    for i in range(0, len(zs), step):
+        zz = zs[i:i + step].reshape((-1,) + (1,) * rho.ndim)
+        br, bz = loop_field(rho[None], z[None] - zz, radius, current, k)
+        Brho += br.sum(axis=0)
+        Bz += bz.sum(axis=0)
+    return Brho, Bz
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+막대자석 배치(자극 배열)와 N개 자극 합성 자기장
+
+자극 하나는 (x, y, sign, strength) 레코드이며, 자석 하나는 항상
+(N극, S극) 두 레코드가 연달아 놓인다. 배치 함수들은 이 배열을 만들고,
+superpose() 는 (S, H, W) 한 번의 브로드캐스트로 전체 자기장을 구한다.
+"""
+import numpy as np
+
+from field_engine import pole_field
+
+POLE_DTYPE = np.dtype([("x", "f8"), ("y", "f8"), ("sign", "i1"), ("strength", "f8")])
+
+
+def make_poles(xy, sign, strength=1.0):
+    """좌표 (S,2), 부호 (S,) (+1=N, −1=S), 세기 → 자극 배열"""
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+    p = np.empty(len(xy), dtype=POLE_DTYPE)
+    p["x"], p["y"] = xy[:, 0], xy[:, 1]
+    p["sign"] = sign
+    p["strength"] = strength
+    return p
+
+
+def bar_magnet(center=(0.0, 0.0), angle_deg: float = 0.0,
+               pole_gap: float = 0.8, strength: float = 1.0):
+    """N극이 angle_deg 방향을 향하는 막대자석 하나 (N, S)"""
+    d = np.array([np.cos(np.radians(angle_deg)), np.sin(np.radians(angle_deg))])
+    c = np.asarray(center, dtype=float)
+    return make_poles([c + d * pole_gap / 2, c - d * pole_gap / 2], [1, -1], strength)
+
+
+def pair(attract: bool, distance: float, strength: float = 1.0):
+    """두 자석: 인력(S극-N극 마주봄) 또는 척력(S극-S극 마주봄) 배치"""
+    left = bar_magnet((-distance / 2, 0), 180.0, strength=strength)
+    right = bar_magnet((distance / 2, 0), 180.0 if attract else 0.0, strength=strength)
+    return np.concatenate([left, right])
+
+
+def ring(n: int, radius: float, strength: float = 1.0, radial: bool = False):
+    """원 위에 자석 n개 – 기본은 접선 방향(N극이 이웃 S극을 향하는 닫힌 고리)"""
+    t = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    gap = min(0.8, 0.4 * 2 * np.pi * radius / n)
+    angles = np.degrees(t) + (0.0 if radial else 90.0)
+    return np.concatenate([
+        bar_magnet((radius * np.cos(a), radius * np.sin(a)), ang, gap, strength)
+        for a, ang in zip(t, angles)])
+
+
+def chain(n: int, length: float, strength: float = 1.0):
+    """x 축 위 길이 length 에 자석 n개를 N→S 로 잇댄 사슬"""
+    spacing = length / n
+    gap = min(0.8, 0.4 * spacing)
+    xs = (np.arange(n) - (n - 1) / 2) * spacing
+    return np.concatenate([bar_magnet((x, 0.0), 0.0, gap, strength) for x in xs])
+
+
+def charges(poles):
+    """자극 배열 → 부호 있는 세기 (S,)"""
+    return poles["sign"] * poles["strength"]
+
+
+def superpose(poles, X, Y, eps: float = 1e-9):
+    """자극 배열 전체가 격자 (X, Y) 에 만드는 합성 자기장 (Bx, By)"""
+    xy = np.stack([poles["x"], poles["y"]], axis=-1)
+    return pole_field(X, Y, xy, charges(poles), eps=eps)
+
+
+def magnet_halves(poles):
+    """그리기용: 자극마다 (중심, 각도[deg], 반쪽 길이, N 여부) – 반쪽 직사각형 하나씩"""
+    xy = np.stack([poles["x"], poles["y"]], axis=-1).reshape(-1, 2, 2)
+    out = []
+    for n_xy, s_xy in xy:
+        d = n_xy - s_xy
+        ang = np.degrees(np.arctan2(d[1], d[0]))
+        gap = float(np.hypot(*d))
+        out.append((n_xy, ang, gap, True))
+        out.append((s_xy, ang, gap, False))
+    return out
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 모의 OpenAI 서버 – GPT 호출 경로 벤치마크용 (/v1/chat/completions 만)
+
+실제 API 대신 이 서버에 붙여 연결 재사용·스트리밍·대기 시간을 잰다.
+  - handshake : 새 TCP 연결마다 첫 응답 전에 기다리는 시간 (TCP + TLS 왕복을 흉내)
+  - first_token : 요청을 받고 첫 토큰까지 걸리는 시간
+  - per_token : 토큰 사이 간격
+  - max_active : 동시 처리 상한 – 넘는 요청은 429 (API 속도 제한을 흉내, None 이면 무제한)
+  - slow_rate, slow_s : slow_rate 비율의 요청은 첫 토큰이 slow_s 초 더 늦다 (꼬리 지연)
+  - fail_rate : 이 비율의 요청은 바로 503 (일시 오류) – 무작위는 seed 로 재현
+응답은 max_tokens 개 토큰 ("토큰0 토큰1 …") 으로, stream=true 면 SSE 조각으로 보낸다.
+HTTP/1.1 keep-alive 를 지원하며 (스트림은 chunked), 연결·요청 수를 센다.
+
+    python mock_gpt.py [포트]   # 서버만 띄워 두기 (OPENAI_BASE_URL=http://127.0.0.1:포트/v1)
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        mock = self.server.mock
+        with mock.lock:
+            mock.connections += 1
+        self._fresh = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, code: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self):
+        mock = self.server.mock
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        with mock.lock:
+            mock.requests += 1
+            limited = mock.max_active is not None and mock.active >= mock.max_active
+            if limited:
+                mock.rejected += 1
+            else:
+                mock.active += 1
+                mock.peak_active = max(mock.peak_active, mock.active)
+            roll = mock.rng.random()
+            failed = not limited and roll < mock.fail_rate
+            slow = not limited and not failed and roll < mock.fail_rate + mock.slow_rate
+            if failed:
+                mock.failed += 1
+                mock.active -= 1
+            if slow:
+                mock.slowed += 1
+        if failed:
+            self._send_json(503, {"error": {"message": "The server is overloaded (mock)",
+                                            "type": "server_error"}})
+            return
+        if limited:
+            self._send_json(429, {"error": {"message": "Rate limit reached (mock)",
+                                            "type": "requests", "code": "rate_limit_exceeded"}})
+            return
+        try:
+            if self._fresh:
+                time.sleep(mock.handshake)
+                self._fresh = False
+            time.sleep(mock.first_token + (mock.slow_s if slow else 0.0))
+            n = int(req.get("max_tokens") or 16)
+            tokens = [f"토큰{i} " for i in range(n)]
+            base = {"id": "chatcmpl-mock", "created": int(time.time()),
+                    "model": req.get("model", "mock")}
+            if not req.get("stream"):
+                time.sleep(mock.per_token * (n - 1))
+                usage = {"prompt_tokens": 10, "completion_tokens": n, "total_tokens": 10 + n}
+                self._send_json(200, dict(base, object="chat.completion", usage=usage, choices=[
+                    {"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": "".join(tokens)}}]))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, tok in enumerate(tokens):
+                if i:
+                    time.sleep(mock.per_token)
+                delta = {"content": tok} if i else {"role": "assistant", "content": tok}
+                chunk = dict(base, object="chat.completion.chunk", choices=[
+                    {"index": 0, "delta": delta, "finish_reason": None}])
+                self._chunk(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+            end = dict(base, object="chat.completion.chunk", choices=[
+                {"index": 0, "delta": {}, "finish_reason": "stop"}])
+            data = b"data: " + json.dumps(end).encode() + b"\n\ndata: [DONE]\n\n"
+            # 마지막 조각과 chunked 끝 표시를 한 번에 – 클라이언트가 [DONE] 을 읽자마자 닫아도
+            # 본문이 다 도착해 있어 연결이 풀로 돌아간다 (실제 API 와 같은 동작)
+            self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(data), data))
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 도중에 끊음 (헤지 요청 취소 등)
+            self.close_connection = True
+        finally:
+            with mock.lock:
+                mock.active -= 1
+
+
+class MockServer:
+    """백그라운드 스레드에서 도는 모의 서버 – with 문으로 쓰면 끝날 때 닫힌다"""
+
+    def __init__(self, handshake: float = 0.15, first_token: float = 0.35,
+                 per_token: float = 0.03, port: int = 0, max_active: int = None,
+                 slow_rate: float = 0.0, slow_s: float = 0.0, fail_rate: float = 0.0,
+                 seed: int = 0):
+        self.handshake = handshake
+        self.first_token = first_token
+        self.per_token = per_token
+        self.max_active = max_active
+        self.slow_rate = slow_rate
+        self.slow_s = slow_s
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.connections = self.requests = self.active = self.peak_active = self.rejected = 0
+        self.slowed = self.failed = 0
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stats(self):
+        with self.lock:
+            return {"connections": self.connections, "requests": self.requests,
+                    "peak_active": self.peak_active, "rejected": self.rejected,
+                    "slowed": self.slowed, "failed": self.failed}
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    server = MockServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"모의 OpenAI 서버: {server.url}  (Ctrl+C 로 종료)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.close()
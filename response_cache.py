@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+AI 튜터 답변 캐시 – 같은 질문이면 API 를 다시 부르지 않는다 (SQLite 파일, 재시작 후에도 유지)
+
+키는 (시스템 프롬프트, 정규화한 질문, 모델, max_tokens) 의 해시이다. 질문 정규화는
+유니코드 NFKC · 소문자 · 공백 모두 제거 · 끝의 문장부호 제거 – 한국어는 띄어쓰기가
+제각각이라 "오른손 법칙이 뭐예요?" 와 "오른손법칙이 뭐예요" 를 같은 질문으로 본다.
+
+항목은 TTL 초가 지나면 만료되고, max_entries 를 넘으면 가장 오래 안 쓴 것부터 지운다.
+프로세스 안에서는 연결 하나를 잠금으로 나눠 쓴다 (WAL 모드 – 다른 프로세스가 읽기 가능).
+학생 개인 답안에 대한 피드백처럼 공유하면 안 되는 호출은 캐시를 거치지 않는다 (app 쪽 cache=False).
+
+    python response_cache.py    # 교실 30명 질문 흉내 – 적중률과 API 호출 수, 재시작 후 유지 확인
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+DB_PATH = Path(os.environ.get("GPT_CACHE_PATH", Path(__file__).parent / "gpt_cache.sqlite3"))
+TTL = 3 * 24 * 3600.0       # 답변 유지 시간 (초)
+MAX_ENTRIES = 5000          # 답변 수 상한 (넘으면 오래 안 쓴 것부터 삭제)
+
+_SPACE = re.compile(r"\s+")
+_TRAILING = re.compile(r"[?？!！.。~～…,]+$")
+
+
+def normalize(prompt: str) -> str:
+    """질문 정규화 – NFKC, 소문자, 공백 제거, 끝 문장부호 제거"""
+    text = unicodedata.normalize("NFKC", prompt).lower()
+    return _TRAILING.sub("", _SPACE.sub("", text))
+
+
+def cache_key(system_prompt: str, user_prompt: str, model: str, max_tokens: int) -> str:
+    raw = json.dumps([system_prompt, normalize(user_prompt), model, int(max_tokens)],
+                     ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite 답변 캐시 (TTL + 최근 사용 순 삭제, 적중/실패 집계) – 프로세스 공유"""
+
+    def __init__(self, path=DB_PATH, ttl: float = TTL, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def _conn(self):
+        # 처음 쓸 때 연다 (import 만으로 파일을 만들지 않게)
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS answers (
+                              key TEXT PRIMARY KEY, prompt TEXT, model TEXT, answer TEXT,
+                              created REAL, used REAL, hits INTEGER DEFAULT 0)""")
+            db.execute("CREATE INDEX IF NOT EXISTS answers_used ON answers(used)")
+            self._db = db
+        return self._db
+
+    def get(self, system_prompt: str, user_prompt: str, model: str, max_tokens: int):
+        """저장된 답변 (없거나 만료면 None)"""
+        key = cache_key(system_prompt, user_prompt, model, max_tokens)
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT answer, created FROM answers WHERE key = ?",
+                             (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                db.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            db.execute("UPDATE answers SET used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, system_prompt: str, user_prompt: str, model: str, max_tokens: int,
+            answer: str):
+        key = cache_key(system_prompt, user_prompt, model, max_tokens)
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute("INSERT OR REPLACE INTO answers (key, prompt, model, answer, created, used)"
+                       " VALUES (?, ?, ?, ?, ?, ?)",
+                       (key, user_prompt, model, answer, now, now))
+            self.stores += 1
+            self._trim(db, now)
+        return answer
+
+    def _trim(self, db, now: float):
+        """만료 항목 삭제 후 상한을 넘은 만큼 최근 사용 순으로 삭제 (잠금 안에서)"""
+        self.expired += db.execute("DELETE FROM answers WHERE created < ?",
+                                   (now - self.ttl,)).rowcount
+        over = db.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+        if over > 0:
+            db.execute("DELETE FROM answers WHERE key IN "
+                       "(SELECT key FROM answers ORDER BY used LIMIT ?)", (over,))
+            self.evictions += over
+
+    def clear(self):
+        with self._lock:
+            self._conn().execute("DELETE FROM answers")
+
+    def top(self, n: int = 5):
+        """많이 재사용된 질문 [(질문, 적중 수)]"""
+        with self._lock:
+            return self._conn().execute(
+                "SELECT prompt, hits FROM answers WHERE hits > 0 ORDER BY hits DESC LIMIT ?",
+                (n,)).fetchall()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+RESPONSES = ResponseCache()
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    path = Path(tempfile.mkdtemp()) / "gpt_cache.sqlite3"
+    SYS = "You are a friendly and knowledgeable physics tutor."
+    # 교실 30명이 흔히 묻는 질문의 변형 (띄어쓰기·물음표·대소문자만 다름)
+    common = ["오른손 법칙이 뭐예요?", "오른손법칙이 뭐예요", "오른손 법칙이  뭐예요 ??",
+              "솔레노이드 내부 자기장은 왜 균일한가요?", "솔레노이드 내부 자기장은 왜 균일한가요",
+              "자기력선은 왜 교차하지 않아요?", "자기력선은 왜 교차하지 않아요!",
+              "What is the right-hand rule?", "what is the Right-hand rule"]
+    rng = random.Random(0)
+    calls = 0
+
+    def ask(cache, prompt):
+        global calls
+        answer = cache.get(SYS, prompt, "gpt-4o", 450)
+        if answer is None:
+            calls += 1                                 # 실제로는 API 호출 (수 초, 유료)
+            answer = cache.put(SYS, prompt, "gpt-4o", 450, f"답변: {normalize(prompt)}")
+        return answer
+
+    cache = ResponseCache(path)
+    questions = [rng.choice(common) if rng.random() < 0.7 else f"개인 질문 {i}"
+                 for i in range(90)]                   # 30명 × 3 질문
+    t = time.perf_counter()
+    for q in questions:
+        ask(cache, q)
+    dt = time.perf_counter() - t
+    s = cache.stats()
+    print(f"질문 {len(questions)}개 → API 호출 {calls}회, 적중률 {s['hit_rate']:.0%} "
+          f"(질문당 캐시 처리 {dt / len(questions) * 1e3:.2f} ms)")
+    assert normalize("오른손 법칙이 뭐예요?") == normalize("오른손법칙이  뭐예요")
+
+    # 재시작 후에도 유지
+    calls = 0
+    again = ResponseCache(path)
+    for q in common:
+        ask(again, q)
+    print(f"재시작 후 흔한 질문 {len(common)}개 → API 호출 {calls}회")
+    assert calls == 0
+
+    # TTL 만료와 크기 상한
+    short = ResponseCache(path.with_name("short.sqlite3"), ttl=0.05, max_entries=3)
+    short.put(SYS, "만료될 질문", "gpt-4o", 450, "x")
+    time.sleep(0.1)
+    assert short.get(SYS, "만료될 질문", "gpt-4o", 450) is None
+    for i in range(6):
+        short.put(SYS, f"질문 {i}", "gpt-4o", 450, "x")
+    assert short.stats()["entries"] <= 3
+    print("TTL·크기 상한 확인:", short.stats())
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+이론 정리 3D 그림 – 세션마다 한 번 만든 축을 두고 아티스트 데이터만 갱신
+
+3D 축(projection='3d')을 새로 만들고 선·화살표를 모두 다시 올리는 일이
+그림 한 장 비용의 대부분이다. 장면 객체는 처음 한 번 그림·축·아티스트를
+만들고, 슬라이더(I, R, n)가 바뀌면 선은 set_data_3d, 화살표는 Line3DCollection
+선분만 바꾼 뒤 같은 그림을 다시 인코딩한다.
+
+교류 애니메이션(ac_animation)은 같은 장면을 프레임마다 갱신한다 – 자기장은 전류 1 A
+값을 한 번만 구해 (프레임, 점, 3) 배열로 늘린 것을 update(…, field=…) 로 넘긴다.
+
+축 위치가 변하지 않으므로 여백을 잘라 낼 범위(bbox)도 장면 종류마다 한 번만
+구해 두고 인코딩에 넘긴다 – bbox_inches="tight" 는 저장할 때마다 그림을 한 번 더
+그려 범위를 잰다.
+
+장면 그림은 FigurePool 이 아니라 장면이 가진다 (풀의 release 는 손대지 않는다).
+
+    python scenes3d.py         # 새로 그리기 vs 장면 갱신 – 슬라이더 한 번당 시간 비교
+"""
+from abc import ABC, abstractmethod
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (3d 투영 등록)
+
+from ac_animation import ac_field
+from field_engine import biot_savart, straight_wire, helix
+from loop_field import loop_field_xyz, solenoid_field
+
+
+def _head_dirs(UVW):
+    """화살표 머리 두 갈래 방향 (n, 2, 3) – Axes3D.quiver 와 같은 ±15° 회전"""
+    x, y = UVW[:, 0], UVW[:, 1]
+    norm = np.linalg.norm(UVW[:, :2], axis=1)
+    x_p = np.divide(y, norm, where=norm != 0, out=np.zeros_like(x))
+    y_p = np.divide(-x, norm, where=norm != 0, out=np.ones_like(x))
+    c, s = np.cos(np.radians(15)), np.sin(np.radians(15))
+    r13, r32, r12 = y_p * s, x_p * s, x_p * y_p * (1 - c)
+    Rpos = np.array([[c + x_p ** 2 * (1 - c), r12, r13],
+                     [r12, c + y_p ** 2 * (1 - c), -r32],
+                     [-r13, r32, np.full_like(x_p, c)]])
+    Rneg = Rpos.copy()
+    Rneg[[0, 1, 2, 2], [2, 2, 0, 1]] *= -1
+    return np.stack([np.einsum("ij...,...j->...i", Rpos, UVW),
+                     np.einsum("ij...,...j->...i", Rneg, UVW)], axis=1)
+
+
+def quiver_segments(tails, vectors, ratio: float = 0.3):
+    """Axes3D.quiver(…, pivot='tail') 가 만드는 선분 (몸통 n, 머리 n, 머리 n) (3n, 2, 3)"""
+    XYZ, UVW = np.broadcast_arrays(np.asarray(tails, float).reshape(-1, 3),
+                                   np.asarray(vectors, float).reshape(-1, 3))
+    tips = XYZ + UVW
+    heads = tips[:, None, :] - ratio * _head_dirs(UVW)
+    return np.concatenate([np.stack([tips, XYZ], axis=1),
+                           np.stack([tips, heads[:, 0]], axis=1),
+                           np.stack([tips, heads[:, 1]], axis=1)])
+
+
+def fixed_bbox(fig, pad: float = 0.15):
+    """지금 그림의 tight bbox (인치, 여백 pad) – savefig(bbox_inches=…) 에 그대로 넘긴다"""
+    return fig.get_tightbbox(FigureCanvasAgg(fig).get_renderer()).padded(pad)
+
+
+class Scene(ABC):
+    """장면 공통 – bbox 는 장면 종류마다 처음 만든 그림에서 한 번 잰다.
+    하위 클래스는 update(current, *args, field=None) 와 unit_field(*args) 를 정한다."""
+
+    bbox = None
+    show_current = True      # 애니메이션 프레임 왼쪽 위에 순간 전류 표시 (제목에 있으면 False)
+
+    def _measure(self):
+        if type(self).bbox is None:
+            type(self).bbox = fixed_bbox(self.fig)
+
+    @abstractmethod
+    def unit_field(self, *args):
+        """전류 1 A 일 때 update(…, field=…) 에 넘길 자기장 – 배열 하나 또는 배열 튜플"""
+
+    def ac_fields(self, currents, *args):
+        """프레임별 자기장 – 자기장은 전류에 비례하므로 1 A 값을 ac_field 로 늘린다"""
+        unit = self.unit_field(*args)
+        if isinstance(unit, tuple):
+            return zip(*(ac_field(u, currents) for u in unit))
+        return ac_field(unit, currents)
+
+    def animate(self, currents, *args):
+        """교류 한 주기: 프레임마다 update 후 같은 그림을 내놓는다 (ac_animation.render_frames)"""
+        label = self.ax.text2D(0.02, 0.95, "", transform=self.ax.transAxes, fontsize=11)
+        label.set_visible(self.show_current)
+        try:
+            for current, field in zip(currents, self.ac_fields(currents, *args)):
+                self.update(current, *args, field=field)
+                label.set_text(f"I = {current:+.2f} A")
+                yield self.fig
+        finally:
+            label.remove()
+
+
+# ============================================================
+#  1. 직선 도선
+# ============================================================
+class WireScene(Scene):
+    """길이 10 직선 도선 + 반지름 1–3 원 9개 + 둘레 자기장 화살표 (길이 ∝ |B|)"""
+
+    def __init__(self):
+        self.fig = Figure(figsize=(6, 6))
+        ax = self.ax = self.fig.add_subplot(111, projection="3d")
+        ax.view_init(elev=20, azim=-45)
+        (self.wire,) = ax.plot([0, 0], [0, 0], [-5, 5], color="red", lw=3)
+        theta = np.linspace(0, 2*np.pi, 100)
+        r, z = np.meshgrid(np.linspace(1, 3, 3), [-3, 0, 3], indexing="ij")
+        ang = np.linspace(0, 2*np.pi, 8, endpoint=False)
+        self.pts = np.stack(np.broadcast_arrays(
+            r[..., None]*np.cos(ang), r[..., None]*np.sin(ang), z[..., None]),
+            axis=-1).reshape(-1, 3)
+        self.circles = [ax.plot(rr*np.cos(theta), rr*np.sin(theta), zz, color="k", lw=1)[0]
+                        for rr, zz in zip(r.ravel(), z.ravel())]
+        self.segments = straight_wire(10.0)
+        self.B_ref = biot_savart([1, 0, 0], *self.segments, 5.0)[1]
+        self.arrows = ax.quiver(*self.pts.T, *np.zeros_like(self.pts).T,
+                                color="k", arrow_length_ratio=0.4, linewidth=1.5)
+        ax.set_xlabel("X"); ax.set_ylabel("Y"); ax.set_zlabel("Z")
+        self.update(2.0)
+        self._measure()
+
+    def unit_field(self):
+        return biot_savart(self.pts, *self.segments, 1.0)
+
+    def update(self, current: float, field=None):
+        self.wire.set_color("red" if current > 0 else "blue")
+        on = abs(current) > 0.1
+        for c in self.circles:
+            c.set_visible(on)
+        self.arrows.set_visible(on)
+        if on:
+            B = biot_savart(self.pts, *self.segments, current) if field is None else field
+            self.arrows.set_segments(quiver_segments(self.pts, B * 2.0 / self.B_ref, 0.4))
+        return self.fig
+
+
+# ============================================================
+#  2. 원형 도선
+# ============================================================
+class LoopScene(Scene):
+    """원형 도선 + 전류 방향 화살표 4개 + 중심 자기장 + xz 단면 자기장 화살표"""
+
+    ANGLES = np.array([0, np.pi/2, np.pi, 3*np.pi/2])
+    show_current = False
+
+    def __init__(self):
+        self.fig = Figure(figsize=(6, 6))
+        ax = self.ax = self.fig.add_subplot(111, projection="3d")
+        ax.view_init(elev=25, azim=30)
+        self.theta = np.linspace(0, 2*np.pi, 100)
+        (self.loop,) = ax.plot(np.cos(self.theta), np.sin(self.theta),
+                               np.zeros_like(self.theta), color="red", lw=4)
+        zero = np.zeros((4, 3))
+        self.current = ax.quiver(*zero.T, *zero.T, color="orange", arrow_length_ratio=0.3)
+        self.center = ax.quiver(0, 0, 0, 0, 0, 0, color="blue",
+                                arrow_length_ratio=0.2, linewidth=3)
+        zero = np.zeros((28, 3))
+        self.field = ax.quiver(*zero.T, *zero.T, color="gray", arrow_length_ratio=0.3, lw=1)
+        self.label = ax.text(0, 0, 0, "", fontsize=12, color="blue", weight="bold", ha="center")
+        self.B_unit = loop_field_xyz([0, 0, 0], 1.0, 1.0)[2]
+        # 중심점 표시
+        ax.scatter([0], [0], [0], color="black", s=80)
+        ax.text(0, 0, -0.2, "중심", fontsize=10, ha="center")
+        ax.set_xlabel("X"); ax.set_ylabel("Y"); ax.set_zlabel("Z (자기장)")
+        self.update(-2.0, 3.0)                  # 가장 긴 제목·눈금 기준
+        self._measure()
+
+    @staticmethod
+    def _grid(radius: float):
+        """xz 단면 자기장 화살표 위치 (28,3)"""
+        h = max(radius + 0.3, 1)
+        gx, gz = np.meshgrid(np.linspace(-h, h, 7), np.linspace(-0.9, 1.8, 4))
+        return np.stack([gx, np.zeros_like(gx), gz], axis=-1).reshape(-1, 3)
+
+    def unit_field(self, radius):
+        """(중심 B_z, 단면 화살표 B)"""
+        return (loop_field_xyz([0, 0, 0], radius, 1.0)[2],
+                loop_field_xyz(self._grid(radius), radius, 1.0))
+
+    def update(self, current: float, radius: float, field=None):
+        ax, R = self.ax, radius
+        pts = self._grid(R)
+        if field is None:
+            field = (loop_field_xyz([0, 0, 0], R, current)[2],
+                     loop_field_xyz(pts, R, current))
+        self.loop.set_data_3d(R*np.cos(self.theta), R*np.sin(self.theta),
+                              np.zeros_like(self.theta))
+        on = abs(current) > 0.1
+        for artist in (self.current, self.center, self.field, self.label):
+            artist.set_visible(on)
+        if on:
+            # 전류 방향 (I > 0 반시계) – 원 위 네 지점의 접선, 길이 0.4 × 0.8
+            a = self.ANGLES
+            s = 0.32 if current > 0 else -0.32
+            tails = np.stack([R*np.cos(a), R*np.sin(a), np.zeros(4)], axis=-1)
+            self.current.set_segments(quiver_segments(
+                tails, np.stack([-np.sin(a)*s, np.cos(a)*s, np.zeros(4)], axis=-1), 0.3))
+            # 중심 자기장 – 반지름 1, 전류 1 의 중심값을 1 로 둔 상대 크기 (길이 ×1.5)
+            d = 1 if current > 0 else -1
+            B_magnitude = abs(field[0]) / self.B_unit
+            self.center.set_segments(quiver_segments(
+                [0, 0, 0], [0, 0, 1.5 * d * B_magnitude], 0.2))
+            # xz 단면 자기장 (화살표 길이 ∝ |B|, 너무 긴 화살표는 잘라냄)
+            B = field[1] / (self.B_unit * 5.0)
+            B *= np.minimum(1.0, 0.6 / (np.linalg.norm(B, axis=1, keepdims=True) + 1e-12))
+            self.field.set_segments(quiver_segments(pts, B, 0.3))
+            self.label.set_position_3d((0, 0, d * B_magnitude + 0.3))
+            self.label.set_text(f"B {'↑위' if d > 0 else '↓아래'}")
+        m = R + 0.5
+        ax.set_xlim(-m, m); ax.set_ylim(-m, m); ax.set_zlim(-1, 2)
+        current_dir = "반시계방향" if current > 0 else "시계방향" if current < 0 else "전류 없음"
+        ax.set_title(f"전류 {current:.1f}A ({current_dir})")
+        return self.fig
+
+
+# ============================================================
+#  3. 솔레노이드
+# ============================================================
+class SolenoidScene(Scene):
+    """반지름 1, 길이 6 나선 코일 + 내부 세 지점 자기장 화살표.
+    n 은 단위 길이당 감은 수 (회/cm) – 감은 수 n × L 은 '실제 자기장 계산' 지도와 같다"""
+
+    R, L = 1, 6
+    N_MAX = 30          # 앱 슬라이더 최댓값 – 화살표 길이 기준
+    SEG_PER_TURN = 24   # 코일 그림 한 바퀴 선분 수 (최대 180 바퀴)
+    X_POS = np.array([-0.5, 0, 0.5])
+
+    def __init__(self):
+        self.fig = Figure(figsize=(6, 5))
+        ax = self.ax = self.fig.add_subplot(111, projection="3d")
+        ax.view_init(elev=20, azim=-60)
+        (self.coil,) = ax.plot(*self._coil_xyz(15), color="gray", lw=0.5)
+        self.tails = np.stack([self.X_POS, np.zeros(3), np.full(3, -self.L/2)], axis=-1)
+        self.arrows = ax.quiver(*self.tails.T, *np.zeros((3, 3)).T,
+                                color="b", arrow_length_ratio=0.1)
+        self.B_ref = solenoid_field(0, 0, self.R, self.L, self.turns(self.N_MAX), 5.0)[1]
+        self.update(2.0, 15)
+        self._measure()
+
+    def turns(self, n: float) -> int:
+        return int(n) * self.L
+
+    def _coil_xyz(self, n: float):
+        coil = helix(self.R, self.L, self.turns(n), self.SEG_PER_TURN)
+        return np.vstack([coil[0], coil[1][-1:]]).T
+
+    def unit_field(self, n):
+        return solenoid_field(self.X_POS, 0, self.R, self.L, self.turns(n), 1.0)[1]
+
+    def update(self, current: float, n: float, field=None):
+        self.coil.set_data_3d(*self._coil_xyz(n))
+        self.coil.set_alpha(min(1.0, 8 / n))     # 촘촘히 감을수록 흐리게 – 안쪽 화살표가 보이게
+        Bz = (solenoid_field(self.X_POS, 0, self.R, self.L, self.turns(n), current)[1]
+              if field is None else field)
+        vec = np.stack([np.zeros(3), np.zeros(3), Bz * self.L / self.B_ref], axis=-1)
+        self.arrows.set_segments(quiver_segments(self.tails, vec, 0.1))
+        return self.fig
+
+
+if __name__ == "__main__":
+    import time
+    from io import BytesIO
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    # quiver_segments 가 Axes3D.quiver 와 같은 선분을 만드는지
+    ax = Figure().add_subplot(projection="3d")
+    rng = np.random.default_rng(0)
+    P, V = rng.normal(size=(20, 3)), rng.normal(size=(20, 3))
+    q = ax.quiver(*P.T, *V.T, arrow_length_ratio=0.25)
+    assert np.allclose(np.asarray(q._segments3d), quiver_segments(P, V, 0.25))
+
+    def fresh(cls, *args):
+        """예전 방식: 슬라이더가 바뀔 때마다 그림·3D 축·아티스트를 새로 만든다"""
+        return cls().update(*args)
+
+    def encode(fig, bbox="tight"):
+        buf = BytesIO()
+        fig.savefig(buf, format="png", dpi=110, bbox_inches=bbox)
+        return buf
+
+    panels = {
+        "직선 도선": (WireScene, [(i / 10,) for i in range(-50, 51, 7)]),
+        "원형 도선": (LoopScene, [(i / 10, 0.5 + (i % 25) / 10) for i in range(-50, 51, 7)]),
+        "솔레노이드": (SolenoidScene, [(0.1 + i / 10, 5 + i % 26) for i in range(0, 50, 4)]),
+    }
+    for name, (cls, values) in panels.items():
+        scene = cls()
+        encode(scene.update(*values[0]))              # 첫 그림 (폰트·캐시 준비)
+        t = time.perf_counter()
+        for v in values:
+            fresh(cls, *v)
+        t_new = (time.perf_counter() - t) / len(values)
+        t = time.perf_counter()
+        for v in values:
+            encode(fresh(cls, *v))
+        t_new_enc = (time.perf_counter() - t) / len(values)
+        t = time.perf_counter()
+        for v in values:
+            scene.update(*v)
+        t_upd = (time.perf_counter() - t) / len(values)
+        t = time.perf_counter()
+        for v in values:
+            encode(scene.update(*v), scene.bbox)
+        t_upd_enc = (time.perf_counter() - t) / len(values)
+        print(f"[{name}] 슬라이더 한 번: 그림 준비 {t_new*1e3:6.1f} → {t_upd*1e3:5.1f} ms "
+              f"({t_new/t_upd:4.1f}배) | 인코딩 포함 {t_new_enc*1e3:6.1f} → {t_upd_enc*1e3:6.1f} ms "
+              f"({t_new_enc/t_upd_enc:3.1f}배)")
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+같은 GPT 요청 합치기 (single-flight)
+
+선생님이 "이제 솔레노이드에 대해 물어보세요" 하면 똑같은 질문이 1 초 안에 수십 개 들어온다.
+답변 캐시(response_cache)는 첫 답이 끝나야 채워지므로 그 사이 질문은 모두 API 로 간다.
+여기서는 같은 키의 요청이 진행 중이면 새로 부르지 않고 그 요청의 조각을 함께 받는다.
+
+업스트림 호출은 백그라운드 스레드에서 끝까지 돈다 – 처음 부른 세션이 rerun 으로 떠나도
+기다리던 세션들은 계속 답을 받고, 호출 쪽 produce() 가 끝에서 캐시에 넣으면 그 뒤 질문은
+캐시에서 꺼낸다 (진행 중 → 캐시 사이 빈틈 없음).
+
+    python single_flight.py    # 30명이 같은 질문을 동시에 – 업스트림 호출 수와 합친 수
+"""
+import threading
+
+WAIT_S = 0.5        # 조각 없이 기다릴 때 on_wait 를 부르는 간격 (초)
+
+
+class Flight:
+    """진행 중인 요청 하나 – 도착한 조각을 쌓아 두고 여러 세션이 처음부터 따라 읽는다"""
+
+    def __init__(self):
+        self.parts = []
+        self.done = False
+        self.error = None
+        self.followers = 0
+        self._cond = threading.Condition()
+
+    def push(self, text: str):
+        with self._cond:
+            self.parts.append(text)
+            self._cond.notify_all()
+
+    def finish(self, error: BaseException = None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def follow(self, on_wait=None):
+        """지금까지 온 조각부터 끝까지 내놓는 생성기 (실패했으면 같은 예외).
+        새 조각 없이 WAIT_S 가 지날 때마다 on_wait() – 대기 안내를 부르는 세션 스레드에서 갱신"""
+        i = 0
+        while True:
+            with self._cond:
+                if i == len(self.parts) and not self.done:
+                    self._cond.wait(WAIT_S)
+                new = self.parts[i:]
+                done, error = self.done, self.error
+            i += len(new)
+            yield from new
+            if done and i == len(self.parts):
+                if error is not None:
+                    raise error
+                return
+            if not new and on_wait is not None:
+                on_wait()
+
+
+class SingleFlight:
+    """키 → 진행 중 Flight – 프로세스 공유, 스레드 안전. 합친 요청 수를 센다"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0        # 실제 업스트림 호출
+        self.merged = 0         # 진행 중 호출에 붙어 API 를 부르지 않은 요청
+        self.peak = 0           # 한 호출을 함께 받은 최대 요청 수
+        self.failed = 0
+
+    def stream(self, key, produce, on_wait=None):
+        """produce() (조각 생성기) 를 키마다 한 번만 돌리고, 그 조각을 내놓는 생성기를 돌려준다"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Flight()
+                self.leaders += 1
+                threading.Thread(target=self._run, args=(key, flight, produce),
+                                 daemon=True).start()
+            else:
+                self.merged += 1
+            flight.followers += 1
+            self.peak = max(self.peak, flight.followers)
+        return flight.follow(on_wait)
+
+    def _run(self, key, flight: Flight, produce):
+        error = None
+        try:
+            for text in produce():
+                flight.push(text)
+        except Exception as e:
+            error = e
+        finally:
+            # 목록에서 먼저 빼고 끝을 알린다 – 끝난 뒤 오는 요청은 캐시로 가거나 새로 부른다
+            with self._lock:
+                self._flights.pop(key, None)
+                if error is not None:
+                    self.failed += 1
+            flight.finish(error)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.leaders + self.merged
+            return {
+                "in_flight": len(self._flights),
+                "upstream": self.leaders,
+                "merged": self.merged,
+                "peak": self.peak,
+                "failed": self.failed,
+                "merge_rate": self.merged / total if total else 0.0,
+            }
+
+
+FLIGHTS = SingleFlight()
+
+
+if __name__ == "__main__":
+    import time
+
+    calls = 0
+
+    def slow_answer():
+        # 실제로는 API 스트리밍 – 첫 토큰 0.5 초, 토큰 20 개
+        global calls
+        calls += 1
+        time.sleep(0.5)
+        for i in range(20):
+            time.sleep(0.02)
+            yield f"토큰{i} "
+
+    flights = SingleFlight()
+    answers = []
+
+    def student(delay):
+        time.sleep(delay)
+        answers.append("".join(flights.stream("솔레노이드", slow_answer)))
+
+    # 30명이 0.8 초 안에 같은 질문 (첫 답이 끝나기 전)
+    t = time.perf_counter()
+    threads = [threading.Thread(target=student, args=(i * 0.025,)) for i in range(30)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    dt = time.perf_counter() - t
+    print(f"학생 30명 동시 질문 → 업스트림 {calls}회, {dt:.2f} s, {flights.stats()}")
+    assert calls == 1 and len(set(answers)) == 1 and len(answers) == 30
+
+    # 실패는 기다리던 모두에게 같은 예외로
+    def broken():
+        time.sleep(0.2)
+        yield "토큰0 "
+        raise RuntimeError("업스트림 오류")
+
+    errors = []
+
+    def student_err():
+        try:
+            "".join(flights.stream("오류", broken))
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=student_err) for _ in range(5)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert errors == ["업스트림 오류"] * 5
+    print("실패 전파 확인:", flights.stats())
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+나선 도선(솔레노이드)의 실제 자기장 – 축 위 B(z) 곡선과 xz 단면 지도
+
+감은 수 n(단위 길이당)에 맞는 나선 경로를 만들고 Biot–Savart 로 계산한다.
+메모리가 일정하도록 나선을 몇 바퀴씩 나눠(턴 청크) 더한다.
+자기장은 전류에 비례하므로 단위 전류 결과만 캐시하고 I 를 곱해 쓴다.
+"""
+import numpy as np
+
+from field_engine import biot_savart_path, MU0_4PI
+
+SEG_PER_TURN = 12
+
+
+def helix_path(radius: float, length: float, n_per_length: float,
+               seg_per_turn: int = SEG_PER_TURN):
+    """길이 length 에 단위 길이당 n 번 감긴 나선의 꼭짓점 (K,3)"""
+    turns = max(n_per_length * length, 1.0)
+    n_seg = int(np.ceil(turns * seg_per_turn))
+    t = np.linspace(-np.pi * turns, np.pi * turns, n_seg + 1)
+    z = np.linspace(-length / 2, length / 2, n_seg + 1)
+    return np.stack([radius * np.cos(t), radius * np.sin(t), z], axis=-1)
+
+
+def helix_field(points, radius: float, length: float, n_per_length: float,
+                current=1.0, turns_per_chunk: int = 20,
+                seg_per_turn: int = SEG_PER_TURN):
+    """나선 솔레노이드가 평가점 (…,3) 에 만드는 B – 턴 청크 단위로 누적"""
+    path = helix_path(radius, length, n_per_length, seg_per_turn)
+    pts = np.asarray(points, dtype=float)
+    B = np.zeros(pts.shape)
+    block = turns_per_chunk * seg_per_turn
+    for i in range(0, len(path) - 1, block):
+        B += biot_savart_path(pts, path[i:i + block + 1], current)
+    return B
+
+
+def ideal_field(n_per_length: float, current=1.0):
+    """무한히 긴 솔레노이드 내부 자기장 μ0 n I"""
+    return 4 * np.pi * MU0_4PI * n_per_length * current
+
+
+def solenoid_maps(radius: float, length: float, n_per_length: float,
+                  z_axis, x_grid, z_grid):
+    """
+    단위 전류일 때 (축 위 Bz(z), xz 단면 X, Z, Bx, Bz) 를 한 번에 계산.
+    축 위 점과 단면 격자점을 합쳐 나선 경로를 한 번만 순회한다.
+    """
+    X, Z = np.meshgrid(x_grid, z_grid)
+    axis_pts = np.stack([np.zeros_like(z_axis), np.zeros_like(z_axis), z_axis], axis=-1)
+    grid_pts = np.stack([X, np.zeros_like(X), Z], axis=-1).reshape(-1, 3)
+    B = helix_field(np.vstack([axis_pts, grid_pts]), radius, length, n_per_length)
+    Bg = B[len(z_axis):].reshape(X.shape + (3,))
+    return B[:len(z_axis), 2], X, Z, Bg[..., 0], Bg[..., 2]
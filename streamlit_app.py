@@ -6,13 +6,38 @@
 ########################  공통 import  ########################
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 from matplotlib import font_manager
 import matplotlib.patches as patches
 from mpl_toolkits.mplot3d import Axes3D  # 3D 시뮬레이션을 위해 추가
-import os, datetime
+import os, datetime, uuid
 from pathlib import Path
 from io import BytesIO
+from concurrent.futures.process import BrokenProcessPool
+
+from field_engine import WORKSPACES
+from cache import FIELD_CACHE, FIGURE_CACHE, TILE_CACHE, quantize
+from field_lines import draw_lines
+import magnets
+from loop_field import loop_field, loop_flux, solenoid_field
+from solenoid import ideal_field
+import wire_tree
+import compass
+import hires
+import atlas
+import tiles
+import field_grids
+import figure_output
+from figure_output import FIGURE_LOG
+from figure_pool import FIGURES
+import scenes3d
+import ac_animation
+import gpt_client
+from response_cache import RESPONSES, cache_key
+from single_flight import FLIGHTS
+from gpt_scheduler import SCHEDULER, estimate_tokens
+from field_canvas import field_canvas
+from field_grids import (MAG_LEN, MAGNET_LAYOUTS, magnet_layout,
+                         COMPASS_SOL_RADIUS, COMPASS_SOL_LENGTH)
 
 
 # ------------------------------------------------------------
@@ -34,11 +59,8 @@ except ModuleNotFoundError:
 # ------------------------------------------------------------
 #  OpenAI (선택)
 # ------------------------------------------------------------
-try:
-    from openai import OpenAI
-    GPT_ENABLED = True
-except ModuleNotFoundError:
-    GPT_ENABLED = False
+GPT_ENABLED = gpt_client.GPT_ENABLED
+if not GPT_ENABLED:
     st.warning(
         "⚠️ `openai` 패키지가 설치돼 있지 않아 AI챗봇 기능이 꺼져 있습니다.\n"
         "• 로컬:  `pip install openai`\n"
@@ -58,29 +80,115 @@ except ModuleNotFoundError:
 # ============================================================
 #  GPT 헬퍼
 # ============================================================
-def call_gpt(system_prompt: str, user_prompt: str, max_tokens: int = 350):
-    """GPT-4o 호출 헬퍼 – API Key 는 사이드바 입력"""
+def student_id() -> str:
+    """대기열 공정 배분 단위 – 학번을 입력했으면 학번, 아니면 세션마다 임의 id"""
+    info = st.session_state.get("student_info") or {}
+    if info.get("학번"):
+        return info["학번"]
+    return st.session_state.setdefault("session_id", uuid.uuid4().hex[:8])
+
+def queue_notice(key):
+    """대기열에 서 있는 동안 순번과 예상 대기 시간을 보여 주는 콜백 (세션 스레드에서 불림)"""
+    box = st.empty()
+
+    def show():
+        status = SCHEDULER.status(key)
+        if status is None:
+            box.empty()
+        else:
+            position, eta = status
+            box.info(f"⏳ 지금 질문이 몰려 순서를 기다리는 중입니다 – 대기 {position}번째, 약 {eta:.0f}초")
+    return box, show
+
+def call_gpt(system_prompt: str, user_prompt: str, max_tokens: int = 350,
+             cache: bool = True):
+    """GPT-4o 호출 헬퍼 – API Key 는 사이드바 입력. 클라이언트는 키별로 재사용.
+    같은 질문의 답은 공유 캐시에서 꺼낸다 – 학생 개인 답안 피드백은 cache=False.
+    실제 호출은 전체 대기열(SCHEDULER)을 거치고, 시간 제한·재시도·헤지는 gpt_client.chat 이 맡는다"""
     if not GPT_ENABLED:
         return "(openai 모듈 없음)"
     api_key = st.session_state.get("openai_api_key", "")
     if not api_key:
         st.warning("사이드바에 OpenAI API Key를 입력해주세요.")
         return "(API Key 미입력)"
+    args = (system_prompt, user_prompt, gpt_client.MODEL, max_tokens)
+    if cache and (answer := RESPONSES.get(*args)) is not None:
+        return answer
+    student = student_id()
+    key = cache_key(*args) if cache else (student, cache_key(*args))
+    cost = estimate_tokens(system_prompt, user_prompt, max_tokens=max_tokens)
+    box, on_wait = queue_notice(key)
+
+    def produce(on_wait=None):
+        with SCHEDULER.slot(student, cost, key, on_wait):
+            if on_wait is not None:
+                on_wait()                       # 차례가 왔으니 대기 안내를 지운다
+            answer = gpt_client.complete(gpt_client.CLIENTS.get(api_key),
+                                         system_prompt, user_prompt, max_tokens,
+                                         scheduler=SCHEDULER)
+        if cache:
+            RESPONSES.put(*args, answer)
+        yield answer
     try:
-        client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            max_tokens=max_tokens,
-            temperature=0.7,
-        )
-        return response.choices[0].message.content.strip()
+        if not cache:
+            return "".join(produce(on_wait))
+        # 같은 질문이 진행 중이면 그 호출의 답을 함께 받는다
+        return "".join(FLIGHTS.stream(key, produce, on_wait))
     except Exception as e:
-        st.error(f"[AI챗봇 오류] {e}")
-        return f"[AI챗봇 오류] {e}"
+        message = f"[AI챗봇 오류] {gpt_client.describe_error(e)}"
+        st.error(message)
+        return message
+    finally:
+        box.empty()
+
+def stream_gpt(system_prompt: str, user_prompt: str, max_tokens: int = 350,
+               cache: bool = True):
+    """call_gpt 의 스트리밍판 – 토큰이 오는 대로 내놓는다 (st.write_stream 에 넘김).
+    캐시에 있으면 저장된 답을 한 번에, 없으면 끝까지 받은 답만 캐시에 넣는다.
+    같은 질문이 이미 진행 중이면 API 를 다시 부르지 않고 그 스트림을 함께 받는다"""
+    if not GPT_ENABLED:
+        yield "(openai 모듈 없음)"
+        return
+    api_key = st.session_state.get("openai_api_key", "")
+    if not api_key:
+        st.warning("사이드바에 OpenAI API Key를 입력해주세요.")
+        yield "(API Key 미입력)"
+        return
+    args = (system_prompt, user_prompt, gpt_client.MODEL, max_tokens)
+    if cache and (answer := RESPONSES.get(*args)) is not None:
+        yield answer
+        return
+    student = student_id()
+    key = cache_key(*args) if cache else (student, cache_key(*args))
+    cost = estimate_tokens(system_prompt, user_prompt, max_tokens=max_tokens)
+    box, on_wait = queue_notice(key)
+
+    def produce(on_wait=None):
+        parts = []
+        # 스트림이 끝날 때까지 자리를 잡고 있는다 (동시 연결 수 = 동시 호출 수)
+        with SCHEDULER.slot(student, cost, key, on_wait):
+            if on_wait is not None:
+                on_wait()
+            for text in gpt_client.chat(gpt_client.CLIENTS.get(api_key),
+                                        system_prompt, user_prompt, max_tokens,
+                                        scheduler=SCHEDULER):
+                parts.append(text)
+                yield text
+        if cache and parts:
+            RESPONSES.put(*args, "".join(parts))
+    try:
+        # 공유 가능한 질문은 진행 중인 같은 질문의 스트림에 붙는다
+        chunks = FLIGHTS.stream(key, produce, on_wait) if cache else produce(on_wait)
+        for i, text in enumerate(chunks):
+            if i == 0:
+                box.empty()
+            yield text
+    except Exception as e:
+        message = f"[AI챗봇 오류] {gpt_client.describe_error(e)}"
+        st.error(message)
+        yield message
+    finally:
+        box.empty()
 
 # ============================================================
 #  스트림릿 페이지/글꼴
@@ -293,6 +401,15 @@ with st.sidebar:
         st.session_state.current = 0
         st.rerun()
 
+    # ---------- 그림 전송 방식 ----------
+    st.markdown("---")
+    st.selectbox("🖼️ 그림 전송 방식", figure_output.CHOICES, key="fig_output",
+                 help="교실 와이파이가 느리면 '압축 PNG'나 '저대역'을 고르세요. "
+                      "'자동'은 전송량이 많을 때 스스로 저대역으로 바꿉니다.")
+    if st.session_state.get("fig_output", figure_output.AUTO) == figure_output.AUTO:
+        st.caption(f"지금: {figure_output.resolve(figure_output.AUTO)} "
+                   f"(최근 그림 전송 {FIGURE_LOG.rate()/1e6:.2f} MB/s)")
+
 
 
 
@@ -337,13 +454,11 @@ def page_intro_physics():
         st.session_state.chat_history.append(("user", prompt))
         st.chat_message("user").write(prompt)
         with st.chat_message("assistant"):
-            with st.spinner("AI챗봇이 답변을 생성 중입니다..."):
-                sys = ("You are a friendly and knowledgeable physics tutor for "
-                       "Korean high-school students. Your name is 'Phi-Bot'. "
-                       "Answer in Korean.")
-                ans = call_gpt(sys, prompt, 450)
-                st.write(ans)
-                st.session_state.chat_history.append(("assistant", ans))
+            sys = ("You are a friendly and knowledgeable physics tutor for "
+                   "Korean high-school students. Your name is 'Phi-Bot'. "
+                   "Answer in Korean.")
+            ans = st.write_stream(stream_gpt(sys, prompt, 450))
+            st.session_state.chat_history.append(("assistant", ans))
 
 def page_goal():
     st.markdown("""
@@ -359,6 +474,264 @@ def page_goal_2():
     2. 전류의 자기 현상이 적용된 생활 속 사례를 설명할 수 있다.
     """)
 
+# ============================================================
+#  자기장 격자 계산 (프로세스 공유 캐시 사용)
+# ============================================================
+ATLAS, ATLAS_STATUS = atlas.open_atlas()
+
+def field_data(key):
+    """키 → 자기장 배열 튜플: 아틀라스(memmap, 복사 없음) → 프로세스 캐시 → 계산"""
+    if ATLAS is not None:
+        hit = ATLAS.get(key)
+        if hit is not None:
+            return hit
+    return FIELD_CACHE.get_or_compute(key, lambda: field_grids.compute(key))
+
+def bar_magnet_grid(strength: float, n: int = 161):
+    """막대자석 주위 (X, Y, Bx, By) n×n – 슬라이더 값이 같으면 캐시에서 반환"""
+    return field_data(("bar", quantize(strength, 0.1), int(n)))
+
+def magnet_lines(layout: str, distance: float, n_mag: int):
+    """자석 배치의 자기력선 폴리라인 – 캐시에서 반환.
+
+    자석 세기는 B 전체에 곱해지는 상수라 자기력선 모양을 바꾸지 않으므로
+    키에서 뺀다.
+    """
+    return field_data(("lines", layout, quantize(distance, 0.1), int(n_mag)))
+
+def magnet_log_strength(layout: str, distance: float, n_mag: int):
+    """자석 배치의 세기 1 log10|B| (121×161) – 브라우저 캔버스 색 지도용"""
+    return field_data(("logb", layout, quantize(distance, 0.1), int(n_mag)))[0]
+
+@st.cache_resource
+def field_pool():
+    """고해상도 계산용 프로세스 풀 – 서버에 하나만 띄워 재실행·세션이 함께 쓴다"""
+    return hires.make_pool()
+
+def magnet_strength_map(layout: str, distance: float, n_mag: int):
+    """자석 배치의 log10|B| 고해상도(1200×900) 지도 – 타일을 프로세스 풀에서 계산.
+    세기 k' 는 log|B| 를 평행이동할 뿐이라 키에서 뺀다."""
+    key = ("hires", layout, quantize(distance, 0.1), int(n_mag))
+    def compute():
+        poles = magnet_layout(layout, distance, n_mag)
+        xy = np.stack([poles["x"], poles["y"]], axis=-1)
+        axes = [np.linspace(-3, 3, 900), np.linspace(-4, 4, 1200)]
+        args = (xy, magnets.charges(poles))
+        pool = field_pool()
+        try:
+            B = hires.compute_grid("poles", axes, args, pool=pool)
+        except BrokenProcessPool:
+            # 작업 프로세스가 죽은 풀은 다시 쓸 수 없다 – 버리고(다음 요청 때 새로 띄움) 이번은 이 프로세스에서
+            pool.shutdown(wait=False, cancel_futures=True)
+            field_pool.clear()
+            B = hires.compute_grid("poles", axes, args)
+        return np.log10(np.hypot(B[0], B[1]) + 1e-12).astype(np.float32)
+    return FIELD_CACHE.get_or_compute(key, compute)
+
+def solenoid_grid(n_per_length: int):
+    """단위 전류 솔레노이드의 축 위 B(z)·xz 단면 – 감은 수 n 마다 한 번만 계산.
+    자기장은 전류에 비례하므로 전류는 그릴 때 곱한다."""
+    return field_data(("solenoid", int(n_per_length)))
+
+# ============================================================
+#  나침반 격자 – 실험 1·2·3 과 기본 개념 문제(2차시)
+# ============================================================
+def compass_field(kind: str, size: float):
+    """단위 전류(1 A) 도선이 나침반 격자에 만드는 (X, Y, Bx, By) – 캐시에서 반환.
+    size: 직선 도선 높이 / 원형 도선 반지름 (cm), 솔레노이드는 감은 수."""
+    return field_data(("compass", kind, quantize(size, 0.1)))
+
+def compass_simulator(kind: str, key: str):
+    """전류·거리·지구 자기장 슬라이더 + 나침반 격자 그림 (quiver 한 번)"""
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        current = st.slider("전류 I (A)", -5.0, 5.0, 2.0, 0.1, key=f"{key}_I")
+        if kind == "straight":
+            size = st.slider("도선 높이 (cm)", 0.5, 5.0, 2.0, 0.1, key=f"{key}_h")
+        elif kind == "loop":
+            size = st.slider("원형 도선 반지름 (cm)", 1.0, 5.0, 3.0, 0.1, key=f"{key}_r")
+        else:
+            size = st.slider("감은 수 (회)", 10, 200, 60, 10, key=f"{key}_n")
+        earth = st.slider("지구 자기장 수평 성분 (μT)", 0.0, 60.0,
+                          compass.EARTH_FIELD * 1e6, 1.0, key=f"{key}_earth")
+        st.caption("전류 + 방향: 직선 도선은 북→남, 원형 도선·솔레노이드는 "
+                   "중심(내부) 자기장이 동쪽이 되는 방향")
+
+    def draw():
+        X, Y, Bx, By = compass_field(kind, size)
+        u, v = compass.needle_directions(current * Bx, current * By, earth * 1e-6)
+        fig, ax = FIGURES.subplots(figsize=(6, 6))
+        if kind == "solenoid":
+            L, R = COMPASS_SOL_LENGTH, COMPASS_SOL_RADIUS
+            ax.add_patch(patches.Rectangle((-L/2, -R), L, 2*R, fc="#FFE4B5",
+                                           ec="#CD853F", lw=2, zorder=1))
+            for x in np.linspace(-L/2, L/2, min(int(size), 40)):
+                ax.plot([x, x], [-R, R], color="#CD853F", lw=0.8, zorder=1)
+        else:
+            half = 6.5 if kind == "straight" else size
+            ax.plot([0, 0], [-half, half], color="#FF8C00", lw=5, alpha=0.6, zorder=1)
+        if kind == "straight" and current != 0:
+            ax.annotate("", xy=(0.6, -np.sign(current)*1.5), xytext=(0.6, np.sign(current)*1.5),
+                        arrowprops=dict(arrowstyle="->", color="#FF8C00", lw=2))
+            ax.text(0.9, 0, f"I (높이 {size:.1f} cm)", color="#FF8C00", va="center")
+        compass.draw_compasses(ax, X, Y, u, v, size=0.6)
+        c = np.unravel_index(np.argmin(np.hypot(X, Y)), X.shape)
+        ax.text(-6.4, 6.4, "북 ↑", fontsize=12, fontweight="bold", va="top",
+                bbox=dict(fc="white", ec="none", alpha=0.9), zorder=5)
+        ax.set_title(f"나침반 자침 (중심 자침 회전각 "
+                     f"{compass.deflection_deg(u[c], v[c]):+.0f}°)")
+        ax.set_xlim(-6.6, 6.6); ax.set_ylim(-6.6, 6.6); ax.set_aspect("equal")
+        ax.set_xlabel("서 ← x (cm) → 동"); ax.set_ylabel("남 ← y (cm) → 북")
+        return fig
+    with c2:
+        show_figure(("compass", kind, quantize(current, 0.1), quantize(size, 0.1),
+                     quantize(earth, 1.0)), draw)
+
+# ============================================================
+#  확대·이동 보기 – 보이는 타일만 계산 (TILE_CACHE 공유)
+# ============================================================
+def draw_magnet_bodies(ax, poles):
+    """자석마다 N/S 반쪽 직사각형 + 글자"""
+    for m, ang, gap, is_n in magnets.magnet_halves(poles):
+        ax.add_patch(patches.Rectangle(
+            (m[0]-gap/2, m[1]-gap/4), gap, gap/2, angle=ang,
+            rotation_point='center', fc='#DC143C' if is_n else '#4169E1',
+            ec='k', zorder=3))
+        ax.text(m[0], m[1], 'N' if is_n else 'S', ha='center', va='center',
+                color='w', weight='bold', zorder=4, clip_on=True,
+                fontsize=10 if gap >= 0.8 else 6)
+
+def magnet_tile(layout: str, distance: float, n_mag: int, level: int, tx: int, ty: int):
+    """자석 배치의 자기장 타일 (2, px, px) – (레벨, x, y, 매개변수) 키로 캐시"""
+    key = (level, tx, ty, "magnets", layout, quantize(distance, 0.1), int(n_mag))
+    def compute():
+        poles = magnet_layout(layout, distance, n_mag)
+        return tiles.render_tile(lambda X, Y: magnets.superpose(poles, X, Y), level, tx, ty)
+    return TILE_CACHE.get_or_compute(key, compute)
+
+def magnet_zoom_view(layout: str, distance: float, n_mag: int):
+    """확대 단계·이동 버튼 + 보이는 타일을 이어 붙인 자기장 세기 지도"""
+    if "zoom_center" not in st.session_state:
+        st.session_state.zoom_center = (0.0, 0.0)
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        zoom = st.slider("확대 단계 (2ⁿ 배)", 0, 12, 2, key="zoom_level")
+        cx, cy = st.session_state.zoom_center
+        step = tiles.WORLD / 2 ** zoom / 4          # 한 번에 보기 창 1/4 이동
+        moves = {"⬆️": (0, step), "⬅️": (-step, 0), "🎯": None,
+                 "➡️": (step, 0), "⬇️": (0, -step)}
+        rows = [[None, "⬆️", None], ["⬅️", "🎯", "➡️"], [None, "⬇️", None]]
+        for row in rows:
+            for col, label in zip(st.columns(3), row):
+                if label and col.button(label, key=f"zoom_{label}", use_container_width=True):
+                    d = moves[label]
+                    cx, cy = (0.0, 0.0) if d is None else (cx + d[0], cy + d[1])
+        cx, cy = tiles.clamp_center(zoom, cx, cy)
+        st.session_state.zoom_center = (cx, cy)
+        st.caption("🎯 : 가운데(두 극 사이)로")
+
+    def draw():
+        poles = magnet_layout(layout, distance, n_mag)
+        view = tiles.view_bounds(zoom, cx, cy)
+        level = tiles.tile_level(zoom)
+        block, extent = tiles.compose(
+            level, view, lambda l, tx, ty: magnet_tile(layout, distance, n_mag, l, tx, ty))
+        logB = np.log10(np.hypot(block[0], block[1]) + 1e-30)
+        fig, ax = FIGURES.subplots(figsize=(8, 6))
+        lo, hi = np.percentile(logB, [2, 98])
+        ax.imshow(logB, extent=extent, origin='lower', cmap='YlOrRd',
+                  vmin=lo, vmax=hi, interpolation='bilinear')
+        # 방향 화살표는 확대 단계와 상관없이 화면 격자에서 바로 계산
+        X, Y = np.meshgrid(np.linspace(*view[:2], 26)[1:-1], np.linspace(*view[2:], 20)[1:-1])
+        Bx, By = magnets.superpose(poles, X, Y)
+        n = np.hypot(Bx, By) + 1e-30
+        ax.quiver(X, Y, Bx/n, By/n, color='k', pivot='mid', scale=40, width=0.003)
+        draw_magnet_bodies(ax, poles)
+        ax.set_xlim(*view[:2]); ax.set_ylim(*view[2:]); ax.set_aspect('equal')
+        ax.set_title(f"{2**zoom}배 확대 · 중심 ({cx:+.4g}, {cy:+.4g}) · "
+                     f"타일 레벨 {level}")
+        return fig
+    with c2:
+        show_figure(("zoom", layout, quantize(distance, 0.1), int(n_mag), zoom,
+                     quantize(cx, 1e-6), quantize(cy, 1e-6)), draw)
+
+# ============================================================
+#  그림 캐시 – 같은 슬라이더 상태면 matplotlib 렌더링 생략
+# ============================================================
+COARSE_DPI = 60   # 먼저 보여 주는 저해상도 그림
+
+def fig_to_bytes(fig, preset: str, dpi: int = None, bbox_inches="tight") -> bytes:
+    """전송 프리셋(형식·dpi·압축)으로 인코딩 후 figure 를 풀에 되돌림"""
+    try:
+        return figure_output.encode(fig, preset, dpi, bbox_inches)
+    finally:
+        FIGURES.release(fig)
+
+def send_image(slot, data: bytes, preset: str, name: str, hit: bool):
+    """인코딩된 그림을 slot 에 표시하고 전송 바이트를 기록"""
+    image, nbytes = figure_output.image_arg(data, preset)
+    slot.image(image, use_column_width=True)
+    FIGURE_LOG.record(name, preset, nbytes, hit)
+
+def session_scene(name: str, cls):
+    """세션마다 한 번 만든 3D 장면 – 재실행 사이에 그림·축·아티스트를 유지"""
+    key = f"scene_{name}"
+    if key not in st.session_state:
+        st.session_state[key] = cls()
+    return st.session_state[key]
+
+def show_figure(key, draw, coarse=None, bbox_inches="tight"):
+    """key 로 인코딩된 그림을 찾고, 없으면 draw() 로 그려 캐시한 뒤 표시.
+
+    그림은 사이드바에서 고른 전송 방식(자동이면 현재 전송량에 따라 정해진
+    프리셋)으로 인코딩하며, 프리셋 이름이 캐시 키에 들어간다. 축 배치가 고정된
+    그림은 bbox_inches 로 잘라 낼 범위를 주면 저장 때 범위를 재는 그리기를 생략한다.
+
+    coarse 를 주면 처음 보는 key 일 때 coarse() 의 저밀도 그림을 먼저 st.empty
+    자리에 보이고, 고해상도 그림이 준비되면 같은 자리를 바꾼다. 단계마다
+    안내 문구를 갱신하는데 스트림릿은 그 지점에서 새 슬라이더 값이 들어왔는지
+    확인해 이번 실행을 멈추므로, 낡은 값의 고해상도 렌더링은 버려진다.
+    """
+    preset = figure_output.resolve(st.session_state.get("fig_output", figure_output.AUTO))
+    name, key = key[0], key + (preset,)
+    hit = key in FIGURE_CACHE
+    if coarse is None or hit:
+        data = FIGURE_CACHE.get_or_compute(
+            key, lambda: fig_to_bytes(draw(), preset, bbox_inches=bbox_inches))
+        send_image(st, data, preset, name, hit)
+        return
+    slot, note = st.empty(), st.empty()
+    data = FIGURE_CACHE.get_or_compute(("coarse",) + key,
+                                       lambda: fig_to_bytes(coarse(), preset, COARSE_DPI,
+                                                            bbox_inches))
+    send_image(slot, data, preset, "미리보기", False)
+    note.caption("🔄 고해상도로 그리는 중…")
+    def refine():
+        fig = draw()
+        try:
+            note.caption("🔄 고해상도 이미지 만드는 중…")
+        except BaseException:      # 새 슬라이더 값 → 스트림릿이 실행을 멈춤
+            FIGURES.release(fig)
+            raise
+        return fig_to_bytes(fig, preset, bbox_inches=bbox_inches)
+    send_image(slot, FIGURE_CACHE.get_or_compute(key, refine), preset, name, False)
+    note.empty()
+
+def show_animation(key, scene, amplitude: float, *args):
+    """교류 한 주기 애니메이션 (WebP) – key 와 전송 프리셋으로 캐시.
+    처음 보는 key 면 scene() 이 준 장면으로 프레임을 그려 한 번 인코딩하고, 그 뒤로는
+    캐시된 바이트만 보낸다 (재생은 브라우저가 한다)."""
+    choice = figure_output.resolve(st.session_state.get("fig_output", figure_output.AUTO))
+    preset = ac_animation.animation_preset(choice)
+    name, key = key[0], key + (preset,)
+    hit = key in FIGURE_CACHE
+    data = FIGURE_CACHE.get_or_compute(
+        key, lambda: ac_animation.encode(scene(), ac_animation.ac_currents(amplitude),
+                                         preset, *args))
+    send_image(st, data, preset, name, hit)
+    st.caption(f"I = I₀ sin ωt, I₀ = {amplitude:.1f} A – 한 주기를 {ac_animation.FRAMES}장으로 "
+               f"({ac_animation.PERIOD_MS / 1000:.0f}초에 한 주기, 실제 교류보다 느리게)")
+
 def page_simulation():
     """자기장 시뮬레이션(막대자석 & 자석 상호작용)"""
     # --- 막대자석 ---
@@ -383,68 +756,146 @@ def page_simulation():
         dens     = st.slider("화살표 밀도", 15, 35, 25, 5)
     with c2:
         # 벡터필드 계산
-        fig, ax = plt.subplots(figsize=(7, 7))
-        ax.set_aspect('equal'); ax.grid(True, ls='--', alpha=0.3)
-        mag_len, mag_w = 1.2, 0.4
-        north, south = np.array([0,  mag_len/2]), np.array([0, -mag_len/2])
-        x, y = np.linspace(-3, 3, dens), np.linspace(-3, 3, dens)
-        X, Y = np.meshgrid(x, y)
-        RX, RY = X - north[0], Y - north[1]
-        SX, SY = X - south[0], Y - south[1]
-        rN, rS = np.hypot(RX, RY)+1e-9, np.hypot(SX, SY)+1e-9
-        Bx = strength * (RX/rN**3 - SX/rS**3)
-        By = strength * (RY/rN**3 - SY/rS**3)
-        ax.streamplot(X, Y, Bx, By, color="k", density=1.3, linewidth=0.9)
-        # 자석 표시
-        ax.add_patch(patches.Rectangle((-mag_w/2, 0), mag_w, mag_len/2,
-                                       fc="#DC143C", ec="k", zorder=10))
-        ax.add_patch(patches.Rectangle((-mag_w/2, -mag_len/2), mag_w, mag_len/2,
-                                       fc="#4169E1", ec="k", zorder=10))
-        ax.text(0,  mag_len/2 + 0.2, "N", ha="center", weight="bold")
-        ax.text(0, -mag_len/2 - 0.3, "S", ha="center", weight="bold")
-        st.pyplot(fig)
+        def draw(fine=True):
+            fig, ax = FIGURES.subplots(figsize=(7, 7))
+            ax.set_aspect('equal'); ax.grid(True, ls='--', alpha=0.3)
+            mag_len, mag_w = MAG_LEN, 0.4
+            X, Y, Bx, By = bar_magnet_grid(strength, 161 if fine else 41)
+            ax.streamplot(X, Y, Bx, By, color="k", density=1.3 * dens / 25 if fine else 0.6,
+                          linewidth=0.9)
+            # 자석 표시
+            ax.add_patch(patches.Rectangle((-mag_w/2, 0), mag_w, mag_len/2,
+                                           fc="#DC143C", ec="k", zorder=10))
+            ax.add_patch(patches.Rectangle((-mag_w/2, -mag_len/2), mag_w, mag_len/2,
+                                           fc="#4169E1", ec="k", zorder=10))
+            ax.text(0,  mag_len/2 + 0.2, "N", ha="center", weight="bold")
+            ax.text(0, -mag_len/2 - 0.3, "S", ha="center", weight="bold")
+            return fig
+        show_figure(("bar", quantize(strength, 0.1), dens), draw,
+                    coarse=lambda: draw(fine=False))
 
     # --- 두 자석 ---
     st.markdown("---")
     st.markdown("### 🧲↔️🧲 두 자석의 상호작용 시뮬레이션")
     c1, c2 = st.columns([1, 2])
     with c1:
-        interaction = st.radio("자석 배치",
-                               ["S극-N극 (인력)", "S극-S극 (척력)"])
-        distance = st.slider("두 자석 중심 거리 (×0.1)", 100.0, 400.0, 250.0, 10.0) / 100.0
-        strength2 = st.slider("자석 세기 k'", 50.0, 300.0, 100.0, 10.0) / 10.0
+        interaction = st.radio("자석 배치", MAGNET_LAYOUTS)
+        if interaction in ("자석 고리", "자석 사슬"):
+            n_mag = st.slider("자석 개수", 3, 24, 8, 1)
+            distance = 0.0
+        else:
+            n_mag = 2
+            distance = st.slider("두 자석 중심 거리 (×0.1)", 100.0, 400.0, 250.0, 10.0) / 100.0
+        canvas_on = st.toggle("브라우저에서 그리기 (세기 조절 즉시 반영)", key="mag_canvas")
+        if canvas_on:
+            hires_on = False
+            st.caption("자석 세기는 그림 위 슬라이더로 조절합니다 – 서버를 다시 "
+                       "실행하지 않고 브라우저가 바로 다시 칠합니다.")
+        else:
+            hires_on = st.toggle("고해상도 자기장 세기 지도 (멀티코어 계산)", key="mag_hires")
+            # 세기는 B 를 k 배 할 뿐 자기력선 모양·세기 지도(분위수 색 범위)를 바꾸지 않는다
+            st.caption("자석 세기를 바꿔도 자기력선 모양은 그대로입니다 (자기장이 세기에 비례해 "
+                       "커질 뿐) – 세기를 바꿔 보려면 '브라우저에서 그리기' 를 켜세요.")
     with c2:
-        x, y = np.linspace(-4, 4, 37), np.linspace(-3, 3, 29)
-        X, Y = np.meshgrid(x, y)
-        # 자석 좌표
-        n1, s1 = np.array([-distance/2-0.4, 0]), np.array([-distance/2+0.4, 0])
-        if interaction.startswith("S극-N극"):
-            n2, s2 = np.array([distance/2-0.4, 0]), np.array([distance/2+0.4, 0])
-        else:  # N-S
-            n2, s2 = np.array([distance/2+0.4, 0]), np.array([distance/2-0.4, 0])
-        # 합성 자기장
-        def dB(px, py, mx, my):
-            RX, RY = px - mx, py - my
-            r3 = (RX**2 + RY**2)**1.5 + 1e-9
-            return RX/r3, RY/r3
-        Bx = strength2 * (dB(X, Y, *n1)[0] - dB(X, Y, *s1)[0] +
-                          dB(X, Y, *n2)[0] - dB(X, Y, *s2)[0])
-        By = strength2 * (dB(X, Y, *n1)[1] - dB(X, Y, *s1)[1] +
-                          dB(X, Y, *n2)[1] - dB(X, Y, *s2)[1])
-        # 그림
-        fig, ax = plt.subplots(figsize=(9, 6))
-        ax.set_aspect('equal'); ax.set_xlim(-4, 4); ax.set_ylim(-3, 3)
-        ax.grid(True, ls='--', alpha=0.3)
-        ax.streamplot(X, Y, Bx, By, color='k', density=2.0, linewidth=1)
-        # 자석 4개 직사각 + N/S 텍스트
-        for m, color, txt in [(n1, '#DC143C', 'N'), (s1, '#4169E1', 'S'),
-                              (n2, '#DC143C', 'N'), (s2, '#4169E1', 'S')]:
-            ax.add_patch(patches.Rectangle((m[0]-0.4, -0.2), 0.8, 0.4,
-                                           fc=color, ec='k'))
-            ax.text(m[0], 0, txt, ha='center', va='center',
-                    color='w', weight='bold')
-        ax.set_title(f"두 자석 합성 자기장 ({interaction})")
-        st.pyplot(fig)
+        def draw(fine=True):
+            # 자석 배치 & 자기력선 (N극 → S극, 적응형 RK 추적)
+            poles = magnet_layout(interaction, distance, n_mag)
+            # 그림
+            fig, ax = FIGURES.subplots(figsize=(9, 6))
+            ax.set_aspect('equal'); ax.set_xlim(-4, 4); ax.set_ylim(-3, 3)
+            ax.grid(True, ls='--', alpha=0.3)
+            if fine and hires_on:
+                logB = magnet_strength_map(interaction, distance, n_mag)
+                lo, hi = np.percentile(logB, [2, 98])
+                ax.imshow(logB, extent=(-4, 4, -3, 3), origin='lower', cmap='YlOrRd',
+                          vmin=lo, vmax=hi, alpha=0.8, interpolation='bilinear')
+            if fine:
+                draw_lines(ax, magnet_lines(interaction, distance, n_mag),
+                           color='k', linewidth=1)
+            else:
+                # 미리보기: 성긴 격자의 자기장 방향 화살표
+                X, Y = np.meshgrid(np.linspace(-3.8, 3.8, 20), np.linspace(-2.8, 2.8, 15))
+                Bx, By = magnets.superpose(poles, X, Y)
+                n = np.hypot(Bx, By) + 1e-30
+                ax.quiver(X, Y, Bx/n, By/n, color='gray', pivot='mid', scale=40)
+            draw_magnet_bodies(ax, poles)
+            title = "두 자석" if n_mag == 2 else f"자석 {n_mag}개"
+            ax.set_title(f"{title} 합성 자기장 ({interaction})")
+            return fig
+        if canvas_on:
+            # 서버는 배열만 보내고 그림·세기 조절은 브라우저가 한다
+            title = "두 자석" if n_mag == 2 else f"자석 {n_mag}개"
+            field_canvas(magnet_log_strength(interaction, distance, n_mag),
+                         magnet_lines(interaction, distance, n_mag),
+                         magnets.magnet_halves(magnet_layout(interaction, distance, n_mag)),
+                         (-4, 4, -3, 3), strength=10.0, strength_range=(5.0, 30.0),
+                         strength_step=1.0,
+                         title=f"{title} 합성 자기장 ({interaction}, k'={{k}})",
+                         key="mag_canvas_view")
+        else:
+            show_figure(("magnets", interaction, quantize(distance, 0.1), n_mag, hires_on), draw,
+                        coarse=lambda: draw(fine=False))
+
+    with st.expander("🔍 확대·이동 보기 – 마주 보는 두 극 사이 들여다보기"):
+        magnet_zoom_view(interaction, distance, n_mag)
+
+    with st.expander("⚙️ 계산 캐시 상태 (교사용)", expanded=False):
+        stats = FIELD_CACHE.stats()
+        st.caption(
+            f"자기장 격자 캐시: 적중 {stats['hits']}회 · 계산 {stats['misses']}회 "
+            f"(적중률 {stats['hit_rate']:.0%}) · {stats['entries']}개 / "
+            f"{stats['bytes']/1e6:.1f} MB (상한 {stats['max_bytes']/1e6:.0f} MB)")
+        stats = FIGURE_CACHE.stats()
+        st.caption(
+            f"그림(PNG) 캐시: 적중 {stats['hits']}회 · 렌더링 {stats['misses']}회 "
+            f"(적중률 {stats['hit_rate']:.0%}) · {stats['entries']}개 / "
+            f"{stats['bytes']/1e6:.1f} MB (상한 {stats['max_bytes']/1e6:.0f} MB)")
+        st.caption(f"미리 계산한 자기장: {ATLAS_STATUS}"
+                   + (f" · 사용 {ATLAS.hits}회" if ATLAS is not None else ""))
+        stats = TILE_CACHE.stats()
+        st.caption(
+            f"확대 보기 타일 캐시: 재사용 {stats['hits']}회 · 계산 {stats['misses']}회 "
+            f"(적중률 {stats['hit_rate']:.0%}) · {stats['entries']}장 / "
+            f"{stats['bytes']/1e6:.1f} MB")
+        stats = WORKSPACES.stats()
+        st.caption(
+            f"작업 버퍼 풀: 생성 {stats['created']}개 · 재사용 {stats['reused']}회 · "
+            f"대기 {stats['idle']}개 / {stats['idle_bytes']/1e6:.1f} MB "
+            f"(상한 {stats['max_idle_bytes']/1e6:.0f} MB, 넘쳐서 버림 {stats['dropped']}개)")
+        stats = FIGURES.stats()
+        st.caption(
+            f"그림 객체 풀: 생성 {stats['created']}개 · 재사용 {stats['reused']}회 · "
+            f"대기 {stats['idle']}개 · 살아 있는 그림 {stats['live']}개")
+        stats = RESPONSES.stats()
+        st.caption(
+            f"AI 튜터 답변 캐시: 재사용 {stats['hits']}회 · API 호출 {stats['misses']}회 "
+            f"(적중률 {stats['hit_rate']:.0%}) · 저장 {stats['entries']}개 / {stats['max_entries']}개 "
+            f"· 만료 {stats['expired']} · 삭제 {stats['evictions']}")
+        stats = FLIGHTS.stats()
+        st.caption(
+            f"동시 같은 질문 합치기: API 호출 {stats['upstream']}회 · 합친 요청 {stats['merged']}개 "
+            f"(비율 {stats['merge_rate']:.0%}) · 한 번에 최대 {stats['peak']}명 · 진행 중 {stats['in_flight']}")
+        stats = SCHEDULER.stats()
+        st.caption(
+            f"AI 호출 대기열: 진행 {stats['active']}/{SCHEDULER.max_concurrent} · 대기 {stats['queued']}건 "
+            f"(학생 {stats['students']}명, 최대 {stats['peak_queue']}건) · 기다린 요청 {stats['waited']}/{stats['admitted']} "
+            f"평균 {stats['wait_avg']:.1f} s · 최대 {stats['wait_max']:.1f} s · 남은 토큰 {stats['tokens']}/{SCHEDULER.tpm}")
+        stats = gpt_client.LATENCY.stats()
+        st.caption(
+            f"AI 응답 지연: 첫 글자 p50 {stats['p50']:.1f} s · p95 {stats['p95']:.1f} s "
+            f"(최근 {stats['samples']}건) · 재시도 {stats['retries']} · 헤지 {stats['hedges']}회 "
+            f"(이김 {stats['hedge_wins']}, 대기 {stats['hedge_delay']:.1f} s) · 시간 초과 {stats['timeouts']} "
+            f"· 실패 {stats['failures']} / 호출 {stats['calls']}")
+        top = RESPONSES.top(3)
+        if top:
+            st.caption("자주 나온 질문: " + " · ".join(f"“{q[:20]}” {h}회" for q, h in top))
+        rows = FIGURE_LOG.summary()
+        st.caption(f"그림 전송: 최근 {FIGURE_LOG.rate()/1e6:.2f} MB/s"
+                   + (" · 자동 저대역 작동 중" if FIGURE_LOG.low else ""))
+        if rows:
+            st.markdown("| 그림 | 전송 방식 | 횟수 | 평균 | 합계 |\n|---|---|---:|---:|---:|\n"
+                        + "\n".join(f"| {n} | {p} | {c} | {a/1e3:.1f} kB | {b/1e6:.2f} MB |"
+                                    for n, p, c, a, b in rows[:12]))
 
 def page_basic_1():
     """기본 개념 문제 – 1차시"""
@@ -467,6 +918,9 @@ def page_exp(title: str, exp_num: int, image_file: str):
     if image_file:
         safe_img(image_file, caption=f"실험 {exp_num} 구성도", use_column_width=True)
     st.markdown("---")
+    st.markdown("#### 🧭 나침반 시뮬레이션")
+    compass_simulator({1: "straight", 2: "loop", 3: "solenoid"}[exp_num], f"cmp{exp_num}")
+    st.markdown("---")
 
     key_txt = f"exp{exp_num}_text"
     key_fb  = f"exp{exp_num}_feedback"
@@ -485,7 +939,7 @@ def page_exp(title: str, exp_num: int, image_file: str):
                 )
                 feedback = call_gpt(
                     "You are a veteran physics teacher. Respond in Korean.",
-                    prompt, 300)
+                    prompt, 300, cache=False)          # 학생 개인 관찰 기록 – 공유 캐시 제외
                 st.session_state[key_fb] = feedback
         else:
             st.warning("먼저 관찰 내용을 입력하세요.")
@@ -616,7 +1070,7 @@ def page_report():
                 feedback = call_gpt(
                     "You are a helpful physics TA...",
                     f"다음은 학생이 작성한 실험 보고서입니다...\n\n{full_report}",
-                    400)
+                    400, cache=False)
                 
                 st.session_state.final_report = {
                     "text1": text1, "text2": text2, "text3": text3,
@@ -664,6 +1118,9 @@ def page_basic_2():
 방향은 북동쪽이고, 나침반의 N극은 북동쪽을 가리킨다.
 """)
 
+    with st.expander("🧭 나침반 시뮬레이션으로 확인하기"):
+        compass_simulator("straight", "cmp_basic2")
+
 def page_theory():
     st.markdown("## 전류와 자기장")
 
@@ -681,24 +1138,15 @@ def page_theory():
         safe_img("right_hand_rule_straight.png", width=500)
     with col2:
         current_I = st.slider("전류 I", -5.0, 5.0, 2.0, 0.1, key="i_str_3d")
-        fig = plt.figure(figsize=(6, 6))
-        ax = fig.add_subplot(111, projection='3d')
-        ax.view_init(elev=20, azim=-45)
-        ax.plot([0, 0], [0, 0], [-5, 5],
-                color='red' if current_I > 0 else 'blue', lw=3)
-        if abs(current_I) > 0.1:
-            for r in np.linspace(1, 3, 3):
-                theta = np.linspace(0, 2*np.pi, 100)
-                x, y = r*np.cos(theta), r*np.sin(theta)
-                for z in [-3, 0, 3]:
-                    ax.plot(x, y, z, color='k', lw=1)
-                    idx = 15 if current_I > 0 else 65
-                    ax.quiver(x[idx], y[idx], z,
-                              -y[idx]/r, x[idx]/r, 0,
-                              length=0.8, normalize=True,
-                              color='k', arrow_length_ratio=0.5)
-        ax.set_xlabel('X'); ax.set_ylabel('Y'); ax.set_zlabel('Z')
-        st.pyplot(fig)
+        ac_wire = st.toggle("교류(AC) 애니메이션 – |I| 를 최댓값으로", key="ac_wire")
+        # 길이 10 인 도선이 만드는 실제 자기장 (화살표 길이 ∝ |B|)
+        scene = session_scene("wire3d", scenes3d.WireScene)
+        if ac_wire:
+            show_animation(("wire3d-ac", quantize(abs(current_I), 0.1)), lambda: scene,
+                           abs(current_I))
+        else:
+            show_figure(("wire3d", quantize(current_I, 0.1)), lambda: scene.update(current_I),
+                        bbox_inches=scene.bbox)
 
     # ───────────────────── 2. 원형 도선 ─────────────────────
     st.markdown("### 2. 원형 도선에 의한 자기장")
@@ -716,65 +1164,52 @@ def page_theory():
     with col2:
         I_circ = st.slider("전류 I", -5.0, 5.0, 2.0, 0.1, key="i_circ_3d")
         R_circ = st.slider("반지름 R", 0.5, 3.0, 1.5, key="r_circ_3d")
-        
-        fig = plt.figure(figsize=(6, 6))
-        ax = fig.add_subplot(111, projection='3d')
-        ax.view_init(elev=25, azim=30)
-        
-        # 원형 도선 그리기
-        theta = np.linspace(0, 2*np.pi, 100)
-        x, y = R_circ*np.cos(theta), R_circ*np.sin(theta)
-        z = np.zeros_like(x)
-        ax.plot(x, y, z, color='red', lw=4)
-        
-        if abs(I_circ) > 0.1:
-            # 전류 방향 표시 (원 위의 여러 지점에 화살표)
-            for angle in [0, np.pi/2, np.pi, 3*np.pi/2]:
-                x_pos = R_circ * np.cos(angle)
-                y_pos = R_circ * np.sin(angle)
-                
-                # 접선 방향 (전류 방향)
-                if I_circ > 0:  # 반시계방향
-                    dx = -np.sin(angle) * 0.4
-                    dy = np.cos(angle) * 0.4
-                else:  # 시계방향
-                    dx = np.sin(angle) * 0.4
-                    dy = -np.cos(angle) * 0.4
-                
-                ax.quiver(x_pos, y_pos, 0, dx, dy, 0,
-                        length=0.8, color='orange', arrow_length_ratio=0.3)
-            
-            # 중심에서의 자기장 (강조 표시)
-            d = 1 if I_circ > 0 else -1
-            B_magnitude = abs(I_circ) / R_circ  # 상대적 크기
-            
-            ax.quiver(0, 0, 0, 0, 0, d * B_magnitude,
-                    length=1.5, color='blue', arrow_length_ratio=0.2, linewidth=3)
-            
-            # 자기장 방향 텍스트
-            direction_text = "↑위" if d > 0 else "↓아래"
-            ax.text(0, 0, d * B_magnitude + 0.3, f"B {direction_text}", 
-                    fontsize=12, color='blue', weight='bold', ha='center')
-        
-        # 중심점 표시
-        ax.scatter([0], [0], [0], color='black', s=80)
-        ax.text(0, 0, -0.2, "중심", fontsize=10, ha='center')
-        
-        # 축 설정
-        max_range = R_circ + 0.5
-        ax.set_xlim(-max_range, max_range)
-        ax.set_ylim(-max_range, max_range)
-        ax.set_zlim(-1, 2)
-        
-        ax.set_xlabel('X')
-        ax.set_ylabel('Y')
-        ax.set_zlabel('Z (자기장)')
-        
-        # 제목
-        current_dir = "반시계방향" if I_circ > 0 else "시계방향" if I_circ < 0 else "전류 없음"
-        ax.set_title(f'전류 {I_circ:.1f}A ({current_dir})')
-        
-        st.pyplot(fig)
+        ac_circ = st.toggle("교류(AC) 애니메이션 – |I| 를 최댓값으로", key="ac_circ")
+        # 중심 자기장은 타원적분 닫힌 해로 계산한 실제 값
+        scene = session_scene("loop3d", scenes3d.LoopScene)
+        if ac_circ:
+            show_animation(("loop3d-ac", quantize(abs(I_circ), 0.1), quantize(R_circ, 0.01)),
+                           lambda: scene, abs(I_circ), R_circ)
+        else:
+            show_figure(("loop3d", quantize(I_circ, 0.1), quantize(R_circ, 0.01)),
+                        lambda: scene.update(I_circ, R_circ), bbox_inches=scene.bbox)
+
+    with col1:
+        # xz 단면 전체의 자기장 지도 (원형 도선 닫힌 해 – 격자점마다 O(1))
+        def draw_map(fine=True):
+            fig, ax = FIGURES.subplots(figsize=(6, 5))
+            # 미리보기는 격자점 1/16 (화살표 간격은 같게 유지)
+            step = 1 if fine else 4
+            x, z = np.linspace(-3, 3, 240 // step + 1), np.linspace(-2.5, 2.5, 200 // step + 1)
+            X, Z = np.meshgrid(x, z)
+            if abs(I_circ) > 0.1:
+                Brho, Bz = loop_field(X, Z, R_circ, I_circ)
+                Bx = Brho * np.sign(X)
+                B = np.hypot(Bx, Bz)
+                ax.imshow(np.log10(B + 1e-12), extent=(-3, 3, -2.5, 2.5),
+                          origin='lower', cmap='Blues', alpha=0.6)
+                # 자속 함수 ψ 의 등고선 = 자기력선 (간격이 좁을수록 자기장이 강함)
+                levels = loop_flux(np.linspace(0, 0.95*R_circ, 11)[1:], 0, R_circ)
+                ax.contour(X, Z, loop_flux(X, Z, R_circ), levels=levels,
+                           colors='k', linewidths=0.9)
+                q = (slice(10 // step, None, 20 // step),) * 2
+                n = B[q] + 1e-30
+                ax.quiver(X[q], Z[q], Bx[q]/n, Bz[q]/n, color='k',
+                          pivot='mid', scale=30, width=0.004)
+            else:
+                ax.text(0, 1.5, "전류 없음", ha='center', fontsize=12)
+            # 도선 단면: 종이에서 나오는 전류 ⊙, 들어가는 전류 ⊗ (관찰자 -y 쪽)
+            into = R_circ if I_circ >= 0 else -R_circ
+            ax.scatter([into, -into], [0, 0], s=160, facecolors='w',
+                       edgecolors='red', linewidths=2, zorder=5)
+            ax.scatter([into], [0], marker='x', s=60, color='red', zorder=6)
+            ax.scatter([-into], [0], marker='.', s=60, color='red', zorder=6)
+            ax.set_aspect('equal'); ax.set_xlim(-3, 3); ax.set_ylim(-2.5, 2.5)
+            ax.set_xlabel('X'); ax.set_ylabel('Z')
+            ax.set_title("xz 단면의 자기력선")
+            return fig
+        show_figure(("loop-map", quantize(I_circ, 0.1), quantize(R_circ, 0.01)), draw_map,
+                    coarse=lambda: draw_map(fine=False))
 
     # ▶ 원형 도선 정적 그림 2장
     st.markdown("#### 원형 도선 관찰 사진")
@@ -799,19 +1234,60 @@ def page_theory():
     with col2:
         I_sol = st.slider("전류 I", 0.1, 5.0, 2.0, key="i_sol_3d")
         n_sol = st.slider("n (단위 길이당 감은 수)",
-                          5.0, 30.0, 15.0, key="n_sol_3d")
-        fig = plt.figure(figsize=(6, 5))
-        ax = fig.add_subplot(111, projection='3d')
-        ax.view_init(elev=20, azim=-60)
-        R, L = 1, 6
-        t = np.linspace(-np.pi*n_sol/2, np.pi*n_sol/2, 200)
-        z = np.linspace(-L/2, L/2, 200)
-        ax.plot(R*np.cos(t), R*np.sin(t), z, color='gray')
-        for x_pos in [-0.5, 0, 0.5]:
-            ax.quiver(x_pos, 0, -L/2, 0, 0, 1,
-                      length=L*I_sol/5,
-                      color='b', arrow_length_ratio=0.1)
-        st.pyplot(fig)
+                          5.0, 30.0, 15.0, 1.0, key="n_sol_3d")
+        real_sol = st.toggle("실제 자기장 계산 (축 위 B(z) · 단면 지도)",
+                             key="sol_real")
+        ac_sol = st.toggle("교류(AC) 애니메이션 – I 를 최댓값으로", key="ac_sol")
+        # 코일 내부 중앙 세 지점의 실제 자기장 – 원형 도선을 쌓은 솔레노이드
+        scene = session_scene("sol3d", scenes3d.SolenoidScene)
+        if ac_sol:
+            show_animation(("sol3d-ac", quantize(I_sol, 0.01), quantize(n_sol, 0.01)),
+                           lambda: scene, I_sol, n_sol)
+        else:
+            show_figure(("sol3d", quantize(I_sol, 0.01), quantize(n_sol, 0.01)),
+                        lambda: scene.update(I_sol, n_sol), bbox_inches=scene.bbox)
+
+    if real_sol:
+        # 반지름 1 cm, 길이 6 cm 솔레노이드에 n (회/cm) 로 감은 나선 도선
+        def draw_real(fine=True):
+            if fine:
+                z_axis, B_axis, X, Z, Bx, Bz = solenoid_grid(int(n_sol))
+            else:
+                # 미리보기: 나선 대신 원형 도선을 쌓은 근사 (닫힌 해, 수 ms)
+                z_axis = np.linspace(-4.5, 4.5, 101)
+                X, Z = np.meshgrid(np.linspace(-2.4, 2.4, 33), np.linspace(-4.5, 4.5, 41))
+                turns = int(n_sol) * 6
+                B_axis = solenoid_field(0, z_axis, 1.0, 6.0, turns)[1]
+                Bx, Bz = solenoid_field(X, Z, 1.0, 6.0, turns)
+                Bx = Bx * np.sign(X)
+            to_mT = 1e5 * I_sol            # 길이 단위 cm → T 환산 ×100, T → mT ×1000
+            B_ideal = ideal_field(int(n_sol), I_sol) * 1e5
+            fig, (ax1, ax2) = FIGURES.subplots(1, 2, figsize=(12, 4.8),
+                                               gridspec_kw={"width_ratios": [1.1, 1]})
+            ax1.plot(z_axis, B_axis * to_mT, color='b', lw=2,
+                     label="나선 도선 계산값" if fine else "원형 도선 근사 (미리보기)")
+            ax1.axhline(B_ideal, color='gray', ls='--', label=r"$\mu_0 nI$ (무한히 긴 솔레노이드)")
+            ax1.axvspan(-3, 3, color='orange', alpha=0.1, label="코일 구간")
+            ax1.set_xlabel("축 위치 z (cm)"); ax1.set_ylabel("B (mT)")
+            ax1.set_ylim(0, B_ideal * 1.25); ax1.grid(True, ls='--', alpha=0.3)
+            ax1.legend(loc='lower center', fontsize=9)
+            ax1.set_title("중심축 위 자기장 B(z)")
+
+            B = np.hypot(Bx, Bz) * to_mT
+            ax2.imshow(B, extent=(X.min(), X.max(), Z.min(), Z.max()), origin='lower',
+                       cmap='Blues', interpolation='bilinear', aspect='equal')
+            n = np.hypot(Bx, Bz) + 1e-30
+            q = (slice(None, None, 2), slice(None, None, 2))
+            ax2.quiver(X[q], Z[q], (Bx/n)[q], (Bz/n)[q], color='k', pivot='mid',
+                       scale=28, width=0.005)
+            ax2.plot([-1, -1], [-3, 3], color='red', lw=3)
+            ax2.plot([1, 1], [-3, 3], color='red', lw=3)
+            ax2.set_xlabel("x (cm)"); ax2.set_ylabel("z (cm)")
+            ax2.set_title("xz 단면 자기장 (색: 세기, 화살표: 방향)")
+            fig.tight_layout()
+            return fig
+        show_figure(("sol-real", quantize(I_sol, 0.01), int(n_sol)), draw_real,
+                    coarse=lambda: draw_real(fine=False))
 
     # ▶ 솔레노이드 정적 그림 2장
     st.markdown("#### 솔레노이드 관찰 사진")
@@ -899,6 +1375,60 @@ xy 평면에 놓여 있다. 표는 점 P, Q 에서 세 도선 전류가 만드
         → 따라서 정답은 ② ㄷ
         """)
 
+    st.markdown("---")
+    with st.expander("🔬 여러 도선이 만드는 자기장 탐구 (도선 수백 개)", expanded=False):
+        page_many_wires()
+
+WIRE_LAYOUTS = ["세 도선 A·B·C", "도선 격자", "버스바 (왕복 판 2장)", "코일 단면"]
+
+def many_wires_layout(layout: str, count: int, I_B: float):
+    """배치 이름 → (도선 좌표 (M,2), 전류 (M,)). 화면에 수직인 무한 직선 도선들"""
+    if layout == "도선 격자":
+        return wire_tree.wire_grid(count)
+    if layout == "버스바 (왕복 판 2장)":
+        return wire_tree.busbar(count)
+    if layout == "코일 단면":
+        return wire_tree.coil_section(count)
+    return wire_tree.three_wires(I_B)
+
+def page_many_wires():
+    """평행 도선 여러 개의 합성 자기장 – 계층적 근사(허용 오차 선택)"""
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        layout = st.radio("도선 배치", WIRE_LAYOUTS, key="wires_layout")
+        count, I_B = 3, 1.0
+        if layout == "세 도선 A·B·C":
+            I_B = st.slider("B 도선 전류 (I₀ 배)", -3.0, 3.0, 1.0, 0.5, key="wires_ib")
+        else:
+            count = st.slider("도선 수 (한 줄)", 10, 200, 40, 10, key="wires_n")
+        tol = st.select_slider("허용 오차", [1e-1, 1e-2, 1e-3, 1e-4, 0.0], 1e-3,
+                               format_func=lambda t: "정확(직접 합)" if t == 0 else f"{t:.0e}",
+                               key="wires_tol")
+    with c2:
+        def draw():
+            xy, cur = many_wires_layout(layout, count, I_B)
+            X, Y = np.meshgrid(np.linspace(-3, 3, 241), np.linspace(-3, 3, 241))
+            if tol == 0:
+                Bx, By = wire_tree.direct_field(X, Y, xy, cur)
+            else:
+                Bx, By = wire_tree.tree_field(X, Y, xy, cur, tol=tol)
+            B = np.hypot(Bx, By)
+            fig, ax = FIGURES.subplots(figsize=(7, 7))
+            ax.imshow(np.log10(B + 1e-30), extent=(-3, 3, -3, 3), origin='lower',
+                      cmap='Blues', vmin=np.log10(np.percentile(B, 2) + 1e-30),
+                      vmax=np.log10(np.percentile(B, 99) + 1e-30))
+            q = (slice(6, None, 12), slice(6, None, 12))
+            ax.quiver(X[q], Y[q], (Bx/(B+1e-30))[q], (By/(B+1e-30))[q],
+                      color='k', pivot='mid', scale=30, width=0.004)
+            # 도선 단면: 화면에서 나오는 전류 ● 빨강, 들어가는 전류 ● 파랑
+            ax.scatter(*xy[cur > 0].T, s=12 if len(xy) > 50 else 60, color='#DC143C', zorder=5)
+            ax.scatter(*xy[cur < 0].T, s=12 if len(xy) > 50 else 60, color='#4169E1', zorder=5)
+            ax.set_aspect('equal'); ax.set_xlim(-3, 3); ax.set_ylim(-3, 3)
+            ax.set_title(f"{layout} – 도선 {len(xy)}개 (빨강: 나오는 전류, 파랑: 들어가는 전류)",
+                         fontsize=10)
+            return fig
+        show_figure(("wires", layout, count, quantize(I_B, 0.5), tol), draw)
+
 # page_essay 함수를 아래 코드로 교체해주세요.
 
 def page_essay():
@@ -915,6 +1445,27 @@ def page_essay():
     with c3:
         safe_img("motor_structure.png", caption="전동기")
 
+    st.subheader("🔄 교류가 흐르면?")
+    a1, a2 = st.columns([1, 2])
+    with a1:
+        device = st.radio("기기", ["스피커", "전동기"], horizontal=True, key="ac_device")
+        amp = st.slider("교류 전류 최댓값 I₀ (A)", 0.5, 3.0, 2.0, 0.5, key="ac_amp")
+        if device == "스피커":
+            st.markdown("""
+전류 방향이 바뀔 때마다 틈 속 코일이 받는 힘 **F = IL×B** 의 방향도 바뀐다.
+코일에 붙은 진동판이 앞뒤로 떨며 공기를 밀어 소리를 만든다.
+""")
+        else:
+            st.markdown("""
+정류자 없이 교류를 흘리면 코일 두 변이 받는 힘이 반 주기마다 뒤집혀
+돌림힘 방향이 계속 바뀐다 – 코일은 돌지 못하고 떨기만 한다.
+직류 전동기는 정류자로 반 바퀴마다 전류 방향을 바꿔 한쪽으로 계속 돈다.
+""")
+    with a2:
+        cls = ac_animation.SpeakerScene if device == "스피커" else ac_animation.MotorScene
+        show_animation((f"essay-ac-{device}", quantize(amp, 0.5)),
+                       lambda: session_scene(f"ac_{cls.__name__}", cls), amp)
+
     st.subheader("💬 AI챗봇과 토론하기")
     if "essay_history" not in st.session_state:
         st.session_state.essay_history = []
@@ -928,13 +1479,11 @@ def page_essay():
         st.session_state.essay_history.append(("user", prompt))
         st.chat_message("user").write(prompt)
         with st.chat_message("assistant"):
-            with st.spinner("AI튜터가 답변 중..."):
-                ans = call_gpt(
-                    "You are a Socratic physics mentor. Respond in Korean.",
-                    prompt, 400)
-                st.write(ans)
-                st.session_state.essay_history.append(("assistant", ans))
-                st.rerun() # 채팅 후 바로 새로고침하여 입력창을 비움
+            ans = st.write_stream(stream_gpt(
+                "You are a Socratic physics mentor. Respond in Korean.",
+                prompt, 400, cache=False))             # 학생 개인 생각에 대한 토론 – 공유 캐시 제외
+            st.session_state.essay_history.append(("assistant", ans))
+            st.rerun() # 채팅 후 바로 새로고침하여 입력창을 비움
 
     st.markdown("---")
     st.subheader("📝 탐구 내용 저장")
@@ -992,16 +1541,14 @@ def page_feedback():
         st.session_state.feedback_history.append(("user", prompt))
         st.chat_message("user").write(prompt)
         with st.chat_message("assistant"):
-            with st.spinner("AI튜터가 답변 작성 중..."):
-                ans = call_gpt(
-                    "You are a friendly and thoughtful physics tutor. "
-                    "Encourage high school students to reflect on the class, "
-                    "write about what they found meaningful or challenging, "
-                    "and suggest new ideas or questions they might have. "
-                    "Respond in Korean.",
-                    prompt, 500)
-                st.write(ans)
-                st.session_state.feedback_history.append(("assistant", ans))
+            ans = st.write_stream(stream_gpt(
+                "You are a friendly and thoughtful physics tutor. "
+                "Encourage high school students to reflect on the class, "
+                "write about what they found meaningful or challenging, "
+                "and suggest new ideas or questions they might have. "
+                "Respond in Korean.",
+                prompt, 500, cache=False))             # 개인 소감 – 공유 캐시 제외
+            st.session_state.feedback_history.append(("assistant", ans))
                 
 
     st.markdown("---")
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""오래 걸리는 시험(@pytest.mark.slow)은 --runslow 를 줄 때만 돈다
+
+    python -m pytest -q tests --runslow
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", help="slow 표시된 시험도 실행")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: 오래 걸리는 시험 (--runslow 로 실행)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip = pytest.mark.skip(reason="--runslow 로 실행")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""적응형 샘플링 – 앱 허용치에서 같은 계산 횟수의 균일 격자보다 정확한지 (python adaptive.py 의 축소판)"""
+import numpy as np
+
+import adaptive
+from field_engine import pole_field
+
+POLES = np.array([[0.0, 0.6], [0.0, -0.6]])     # 앱의 막대자석
+CHARGES = np.array([1.0, -1.0])
+BOUNDS = (-3.0, 3.0, -3.0, 3.0)
+
+
+def field(X, Y):
+    return pole_field(X, Y, POLES, CHARGES)
+
+
+def errors(tree, out=np.linspace(-3, 3, 151)):
+    X, Y = np.meshgrid(out, out)
+    Bx0, By0 = field(X, Y)
+    keep = np.min([np.hypot(X - px, Y - py) for px, py in POLES], axis=0) > 0.05
+    Bx, By = tree.resample(out, out)
+    ang = np.degrees(np.abs(np.angle((Bx + 1j * By) / (Bx0 + 1j * By0))))[keep]
+    logm = np.abs(np.log10(np.hypot(Bx, By) / np.hypot(Bx0, By0)))[keep]
+    return np.percentile(ang, 95), ang.max(), np.percentile(logm, 95)
+
+
+def test_beats_uniform_at_equal_evaluations():
+    tree = adaptive.sample(field, BOUNDS)
+    m = int(np.sqrt(tree.evaluations))
+    a, u = errors(tree), errors(adaptive.uniform(field, BOUNDS, m))
+    assert a[0] < u[0] and a[1] < u[1] and a[2] < u[2]
+
+
+def test_resample_matches_field_on_nodes():
+    tree = adaptive.sample(field, BOUNDS)
+    x = np.linspace(-3, 3, adaptive.BASE + 1)       # 처음 칸 꼭짓점 – 항상 계산한 점
+    Bx, By = tree.resample(x, x)
+    X, Y = np.meshgrid(x, x)
+    assert np.allclose(np.stack([Bx, By]), np.stack(field(X, Y)))
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+앱 전체를 스트림릿 AppTest 로 돌려 보는 연기(smoke) 시험
+
+    python -m pytest -q tests
+"""
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+
+
+def run_page(current: int) -> AppTest:
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.session_state["current"] = current
+    return at.run()
+
+
+def test_simulation_page():
+    at = run_page(2)
+    assert not at.exception
+
+
+def test_hires_toggle():
+    # 고해상도 지도는 spawn 작업 프로세스 풀에서 계산한다 – 작업 프로세스가 앱 스크립트를
+    # 다시 실행하면 풀이 깨져(BrokenProcessPool) 여기서 예외가 난다
+    at = run_page(2)
+    at.toggle(key="mag_hires").set_value(True).run()
+    assert not at.exception
+    assert not at.error
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Figure 풀 – 앱 재실행 1000회 동안 RSS 가 평평한지 (python figure_pool.py 의 회귀 확인)"""
+import gc
+from io import BytesIO
+
+import numpy as np
+import pytest
+from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (3d 투영 등록)
+
+from figure_pool import MAX_IDLE, FigurePool, rss_bytes
+
+RERUNS = 1000
+x = np.linspace(-3, 3, 41)
+X, Y = np.meshgrid(x, x)
+
+
+def rerun(pool: FigurePool, k: float):
+    """앱 한 번 재실행에 해당하는 그림 세 장 (2D 흐름선, 색 지도, 3D) 그리기 + PNG 인코딩"""
+    fig, ax = pool.subplots(figsize=(7, 7))
+    ax.streamplot(X, Y, -Y * k, X, density=0.6)
+    ax.set_title(f"k = {k:.1f}")
+    figs = [fig]
+    fig, (a1, a2) = pool.subplots(1, 2, figsize=(12, 4.8))
+    a1.plot(x, np.exp(-x * x) * k)
+    a2.imshow(np.hypot(X, Y) * k, origin="lower")
+    fig.tight_layout()
+    figs.append(fig)
+    fig = pool.figure(figsize=(6, 6))
+    ax = fig.add_subplot(111, projection="3d")
+    ax.quiver(X[::8, ::8], Y[::8, ::8], 0, -Y[::8, ::8], X[::8, ::8], k, length=0.3)
+    figs.append(fig)
+    for fig in figs:
+        fig.savefig(BytesIO(), format="png", dpi=40)
+        pool.release(fig)
+
+
+@pytest.mark.slow
+def test_rss_flat_over_reruns():
+    pool = FigurePool()
+    for i in range(20):                                       # 준비 (폰트 캐시 등)
+        rerun(pool, 1.0 + i % 5)
+    gc.collect()
+    base = rss_bytes()
+    marks = []
+    for i in range(RERUNS):
+        rerun(pool, 1.0 + (i % 50) / 10)
+        if (i + 1) % (RERUNS // 5) == 0:
+            gc.collect()
+            marks.append((rss_bytes() - base) / 1e6)
+    # 처음 1/5 이후로는 RSS 가 더 늘지 않아야 한다 (할당기 변동 여유 15 MB)
+    assert marks[-1] - marks[0] < 15, f"RSS 증가 {marks} MB – 그림이 새고 있음"
+    stats = pool.stats()
+    assert stats["live"] <= 3 * MAX_IDLE
+    assert stats["created"] == 3 and stats["dropped"] == 0
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""GPT 대기열 – 학생별 순환 순서, 같은 키 대기 안내, TPM 예산 (python gpt_scheduler.py 의 결정적인 부분)"""
+import threading
+import time
+
+from gpt_scheduler import Scheduler
+
+
+def until(cond, timeout=10.0):
+    end = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < end, "시간 초과"
+        time.sleep(0.01)
+
+
+class Holder:
+    """자리 하나를 잡고 release 될 때까지 놓지 않는 스레드 – 뒤에 선 요청들을 줄에 세워 둔다"""
+
+    def __init__(self, sched, name="teacher"):
+        self.release = threading.Event()
+        self.thread = threading.Thread(target=self._hold, args=(sched, name))
+        self.thread.start()
+        until(lambda: sched.stats()["active"] == 1)
+
+    def _hold(self, sched, name):
+        with sched.slot(name, 1):
+            self.release.wait()
+
+    def done(self):
+        self.release.set()
+        self.thread.join()
+
+
+def test_round_robin_between_students():
+    sched = Scheduler(max_concurrent=1, tpm=60000)
+    holder = Holder(sched)
+    admitted = []
+
+    def ask(name, i):
+        with sched.slot(name, 1):
+            admitted.append((name, i))
+
+    # s0 이 버튼을 세 번 연타한 뒤 s1, s2 가 한 번씩
+    threads = []
+    for i, name in enumerate(["s0", "s0", "s0", "s1", "s2"]):
+        threads.append(threading.Thread(target=ask, args=(name, i)))
+        threads[-1].start()
+        until(lambda: sched.stats()["queued"] == i + 1)
+    assert [t.student for t in sched._order()] == ["s0", "s1", "s2", "s0", "s0"]
+    holder.done()
+    for th in threads:
+        th.join()
+    assert admitted == [("s0", 0), ("s1", 3), ("s2", 4), ("s0", 1), ("s0", 2)]
+
+
+def test_status_survives_same_key_ticket_leaving():
+    # 같은 키로 기다리는 요청 둘 – 나중에 선 세션이 rerun 으로 떠나도 먼저 선 요청의 안내는 남는다
+    sched = Scheduler(max_concurrent=1, tpm=6000)
+    holder = Holder(sched)
+    leave = threading.Event()
+
+    def rerun():
+        if leave.is_set():
+            raise InterruptedError
+
+    def ask(name, on_wait=None):
+        try:
+            with sched.slot(name, 10, "같은 질문", on_wait):
+                pass
+        except InterruptedError:
+            pass
+
+    threads = [threading.Thread(target=ask, args=("s1",)),
+               threading.Thread(target=ask, args=("s2", rerun))]
+    for n, th in enumerate(threads, 1):
+        th.start()
+        until(lambda: sched.stats()["queued"] == n)
+    assert sched.status("같은 질문")[0] == 1
+    leave.set()
+    threads[1].join()
+    assert sched.stats()["queued"] == 1
+    assert sched.status("같은 질문")[0] == 1, "s1 이 아직 기다리는데 안내가 사라짐"
+    holder.done()
+    threads[0].join()
+    assert sched.status("같은 질문") is None
+
+
+def test_tpm_budget_paces_calls():
+    # 분당 600 토큰(초당 10) 통에 10 토큰짜리 62개 – 60개는 바로, 나머지는 1 초에 하나씩
+    sched = Scheduler(max_concurrent=100, tpm=600)
+    t = time.perf_counter()
+    for i in range(62):
+        with sched.slot(f"s{i % 5}", 10):
+            pass
+    dt = time.perf_counter() - t
+    assert 1.8 < dt < 3.0
+    assert sched.stats()["admitted"] == 62
+
+
+
+def test_try_acquire_only_takes_free_slots():
+    # 헤지 요청용 – 빈자리·토큰이 있고 줄 선 요청이 없을 때만 자리를 더 잡는다
+    sched = Scheduler(max_concurrent=2, tpm=600)
+    holder = Holder(sched)
+    assert not sched.try_acquire(1000)                      # 토큰 부족
+    assert sched.try_acquire(10)
+    assert sched.stats()["active"] == 2
+    assert not sched.try_acquire(10)                        # 빈자리 없음
+    sched.release()
+    assert sched.stats()["active"] == 1
+    assert sched.try_acquire(10)
+    admitted, leave = threading.Event(), threading.Event()
+
+    def ask():
+        with sched.slot("s1", 10):
+            admitted.set()
+            leave.wait()
+
+    waiter = threading.Thread(target=ask)
+    waiter.start()
+    until(lambda: sched.stats()["queued"] == 1)
+    assert not admitted.is_set()
+    sched.release()                                         # 놓은 자리는 줄 선 요청이 받는다
+    assert admitted.wait(5)
+    assert sched.stats()["active"] == 2 and not sched.try_acquire(10)
+    leave.set()
+    waiter.join()
+    holder.done()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""고해상도 타일 계산 – 작업 프로세스 풀 결과와 작업 프로세스가 죽었을 때의 정리"""
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+import hires
+import magnets
+
+RING = magnets.ring(12, 2.2)
+ARGS = (np.stack([RING["x"], RING["y"]], axis=-1), magnets.charges(RING))
+
+
+def shm_names():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_pool_matches_in_process():
+    axes = [np.linspace(-3, 3, 300), np.linspace(-4, 4, 400)]
+    with hires.make_pool(2) as pool:
+        B = hires.compute_grid("poles", axes, ARGS, pool, tile=128)
+    assert np.array_equal(B, hires.compute_grid("poles", axes, ARGS, tile=128))
+
+
+def test_dead_worker_breaks_pool_and_frees_memory():
+    before = shm_names()
+    axes = [np.linspace(-3, 3, 1500), np.linspace(-4, 4, 1500)]
+    pool = hires.make_pool(2)
+    pool.ready()
+    pool._procs[0].kill()                 # 타일을 받는 도중 (보내기·받기에서) 끊긴다
+    pool._procs[0].wait()
+    with pytest.raises(BrokenProcessPool):
+        hires.compute_grid("poles", axes, ARGS, pool, tile=100)
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(hires._run_tile)
+    pool.shutdown()
+    assert shm_names() <= before
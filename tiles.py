@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+확대·이동 보기용 자기장 타일 (슬리피 맵 방식)
+
+원점 중심 한 변 WORLD 인 정사각형을 레벨 0 타일 하나로 두고, 레벨이 하나
+오를 때마다 타일을 네 개로 나눈다. 타일 (level, tx, ty) 는 TILE_PX² 픽셀
+중심에서 자기장 (Bx, By) 를 직접 계산한 float32 배열이다. 화면에 필요한
+타일만 계산해 이어 붙이므로 깊이 확대해도 타일 몇 장의 계산이면 되고,
+계산한 타일은 (레벨, x, y, 매개변수) 키로 캐시해 모든 학생이 함께 쓴다.
+
+    python tiles.py            # 확대·이동 시나리오의 타일 계산/재사용 횟수
+"""
+import numpy as np
+
+WORLD = 8.0       # 레벨 0 타일 한 변 (원점 중심)
+TILE_PX = 128     # 타일 한 변 픽셀 수
+MAX_LEVEL = 16
+VIEW_ASPECT = 0.75  # 보기 창 세로/가로
+
+
+def tile_bounds(level: int, tx: int, ty: int):
+    """타일의 (x0, x1, y0, y1)"""
+    size = WORLD / 2 ** level
+    x0 = -WORLD / 2 + tx * size
+    y0 = -WORLD / 2 + ty * size
+    return x0, x0 + size, y0, y0 + size
+
+
+def render_tile(field, level: int, tx: int, ty: int, px: int = TILE_PX):
+    """field(X, Y) -> (Bx, By) 를 타일 픽셀 중심에서 계산한 (2, px, px) float32"""
+    x0, x1, y0, y1 = tile_bounds(level, tx, ty)
+    h = (x1 - x0) / px
+    c = (np.arange(px) + 0.5) * h
+    X, Y = np.meshgrid(x0 + c, y0 + c)
+    return np.stack(field(X, Y)).astype(np.float32)
+
+
+def view_bounds(zoom: int, cx: float, cy: float):
+    """확대 단계 zoom (0 = 가로 WORLD) 과 중심 → 보기 창 (x0, x1, y0, y1)"""
+    w = WORLD / 2 ** zoom
+    h = w * VIEW_ASPECT
+    return cx - w / 2, cx + w / 2, cy - h / 2, cy + h / 2
+
+
+def tile_level(zoom: int) -> int:
+    """보기 창 가로에 타일이 4장 들어가는 레벨 (≈ 512 픽셀)"""
+    return min(zoom + 2, MAX_LEVEL)
+
+
+def covering(level: int, view):
+    """보기 창을 덮는 타일 번호 (tx 목록, ty 목록) – 세계 밖은 제외"""
+    size = WORLD / 2 ** level
+    n = 2 ** level
+    x0, x1, y0, y1 = view
+    tx = np.arange(int(np.floor((x0 + WORLD / 2) / size)), int(np.ceil((x1 + WORLD / 2) / size)))
+    ty = np.arange(int(np.floor((y0 + WORLD / 2) / size)), int(np.ceil((y1 + WORLD / 2) / size)))
+    return tx[(tx >= 0) & (tx < n)], ty[(ty >= 0) & (ty < n)]
+
+
+def compose(level: int, view, get_tile, px: int = TILE_PX):
+    """
+    보기 창을 덮는 타일들을 이어 붙인 (2, H, W) 배열과 그 extent.
+    get_tile(level, tx, ty) 가 타일을 돌려준다 (보통 캐시를 거친다).
+    """
+    txs, tys = covering(level, view)
+    block = np.empty((2, len(tys) * px, len(txs) * px), np.float32)
+    for j, ty in enumerate(tys):
+        for i, tx in enumerate(txs):
+            block[:, j * px:(j + 1) * px, i * px:(i + 1) * px] = get_tile(level, int(tx), int(ty))
+    x0 = tile_bounds(level, int(txs[0]), int(tys[0]))
+    x1 = tile_bounds(level, int(txs[-1]), int(tys[-1]))
+    return block, (x0[0], x1[1], x0[2], x1[3])
+
+
+def clamp_center(zoom: int, cx: float, cy: float):
+    """보기 창이 세계 밖으로 나가지 않도록 중심을 제한"""
+    x0, x1, y0, y1 = view_bounds(zoom, 0.0, 0.0)
+    lim_x = WORLD / 2 - (x1 - x0) / 2
+    lim_y = WORLD / 2 - (y1 - y0) / 2
+    return float(np.clip(cx, -lim_x, lim_x)), float(np.clip(cy, -lim_y, lim_y))
+
+
+if __name__ == "__main__":
+    import time
+
+    import magnets
+    from cache import ByteLRU
+
+    poles = magnets.pair(True, 2.5)
+    def field(X, Y):
+        return magnets.superpose(poles, X, Y)
+
+    cache = ByteLRU(32 * 1024 * 1024, "tile")
+    def get_tile(level, tx, ty):
+        return cache.get_or_compute((level, tx, ty, "pair"),
+                                    lambda: render_tile(field, level, tx, ty))
+
+    # 두 극 사이(원점)로 한 단계씩 확대 → 조금 이동 → 다시 축소 (학생 30명 반복)
+    path = [(z, 0.0, 0.0) for z in range(0, 11)]
+    path += [(10, 0.002 * k, 0.0) for k in range(1, 6)]
+    path += [(z, 0.0, 0.0) for z in range(10, -1, -1)]
+    for student in range(30):
+        t = time.perf_counter()
+        for zoom, cx, cy in path:
+            cx, cy = clamp_center(zoom, cx, cy)
+            compose(tile_level(zoom), view_bounds(zoom, cx, cy), get_tile)
+        dt = time.perf_counter() - t
+        if student in (0, 1, 29):
+            s = cache.stats()
+            print(f"학생 {student + 1:2d}: 화면 {len(path)}장 {dt*1e3:6.1f} ms | 누적 타일 계산 "
+                  f"{s['misses']}회, 재사용 {s['hits']}회, {s['bytes']/1e6:.1f} MB")
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+평행한 무한 직선 도선 여러 개의 자기장 – 계층적(Barnes–Hut) 근사
+
+도선은 화면(xy 평면)에 수직이고, 위치를 복소수 z_j 로 두면
+    Bx + i·By = (μ0/2π) · i · conj( Σ I_j / (z − z_j) )
+이다. 도선들을 사분트리로 묶고, 충분히 멀리 있는 묶음은 다중극 전개
+    Σ I_j / (z − z_j) = Σ_p a_p / (z − c)^(p+1),   a_p = Σ I_j (z_j − c)^p
+로 한 번에 계산한다. 허용 오차 tol 에서 전개 차수를 정한다.
+
+    python wire_tree.py        # 직접 합과 정확도·속도 비교
+"""
+import numpy as np
+
+from field_engine import MU0_4PI, CHUNK_BYTES
+
+MU0_2PI = 2 * MU0_4PI
+LEAF_SIZE = 16
+
+
+class _Node:
+    __slots__ = ("center", "radius", "coef", "children", "idx")
+
+
+def build_tree(xy, currents, order: int, leaf_size: int = LEAF_SIZE):
+    """도선 위치 (M,2)·전류 (M,) 로 사분트리를 만들고 노드마다 다중극 계수 계산"""
+    z = np.asarray(xy, dtype=float) @ np.array([1, 1j])
+    cur = np.broadcast_to(np.asarray(currents, dtype=float), z.shape)
+    powers = np.arange(order)
+
+    def make(idx, x0, x1, y0, y1):
+        node = _Node()
+        zi = z[idx]
+        node.center = complex((x0 + x1) / 2, (y0 + y1) / 2)
+        dz = zi - node.center
+        node.radius = float(np.abs(dz).max()) if len(idx) else 0.0
+        node.coef = (cur[idx, None] * dz[:, None] ** powers).sum(axis=0)
+        node.idx = idx
+        node.children = []
+        if len(idx) > leaf_size and (x1 - x0) > 1e-9:
+            xm, ym = (x0 + x1) / 2, (y0 + y1) / 2
+            right, top = zi.real >= xm, zi.imag >= ym
+            for mask, box in ((~right & ~top, (x0, xm, y0, ym)),
+                              (right & ~top, (xm, x1, y0, ym)),
+                              (~right & top, (x0, xm, ym, y1)),
+                              (right & top, (xm, x1, ym, y1))):
+                if mask.any():
+                    node.children.append(make(idx[mask], *box))
+        return node
+
+    lo, hi = z.real.min(), z.real.max()
+    bo, to = z.imag.min(), z.imag.max()
+    half = max(hi - lo, to - bo) / 2 + 1e-9
+    cx, cy = (lo + hi) / 2, (bo + to) / 2
+    root = make(np.arange(len(z)), cx - half, cx + half, cy - half, cy + half)
+    return root, z, cur
+
+
+def order_for(tol: float, theta: float) -> int:
+    """상대 오차 ≈ θ^p / (1 − θ) ≤ tol 이 되는 전개 차수 p"""
+    return max(1, int(np.ceil(np.log(tol * (1 - theta)) / np.log(theta))))
+
+
+def _direct_sum(zp, zw, cur, chunk_bytes=CHUNK_BYTES):
+    """Σ I_j / (z − z_j)  (복소수) – 평가점 청크 단위"""
+    out = np.zeros(len(zp), dtype=complex)
+    step = max(1, chunk_bytes // (16 * 4 * max(len(zw), 1)))
+    for i in range(0, len(zp), step):
+        d = zp[i:i + step, None] - zw[None, :]
+        d[d == 0] = np.inf                     # 도선 위의 점은 자기 자신 제외
+        out[i:i + step] = (cur[None, :] / d).sum(axis=1)
+    return out
+
+
+def _to_B(X, s):
+    B = MU0_2PI * 1j * np.conj(s)
+    return B.real.reshape(np.shape(X)), B.imag.reshape(np.shape(X))
+
+
+def direct_field(X, Y, xy, currents):
+    """직접 합 O(도선 × 평가점) – 기준값"""
+    zw = np.asarray(xy, dtype=float) @ np.array([1, 1j])
+    cur = np.broadcast_to(np.asarray(currents, dtype=float), zw.shape)
+    zp = (np.asarray(X, dtype=float) + 1j * np.asarray(Y, dtype=float)).ravel()
+    return _to_B(X, _direct_sum(zp, zw, cur))
+
+
+def tree_field(X, Y, xy, currents, tol: float = 1e-3, theta: float = 0.5,
+               leaf_size: int = LEAF_SIZE):
+    """사분트리 근사 (Bx, By). tol 은 묶음별 상대 오차 목표, θ 는 (묶음 반지름 / 거리) 상한"""
+    order = order_for(tol, theta)
+    root, zw, cur = build_tree(xy, currents, order, leaf_size)
+    zp = (np.asarray(X, dtype=float) + 1j * np.asarray(Y, dtype=float)).ravel()
+    s = np.zeros(len(zp), dtype=complex)
+    stack = [(root, np.arange(len(zp)))]
+    while stack:
+        node, pidx = stack.pop()
+        dz = zp[pidx] - node.center
+        far = np.abs(dz) * theta > node.radius
+        if far.any():
+            w = 1.0 / dz[far]
+            # Σ a_p w^(p+1) 를 호너 방식으로
+            acc = np.zeros(far.sum(), dtype=complex)
+            for a in node.coef[::-1]:
+                acc = (acc + a) * w
+            s[pidx[far]] += acc
+        near = pidx[~far]
+        if not len(near):
+            continue
+        if node.children:
+            stack.extend((c, near) for c in node.children)
+        else:
+            s[near] += _direct_sum(zp[near], zw[node.idx], cur[node.idx])
+    return _to_B(X, s)
+
+
+# ============================================================
+#  도선 배치 예시
+# ============================================================
+def three_wires(I_B: float = 1.0):
+    """수능 문제의 A·B·C 도선 단면 (I₀, I_B, I₀)"""
+    return np.array([[-1.0, 0.0], [0.0, 0.0], [1.0, 0.0]]), np.array([1.0, I_B, 1.0])
+
+
+def wire_grid(n: int, size: float = 4.0, alternate: bool = False):
+    """n×n 도선 격자 (alternate 이면 전류 방향이 바둑판처럼 번갈아)"""
+    g = np.linspace(-size / 2, size / 2, n)
+    X, Y = np.meshgrid(g, g)
+    cur = np.ones(n * n)
+    if alternate:
+        cur = np.where((np.indices((n, n)).sum(axis=0) % 2).ravel() == 0, 1.0, -1.0)
+    return np.stack([X.ravel(), Y.ravel()], axis=-1), cur
+
+
+def busbar(n: int, width: float = 4.0, gap: float = 1.0, thickness: float = 0.3):
+    """왕복 전류가 흐르는 평행 판 두 개 (각 판을 도선 n 개로 나눔)"""
+    x = np.linspace(-width / 2, width / 2, n)
+    rows = max(1, n // 20)
+    t = np.linspace(-thickness / 2, thickness / 2, rows)
+    X, T = np.meshgrid(x, t)
+    top = np.stack([X.ravel(), gap / 2 + T.ravel()], axis=-1)
+    bottom = top * [1, -1]
+    cur = np.concatenate([np.ones(len(top)), -np.ones(len(bottom))]) / len(top)
+    return np.vstack([top, bottom]), cur
+
+
+def coil_section(n: int, radius: float = 1.0, length: float = 4.0):
+    """솔레노이드 단면: 위·아래 줄에 도선 n 개씩, 전류 반대 방향 (⊙ / ⊗)"""
+    x = np.linspace(-length / 2, length / 2, n)
+    top = np.stack([x, np.full(n, radius)], axis=-1)
+    bottom = np.stack([x, np.full(n, -radius)], axis=-1)
+    return np.vstack([top, bottom]), np.concatenate([np.ones(n), -np.ones(n)])
+
+
+if __name__ == "__main__":
+    import time
+
+    X, Y = np.meshgrid(np.linspace(-3, 3, 300), np.linspace(-3, 3, 300))
+    cases = {
+        "도선 격자 20×20": wire_grid(20),
+        "교차 격자 30×30": wire_grid(30, alternate=True),
+        "버스바 (판 2장)": busbar(400),
+        "코일 단면 2×500": coil_section(500),
+    }
+    print(f"평가점 {X.size}개")
+    for name, (xy, cur) in cases.items():
+        t = time.perf_counter()
+        Bx0, By0 = direct_field(X, Y, xy, cur)
+        t_direct = time.perf_counter() - t
+        ref = np.hypot(Bx0, By0)
+        scale = np.percentile(ref, 99)
+        print(f"\n[{name}] 도선 {len(xy)}개  직접 합 {t_direct*1e3:7.1f} ms")
+        for tol in (1e-2, 1e-3, 1e-5):
+            t = time.perf_counter()
+            Bx, By = tree_field(X, Y, xy, cur, tol=tol)
+            t_tree = time.perf_counter() - t
+            err = np.hypot(Bx - Bx0, By - By0) / scale
+            print(f"  tol={tol:.0e}: {t_tree*1e3:7.1f} ms ({t_direct/t_tree:4.1f}배)"
+                  f"  오차 중앙값 {np.median(err):.1e}, 99% {np.percentile(err, 99):.1e}")